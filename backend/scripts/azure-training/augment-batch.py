@@ -2,299 +2,426 @@
 """
 Toplu ekran goruntusu augmentation scripti.
 Bir klasordeki tum PNG/JPG dosyalarini 3 farkli efektle bozup PDF yapar.
+Efektler ve PDF uretimi augmentation/ paketindedir; bu dosya sadece CLI'dir.
 
-Kullanim: python3 augment-batch.py <klasor_yolu> [cikti_klasoru]
+Kullanim: python3 augment-batch.py <klasor_yolu> [cikti_klasoru] [--single-random] [--workers N]
+                                   [--seed S] [--only PDF_ADI] [--combine effect|chunk]
+                                   [--pages-per-file N] [--pipeline SPEC.yaml] [--effects a,b]
+                                   [--fused] [--incremental] [--profile] [--trace DOSYA]
+                                   [--max-dpi DPI] [--cache-mb MB] [--archive tar|zip]
+                                   [--shard-mb MB] [--sweep YOGUNLUKLAR] [--quality Q] [--gray]
+                                   [--target-kb KB] [--lossless] [--batch N]
+
+--workers N: (goruntu, efekt) isleri N surecli bir havuza dagitilir (0 = tum cekirdekler).
+Dosya adlari, hata sayilari ve ilerleme ciktisi seri calisma ile aynidir.
+
+--seed S: Her (goruntu, efekt) cifti kok tohumdan turetilen kendi Generator'unu
+kullanir; ayni tohumla seri, paralel veya kismi (--only) calismalar ayni
+goruntuleri uretir. Tohum, yogunluk ve efekt parametreleri augment-manifest.json'a yazilir.
+
+--combine effect|chunk: Her cikti icin ayri PDF yerine sayfalar cok sayfali
+PDF'lere akitilir (efekt basina veya N sayfalik parcalar). Bellek kullanimi
+sayfa sayisindan bagimsizdir; her PDF'in yaninda sayfa eslemesi JSON'u bulunur.
+
+--archive tar|zip: Tek sayfalik PDF'ler ayri dosyalar yerine dogrudan
+augmented-00001.tar (veya .zip) arsivine akitilir; diske ara dosya yazilmaz.
+--shard-mb MB ile arsiv bu boyutta parcalara bolunur. archive-index.json her
+PDF'in parcasini, bayt ofsetini ve boyutunu tutar; build-dataset.mjs --local
+bu klasoru PDF'leri cikarmadan yukler.
+
+--pipeline SPEC: YAML/JSON pipeline spec'ini (bkz. augmentation/pipeline.py ve
+augmentation/examples/fax.yaml) yeni bir efekt olarak ekler. --effects ile
+calisacak efektler ve sirasi secilir (varsayilan: yerlesikler + --pipeline'lar).
+
+--fused: Ardisik nokta bazli asamalar (gradyan, beyaz dengesi, gurultu, kenar
+karartma, ...) tek bir float32 tamponda yerinde calisir ve sonda bir kez
+uint8'e cevrilir. Surec basina tepe bellek yaklasik iki goruntu tamponuna
+iner (600 DPI girdilerde cok surec icin). Ara kirpma olmadigindan ciktilar
+varsayilan moddan piksel duzeyinde biraz farklidir; ayni tohumla yine aynidir.
+
+--sweep YOGUNLUKLAR: Yogunluk rastgele cekilmek yerine her efekt verilen
+yogunluklarin her biriyle uretilir ("0.4,0.8,1.2" veya uclar dahil esit
+aralikli "0.4:1.6:4"); cikti adina _i0.8 eklenir. --effects listesinde
+"scanner+phone" gibi birlesik efektler de verilebilir (asamalar art arda,
+tek yogunlukla). Bir (goruntu, efekt) ciftinin tum yogunluklari ayni rastgele
+cekimleri kullanir, yalnizca yogunluk degisir (ablasyon icin). Goruntu bir
+kez okunur; gri/LAB donusumleri ve boyuta bagli alanlar varyantlar arasinda
+paylasilir.
+
+--incremental: Cikti klasorundeki augment-state.jsonl gunlugune gore sadece
+eksik/eskimis ciktilar uretilir. Kaynak icerik ozeti, efekt spec'i, tohum ve
+mod ayni olan mevcut PDF'ler atlanir; kaynagi silinen ciktilar kaldirilir.
+Goruntu sira numaralari kalicidir (yeni goruntu sona eklenir), tohum
+verilmezse gunluktekiyle devam edilir. Yarida kesilen calisma ayni komutla
+kaldigi yerden surer.
+
+--max-dpi DPI: PDF sayfasi A4'e sigdirildigi icin A4'te DPI'den yuksek
+cozunurluge denk gelen goruntuler kucultulerek okunur (JPEG'lerde
+IMREAD_REDUCED ile dogrudan dusuk cozunurlukte cozulur) ve efektler bu
+boyutta calisir. Kenar genisligi, toz, tambur cizgileri, bulaniklik ve
+gurultu ayni orantiyla olceklenir; kucuk goruntuler degismez.
+
+--cache-mb MB: Boyuta bagli onceden hesaplanan alanlar (gradyan uzaklik
+izgarasi) surec basina bu butceyle LRU olarak saklanir; ayni cozunurlukteki
+goruntuler bunlari yeniden kurmaz. Ciktilari degistirmez.
+
+--gray: Kanallari esit (gri) sayfalar, ornek fotokopi, tek kanalli JPEG
+olarak kodlanir; boyut yaklasik ucte bir azalir. --quality Q JPEG kalitesini
+(varsayilan 90) verir. --target-kb KB ile kalite, sayfa KB'yi gecmeyecek en
+yuksek degere ikili aramayla ayarlanir (en az 30). --lossless sayfanin
+kayipsiz PNG'si (PDF'te FlateDecode) daha kucukse onu kullanir. Varsayilan
+ayarlar ciktilari degistirmez.
+
+--batch N: Isler N goruntuluk gruplar halinde calisir; ayni efekt ve boyut
+sinifindaki (32 pikselin katina yuvarlanmis) goruntuler tek bir N x H x W x C
+yigininda islenir, kucuk boyut farklari dolguyla kapatilir. Gurultu tablo
+ornekleyiciyle (uint16 cekim + int8 tablo) cekilir; kucuk ekran
+goruntulerinde asil kazanc buradan gelir. Ciktilar bu yuzden varsayilan
+moddan farklidir (--fused gibi) ama her is yalnizca kendi tohumuna baglidir:
+N'den ve gruptaki diger goruntulerden bagimsizdir. --fused ile birlikte
+kullanilabilir.
+
+--profile: Her efektin pipeline asamalari ve G/C adimlari (imread, JPEG
+encode, PDF yazma) olculur; sonda adet, toplam/ortalama/p50/p95/maks sure,
+bayt ve sure histogrami iceren bir tablo yazilir. --trace DOSYA ayrica
+Chrome trace / Perfetto JSON'u yazar (--profile'i acar); chrome://tracing
+veya ui.perfetto.dev ile acilir.
 """
 
 import sys
 import os
-import glob
 import time
-import numpy as np
-from PIL import Image
-import cv2
-import img2pdf
-
-INPUT_DIR = sys.argv[1] if len(sys.argv) > 1 else None
-OUTPUT_DIR = sys.argv[2] if len(sys.argv) > 2 else os.path.join(
-    os.path.dirname(os.path.abspath(__file__)), "augmented", "batch"
+import argparse
+import functools
+import itertools
+import multiprocessing
+
+from augmentation import (
+    EFFECTS,
+    get_effect,
+    DirectorySink,
+    CombinedPdfSink,
+    ArchiveSink,
+    find_images,
+    plan_jobs,
+    run_job,
+    group_jobs,
+    run_job_batch,
+    init_worker,
+    new_seed,
+    to_json_value,
+    update_manifest,
+    register_pipeline,
+    effect_fingerprint,
+    IncrementalState,
+    DEFAULT_CACHE_MB,
+    Encoding,
+    encoding_settings,
+    set_cache_limit,
+    Profile,
 )
+from augmentation.jobs import INTENSITY_RANGE
+
+
+def parse_sweep(text):
+    """--sweep degeri: "0.4,0.8,1.2" listesi veya "bas:son:adet" (uclar dahil)."""
+    try:
+        if ":" in text:
+            start, stop, count = text.split(":")
+            start, stop, count = float(start), float(stop), int(count)
+            if count < 1:
+                raise ValueError
+            values = [start + (stop - start) * i / max(1, count - 1) for i in range(count)]
+        else:
+            values = [float(value) for value in text.split(",") if value.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"gecersiz yogunluk listesi: {text}") from None
+    values = [round(value, 4) for value in values]
+    if not values or min(values) < 0 or len(set(values)) != len(values):
+        raise argparse.ArgumentTypeError(f"yogunluklar bos olmayan, negatif olmayan ve tekrarsiz olmali: {text}")
+    return values
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Klasordeki ekran goruntulerini tarayici/telefon/fotokopi efektleriyle bozup PDF yapar."
+    )
+    parser.add_argument("input_dir", help="PNG/JPG goruntulerin oldugu klasor")
+    parser.add_argument("output_dir", nargs="?", default=os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "augmented", "batch"
+    ), help="PDF cikti klasoru (varsayilan: augmented/batch)")
+    parser.add_argument("--single-random", action="store_true",
+                        help="Her goruntu icin rastgele TEK efekt uygula")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Paralel surec sayisi (varsayilan: 1 = seri, 0 = tum cekirdekler)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Kok tohum; verilmezse rastgele secilir ve manifest'e yazilir")
+    parser.add_argument("--only", action="append", default=[], metavar="PDF_ADI",
+                        help="Sadece bu ciktiyi yeniden uret (tekrarlanabilir, ornek: sayfa-003_phone.pdf)")
+    parser.add_argument("--combine", choices=["effect", "chunk"], default=None,
+                        help="Sayfalari cok sayfali PDF'lerde topla: efekt basina veya sirali parcalar")
+    parser.add_argument("--pages-per-file", type=int, default=None, metavar="N",
+                        help="--combine ile dosya basina en fazla N sayfa (varsayilan: effect=sinirsiz, chunk=100)")
+    parser.add_argument("--archive", choices=["tar", "zip"], default=None,
+                        help="PDF'leri ayri dosyalar yerine tar/zip arsiv parcalarina yaz")
+    parser.add_argument("--shard-mb", type=int, default=0, metavar="MB",
+                        help="--archive ile parca basina en fazla MB (varsayilan: 0 = tek arsiv)")
+    parser.add_argument("--pipeline", action="append", default=[], metavar="SPEC",
+                        help="YAML/JSON pipeline spec'ini efekt olarak ekle (tekrarlanabilir)")
+    parser.add_argument("--effects", default=None, metavar="AD,AD",
+                        help="Calisacak efektler, virgulle (varsayilan: tum kayitli efektler)")
+    parser.add_argument("--sweep", type=parse_sweep, default=None, metavar="YOGUNLUKLAR",
+                        help="Her efekti bu yogunluklarla uret: 0.4,0.8,1.2 veya 0.4:1.6:4 (esit aralikli)")
+    parser.add_argument("--fused", action="store_true",
+                        help="Nokta bazli asamalari tek float32 tamponda calistir (daha az bellek)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Sadece yeni/degisen goruntuleri isle, silinenlerin ciktilarini kaldir, yarim kalani surdur")
+    parser.add_argument("--max-dpi", type=int, default=None, metavar="DPI",
+                        help="A4'te bu DPI'yi asan goruntuleri kucuk oku ve efektleri o boyutta calistir (ornek: 200)")
+    parser.add_argument("--cache-mb", type=int, default=DEFAULT_CACHE_MB, metavar="MB",
+                        help=f"Surec basina boyut onbellegi, MB (varsayilan: {DEFAULT_CACHE_MB}, 0 = kapali)")
+    parser.add_argument("--quality", type=int, default=90, metavar="Q",
+                        help="JPEG kalitesi; --target-kb ile ust sinir (varsayilan: 90)")
+    parser.add_argument("--gray", action="store_true",
+                        help="Gri sayfalari (fotokopi) tek kanalli kodla")
+    parser.add_argument("--target-kb", type=int, default=None, metavar="KB",
+                        help="JPEG kalitesini sayfa bu boyutu gecmeyecek sekilde ikili aramayla sec")
+    parser.add_argument("--lossless", action="store_true",
+                        help="Kayipsiz (PNG/Flate) sayfa JPEG'den kucukse onu kullan")
+    parser.add_argument("--batch", type=int, default=0, metavar="N",
+                        help="N goruntuyu efekt/boyut yiginlari halinde isle (kucuk ekran goruntuleri icin)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Asama ve G/C surelerini olc, sonda ozet tablo yazdir")
+    parser.add_argument("--trace", default=None, metavar="DOSYA",
+                        help="Chrome trace / Perfetto JSON'u yaz (--profile'i acar)")
+    return parser.parse_args(argv)
+
 
-if not INPUT_DIR:
-    print("Kullanim: python3 augment-batch.py <klasor_yolu> [cikti_klasoru] [--single-random]")
-    sys.exit(1)
-
-single_random = "--single-random" in sys.argv
-
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-
-# Goruntu dosyalarini bul
-patterns = ['*.png', '*.PNG', '*.jpg', '*.JPG', '*.jpeg', '*.JPEG']
-image_files = []
-for pattern in patterns:
-    image_files.extend(glob.glob(os.path.join(INPUT_DIR, pattern)))
-image_files.sort()
-
-print(f"=" * 60)
-print(f"TOPLU AUGMENTATION")
-print(f"=" * 60)
-print(f"Girdi klasoru : {INPUT_DIR}")
-print(f"Cikti klasoru : {OUTPUT_DIR}")
-print(f"Goruntu sayisi: {len(image_files)}")
-print(f"Uretilecek PDF: {len(image_files) * 3}")
-print(f"=" * 60)
-print()
-
-# ============================================
-# EFEKT FONKSIYONLARI
-# ============================================
-
-def scanner_effect(image, intensity=None):
-    """Flatbed tarayici efekti"""
-    h, w = image.shape[:2]
-    result = image.copy()
-    
-    # Rastgele yogunluk
-    if intensity is None:
-        intensity = np.random.uniform(0.5, 1.5)
-    
-    # 1. Hafif rotation
-    angle = np.random.uniform(-1.5, 1.5) * intensity
-    M = cv2.getRotationMatrix2D((w/2, h/2), angle, 1.0)
-    border_color = tuple(np.random.randint(235, 250, 3).tolist())
-    result = cv2.warpAffine(result, M, (w, h), borderValue=border_color)
-    
-    # 2. Kontrast
-    lab = cv2.cvtColor(result, cv2.COLOR_BGR2LAB)
-    l, a, b = cv2.split(lab)
-    clip_limit = 1.0 + intensity
-    clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=(8, 8))
-    l = clahe.apply(l)
-    result = cv2.cvtColor(cv2.merge([l, a, b]), cv2.COLOR_LAB2BGR)
-    
-    # 3. Noise
-    noise_level = int(2 + 4 * intensity)
-    noise = np.random.normal(0, noise_level, result.shape).astype(np.uint8)
-    result = cv2.add(result, noise)
-    
-    # 4. Kenar karartma
-    mask = np.ones_like(result, dtype=np.float32)
-    border = int(20 + 20 * intensity)
-    for i in range(border):
-        alpha = i / border
-        mask[i, :] *= alpha
-        mask[-(i+1), :] *= alpha
-        mask[:, i] *= alpha
-        mask[:, -(i+1)] *= alpha
-    result = (result.astype(np.float32) * mask).astype(np.uint8)
-    
-    # 5. Toz noktaciklari
-    num_dots = np.random.randint(3, int(15 * intensity))
-    for _ in range(num_dots):
-        x, y = np.random.randint(0, w), np.random.randint(0, h)
-        r = np.random.randint(1, 3)
-        color = np.random.randint(80, 200)
-        cv2.circle(result, (x, y), r, (color, color, color), -1)
-    
-    return result
-
-
-def phone_camera_effect(image, intensity=None):
-    """Telefon kamerasi efekti"""
-    h, w = image.shape[:2]
-    result = image.copy()
-    
-    if intensity is None:
-        intensity = np.random.uniform(0.5, 1.5)
-    
-    # 1. Perspektif bozulmasi
-    margin = int(min(w, h) * 0.015 * intensity)
-    if margin < 1:
-        margin = 1
-    src_pts = np.float32([[0, 0], [w, 0], [w, h], [0, h]])
-    dst_pts = np.float32([
-        [np.random.randint(0, margin+1), np.random.randint(0, margin+1)],
-        [w - np.random.randint(0, margin+1), np.random.randint(0, margin*2+1)],
-        [w - np.random.randint(0, margin*2+1), h - np.random.randint(0, margin+1)],
-        [np.random.randint(0, margin*2+1), h - np.random.randint(0, margin+1)]
-    ])
-    M = cv2.getPerspectiveTransform(src_pts, dst_pts)
-    bg_color = tuple(np.random.randint(230, 245, 3).tolist())
-    result = cv2.warpPerspective(result, M, (w, h), borderValue=bg_color)
-    
-    # 2. Isik gradyani
-    cx = np.random.randint(w//4, 3*w//4)
-    cy = np.random.randint(h//4, 3*h//4)
-    Y, X = np.ogrid[:h, :w]
-    dist = np.sqrt((X - cx)**2 + (Y - cy)**2).astype(np.float32)
-    max_dist = np.sqrt(w**2 + h**2)
-    gradient = 1.0 - (0.15 + 0.15 * intensity) * (dist / max_dist)
-    result = (result.astype(np.float32) * gradient[:, :, np.newaxis]).clip(0, 255).astype(np.uint8)
-    
-    # 3. Blur
-    blur_size = 3 if intensity < 1.0 else 5
-    blur_sigma = 0.5 + 0.5 * intensity
-    result = cv2.GaussianBlur(result, (blur_size, blur_size), blur_sigma)
-    
-    # 4. Renk sicakligi kayma
-    result = result.astype(np.float32)
-    warm = np.random.uniform(0.95, 1.0)
-    cool = np.random.uniform(1.0, 1.05)
-    result[:, :, 0] *= warm   # mavi
-    result[:, :, 2] *= cool   # kirmizi
-    result = result.clip(0, 255).astype(np.uint8)
-    
-    # 5. Noise
-    noise_level = int(3 + 5 * intensity)
-    noise = np.random.normal(0, noise_level, result.shape).astype(np.int16)
-    result = (result.astype(np.int16) + noise).clip(0, 255).astype(np.uint8)
-    
-    # 6. JPEG compression
-    quality = max(45, int(80 - 20 * intensity))
-    _, buf = cv2.imencode('.jpg', result, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
-    result = cv2.imdecode(buf, cv2.IMREAD_COLOR)
-    
-    return result
-
-
-def photocopy_effect(image, intensity=None):
-    """Fotokopi efekti"""
-    h, w = image.shape[:2]
-    
-    if intensity is None:
-        intensity = np.random.uniform(0.5, 1.5)
-    
-    # 1. Grayscale
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    
-    # 2. Kontrast
-    alpha = 1.2 + 0.3 * intensity
-    beta = -20 - 20 * intensity
-    gray = cv2.convertScaleAbs(gray, alpha=alpha, beta=beta)
-    
-    # 3. Threshold blend
-    _, mask = cv2.threshold(gray, 190 + int(10 * intensity), 255, cv2.THRESH_BINARY)
-    blend = 0.6 + 0.1 * intensity
-    gray = cv2.addWeighted(gray, blend, mask, 1 - blend, 0)
-    
-    # 4. Yatay cizgiler
-    line_spacing = np.random.randint(60, 130)
-    for y in range(0, h, line_spacing):
-        thickness = np.random.randint(1, 2)
-        line_alpha = np.random.uniform(0.02, 0.06 * intensity)
-        line_y = y + np.random.randint(-3, 4)
-        if 0 <= line_y < h - thickness:
-            gray[line_y:line_y+thickness, :] = (
-                gray[line_y:line_y+thickness, :].astype(np.float32) * (1 - line_alpha)
-            ).astype(np.uint8)
-    
-    # 5. Kenar karartma
-    mask_edge = np.ones((h, w), dtype=np.float32)
-    border = int(15 + 15 * intensity)
-    for i in range(border):
-        val = 0.6 + 0.4 * (i / border)
-        mask_edge[i, :] = val
-        mask_edge[-(i+1), :] = val
-        mask_edge[:, i] *= val
-        mask_edge[:, -(i+1)] *= val
-    gray = (gray.astype(np.float32) * mask_edge).astype(np.uint8)
-    
-    # 6. Noise
-    noise_level = int(3 + 3 * intensity)
-    noise = np.random.normal(0, noise_level, gray.shape).astype(np.int16)
-    gray = (gray.astype(np.int16) + noise).clip(0, 255).astype(np.uint8)
-    
-    return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
-
-
-def save_as_pdf(cv_image, pdf_path):
-    """OpenCV image -> A4 PDF"""
-    rgb = cv2.cvtColor(cv_image, cv2.COLOR_BGR2RGB)
-    pil_img = Image.fromarray(rgb)
-    
-    temp_jpg = pdf_path.replace('.pdf', '_temp.jpg')
-    pil_img.save(temp_jpg, "JPEG", quality=90)
-    
-    with open(pdf_path, "wb") as f:
-        f.write(img2pdf.convert(temp_jpg, layout_fun=img2pdf.get_layout_fun(
-            fit=img2pdf.FitMode.into,
-            pagesize=(img2pdf.mm_to_pt(210), img2pdf.mm_to_pt(297))
-        )))
-    os.remove(temp_jpg)
-    return os.path.getsize(pdf_path)
-
-
-# ============================================
-# TOPLU ISLEME
-# ============================================
-
-effects = [
-    ("scanner", scanner_effect),
-    ("phone", phone_camera_effect),
-    ("photocopy", photocopy_effect),
-]
-
-total_start = time.time()
-success_count = 0
-error_count = 0
-total_pdf_size = 0
-
-for idx, img_path in enumerate(image_files, 1):
-    filename = os.path.basename(img_path)
-    basename = os.path.splitext(filename)[0]
-    
-    # Kisa isim olustur (sayfa-01, sayfa-02, ...)
-    short_name = f"sayfa-{idx:03d}"
-    
-    print(f"[{idx}/{len(image_files)}] {filename}")
-    
-    img = cv2.imread(img_path)
-    if img is None:
-        print(f"  HATA: Okunamadi, atlaniyor!")
-        error_count += 1
-        continue
-    
-    # --single-random modu: her goruntu icin rastgele TEK efekt
-    # Normal mod: her goruntu icin 3 efekt
-    if single_random:
-        effect_name, effect_fn = effects[np.random.randint(0, len(effects))]
+def main(argv):
+    args = parse_args(argv)
+    output_dir = args.output_dir
+    workers = args.workers if args.workers > 0 else os.cpu_count()
+    if args.combine and args.only:
+        print("HATA: --only tek tek PDF'leri yeniden uretir, --combine ile birlikte kullanilamaz")
+        sys.exit(1)
+    if args.archive and args.combine:
+        print("HATA: --archive ve --combine birlikte kullanilamaz")
+        sys.exit(1)
+    if args.archive and (args.only or args.incremental):
+        print("HATA: --only/--incremental tek tek PDF dosyalariyla calisir, --archive ile birlikte kullanilamaz")
+        sys.exit(1)
+    if not 1 <= args.quality <= 100 or (args.target_kb is not None and args.target_kb <= 0):
+        print("HATA: --quality 1-100 arasinda, --target-kb pozitif olmali")
+        sys.exit(1)
+    if args.batch < 0:
+        print("HATA: --batch pozitif olmali")
+        sys.exit(1)
+    batched = args.batch > 0
+    if args.combine and args.incremental:
+        print("HATA: --incremental tek tek PDF'lerle calisir, --combine ile birlikte kullanilamaz")
+        sys.exit(1)
+
+    set_cache_limit(args.cache_mb)
+    for path in args.pipeline:
+        try:
+            register_pipeline(path)
+        except (OSError, ValueError) as e:
+            print(f"HATA: {path}: {e}")
+            sys.exit(1)
+    effect_names = args.effects.split(",") if args.effects else list(EFFECTS)
+    # "a+b" birlesik efektleri burada derlenir; isci surecler kendileri derler
+    for name in effect_names:
         try:
-            intensity = np.random.uniform(0.4, 1.6)
-            augmented = effect_fn(img, intensity=intensity)
-            pdf_name = f"ekran-{idx:03d}.pdf"
-            pdf_path = os.path.join(OUTPUT_DIR, pdf_name)
-            pdf_size = save_as_pdf(augmented, pdf_path)
-            total_pdf_size += pdf_size
-            print(f"  {effect_name}: {pdf_name} ({pdf_size//1024} KB) [yogunluk: {intensity:.1f}]")
-            success_count += 1
-        except Exception as e:
-            print(f"  HATA [{effect_name}]: {e}")
-            error_count += 1
+            get_effect(name)
+        except ValueError as e:
+            print(f"HATA: {e}")
+            sys.exit(1)
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Goruntu dosyalarini bul
+    image_files = find_images(args.input_dir)
+    # Tohum verilmezse yeni bir tane cekilir; manifest'e yazildigi icin calisma yine tekrarlanabilir
+    state = None
+    indices = None
+    removed = []
+    skipped = 0
+    if args.incremental:
+        state = IncrementalState(output_dir)
+        seed = args.seed if args.seed is not None else (state.seed if state.seed is not None else new_seed())
+        state.start_run(seed)
+        indices = state.assign_indices(args.input_dir, image_files)
+        removed = state.remove_stale(set(indices.values()))
+    else:
+        seed = args.seed if args.seed is not None else new_seed()
+    jobs = plan_jobs(image_files, args.single_random, seed, effect_names, indices, args.sweep)
+    if args.only:
+        wanted = set(args.only)
+        jobs = [job for job in jobs if f"{job.name}.pdf" in wanted]
+        missing = wanted - {f"{job.name}.pdf" for job in jobs}
+        for name in sorted(missing):
+            print(f"UYARI: {name} bu klasor icin planlanan ciktilar arasinda yok")
+    encoding = Encoding(args.quality, args.gray, args.target_kb, args.lossless)
+    fingerprints = {name: effect_fingerprint(name) for name in effect_names}
+    if state is not None:
+        pending = [job for job in jobs
+                   if not state.is_fresh(job, fingerprints[job.effect_name], args.fused, args.max_dpi,
+                                         encoding_settings(encoding), batched)]
+        skipped = len(jobs) - len(pending)
+        jobs = pending
+
+    print(f"=" * 60)
+    print(f"TOPLU AUGMENTATION")
+    print(f"=" * 60)
+    print(f"Girdi klasoru : {args.input_dir}")
+    print(f"Cikti klasoru : {output_dir}")
+    print(f"Goruntu sayisi: {len(image_files)}")
+    print(f"Efektler      : {', '.join(effect_names)}")
+    if args.sweep:
+        print(f"Yogunluklar   : {', '.join(f'{intensity:g}' for intensity in args.sweep)}")
+    if args.combine:
+        pages_per_file = args.pages_per_file
+        if pages_per_file is None:
+            pages_per_file = 0 if args.combine == "effect" else 100
+        sink = CombinedPdfSink(output_dir, args.combine, pages_per_file)
+        print(f"Uretilecek sayfa: {len(jobs)} (birlesik: {args.combine}, dosya basina {pages_per_file or 'sinirsiz'})")
+    elif args.archive:
+        sink = ArchiveSink(output_dir, args.archive, args.shard_mb << 20)
+        shard = f"parca basina {args.shard_mb} MB" if args.shard_mb else "tek arsiv"
+        print(f"Uretilecek PDF: {len(jobs)} ({args.archive} arsivi, {shard})")
+    else:
+        sink = DirectorySink(output_dir)
+        print(f"Uretilecek PDF: {len(jobs)}")
+    if state is not None:
+        print(f"Guncel (atlanan): {skipped}, kaldirilan: {len(removed)}")
+    print(f"Surec sayisi  : {workers}" + (" (birlesik float32)" if args.fused else ""))
+    if batched:
+        print(f"Yigin         : {args.batch} goruntu")
+    if args.max_dpi:
+        print(f"En fazla DPI  : {args.max_dpi} (A4)")
+    print(f"Tohum         : {seed}")
+    print(f"=" * 60)
+    print()
+
+    profile = Profile(args.profile or args.trace is not None)
+    total_start = time.time()
+    success_count = 0
+    error_count = 0
+    total_pdf_size = 0
+    manifest_entries = []
+
+    options = {"fused": args.fused, "profile": profile.enabled, "max_dpi": args.max_dpi, "encoding": encoding}
+    if batched:
+        # Is birimi bir goruntu grubu; sonuclar yine is sirasiyla duzlestirilir
+        job_fn, tasks, chunksize = functools.partial(run_job_batch, **options), group_jobs(jobs, args.batch), 1
     else:
-        for effect_name, effect_fn in effects:
-            try:
-                intensity = np.random.uniform(0.4, 1.6)
-                augmented = effect_fn(img, intensity=intensity)
-                pdf_name = f"{short_name}_{effect_name}.pdf"
-                pdf_path = os.path.join(OUTPUT_DIR, pdf_name)
-                pdf_size = save_as_pdf(augmented, pdf_path)
+        job_fn, tasks = functools.partial(run_job, **options), jobs
+        # Bir goruntunun efektleri ayni surece gitsin ki goruntu bir kez okunsun
+        chunksize = (1 if args.single_random else len(effect_names)) * len(args.sweep or [None])
+    pool = None
+    if workers > 1 and len(tasks) > 1:
+        pool = multiprocessing.Pool(workers, initializer=init_worker, initargs=(args.pipeline, args.cache_mb))
+        results = pool.imap(job_fn, tasks, chunksize=chunksize)
+    else:
+        results = map(job_fn, tasks)
+    if batched:
+        results = itertools.chain.from_iterable(results)
+
+    # imap sonuclari is sirasiyla dondurur; ilerleme ciktisi seri calisma ile aynidir
+    current_idx = None
+    unreadable = False
+    # --only/--incremental ile sadece isi olan goruntuler sayilir
+    image_count = 0
+    images_to_run = len({job.idx for job in jobs})
+    try:
+        for job, jpeg, shape, error, intensity, params, spans in results:
+            if spans:
+                profile.extend(spans)
+            if job.idx != current_idx:
+                current_idx = job.idx
+                unreadable = False
+                image_count += 1
+                print(f"[{image_count}/{images_to_run}] {os.path.basename(job.img_path)}")
+            if unreadable:
+                continue
+            if jpeg is None and error is None:
+                print(f"  HATA: Okunamadi, atlaniyor!")
+                error_count += 1
+                unreadable = True
+            elif error is not None:
+                print(f"  HATA [{job.effect_name}]: {error}")
+                error_count += 1
+            else:
+                with profile.measure("pdf_write", "io") as record:
+                    location, pdf_size = sink.add(job, jpeg, shape)
+                    record["nbytes"] = pdf_size
                 total_pdf_size += pdf_size
-                print(f"  {effect_name}: {pdf_name} ({pdf_size//1024} KB) [yogunluk: {intensity:.1f}]")
+                if state is not None:
+                    # PDF atomik yazildiktan sonra; oldurulurse bu is yeniden uretilir
+                    state.record_output(job, location["file"], pdf_size,
+                                        fingerprints[job.effect_name], args.fused, args.max_dpi,
+                                        encoding_settings(encoding), batched)
+                where = location["file"] + (f" s.{location['page']}" if "page" in location else "")
+                if "archive" in location:
+                    where = f"{location['archive']}:{where}"
+                print(f"  {job.effect_name}: {where} ({pdf_size//1024} KB) [yogunluk: {intensity:.1f}]")
                 success_count += 1
-            except Exception as e:
-                print(f"  HATA [{effect_name}]: {e}")
-                error_count += 1
+                manifest_entries.append({
+                    "name": job.name,
+                    **location,
+                    "source": os.path.basename(job.img_path),
+                    "index": job.idx,
+                    "effect": job.effect_name,
+                    "intensity": float(intensity),
+                    "params": to_json_value(params),
+                })
+    finally:
+        # Tum sonuclar tuketildiyse terminate guvenli; Ctrl+C'de de bekleyen isleri keser
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        # Yarida kesilen calismada da acik birlesik PDF'ler kapanir ve uretilenlerin kaydi kalsin
+        sink.close()
+        if state is not None:
+            state.close()
+        manifest_path = update_manifest(output_dir, {
+            "script": os.path.basename(__file__),
+            "seed": seed,
+            "single_random": args.single_random,
+            "combine": args.combine,
+            "archive": args.archive,
+            "intensity_range": list(INTENSITY_RANGE),
+            "sweep": args.sweep,
+            "effects": effect_names,
+            "fused": args.fused,
+            "batched": batched,
+            "max_dpi": args.max_dpi,
+            "encoding": encoding_settings(encoding),
+            "pipelines": [os.path.abspath(path) for path in args.pipeline],
+        }, manifest_entries, removed)
+
+    elapsed = time.time() - total_start
+
+    print()
+    print(f"=" * 60)
+    print(f"TAMAMLANDI!")
+    print(f"=" * 60)
+    print(f"Toplam goruntu  : {len(image_files)}")
+    print(f"Basarili PDF    : {success_count}")
+    print(f"Hata            : {error_count}")
+    print(f"Toplam PDF boyut: {total_pdf_size // (1024*1024)} MB")
+    print(f"Gecen sure      : {elapsed:.1f} saniye")
+    print(f"Cikti klasoru   : {output_dir}")
+    print(f"Manifest        : {manifest_path}")
+    print(f"=" * 60)
+
+    if profile.enabled and profile:
+        print()
+        profile.print_summary()
+        if args.trace:
+            profile.write_trace(args.trace)
+            print(f"Trace: {args.trace}")
+
 
-elapsed = time.time() - total_start
-
-print()
-print(f"=" * 60)
-print(f"TAMAMLANDI!")
-print(f"=" * 60)
-print(f"Toplam goruntu  : {len(image_files)}")
-print(f"Basarili PDF    : {success_count}")
-print(f"Hata            : {error_count}")
-print(f"Toplam PDF boyut: {total_pdf_size // (1024*1024)} MB")
-print(f"Gecen sure      : {elapsed:.1f} saniye")
-print(f"Cikti klasoru   : {OUTPUT_DIR}")
-print(f"=" * 60)
+if __name__ == "__main__":
+    main(sys.argv[1:])
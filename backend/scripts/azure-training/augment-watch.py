@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Surekli augmentation: yeni ekran goruntuleri geldikce PDF'e cevirir.
+augment-batch.py --incremental ile ayni durum gunlugunu ve adlandirmayi kullanir;
+ayni cikti klasorunde ikisi birbirinin kaldigi yerden devam eder.
+
+Kullanim: python3 augment-watch.py (--watch KLASOR | --stdin | --queue DOSYA) [cikti_klasoru]
+                                   [--workers N] [--max-inflight N] [--interval SN] [--job-timeout SN]
+                                   [--seed S] [--single-random] [--pipeline SPEC] [--effects a,b]
+                                   [--fused] [--max-dpi DPI] [--cache-mb MB] [--quality Q]
+                                   [--gray] [--target-kb KB] [--lossless]
+
+--watch KLASOR: Klasor yoklanir; boyutu ve mtime'i iki yoklama boyunca
+degismeyen (yazimi bitmis) yeni/degisen goruntuler islenir.
+--stdin: Her satir bir goruntu yolu; EOF'ta kalan isler bitirilip cikilir.
+  ornek: find extracted-pages -name '*.png' | python3 augment-watch.py --stdin
+--queue DOSYA: Dosyaya eklenen satirlar `tail -f` gibi izlenir.
+  ornek: echo "$OUT_PNG" >> augment-queue.txt
+
+En fazla --max-inflight goruntu ayni anda islenir; havuz doluyken kaynak
+okunmaz (geri basinc). Her goruntunun PDF'leri bittikce yazilir, manifest
+is kalmadiginda guncellenir. Ctrl+C ile durdurulur.
+
+--job-timeout SN: Bir goruntunun isleri gonderildikten sonra en fazla SN
+saniye beklenir (varsayilan: 600). Olen bir isci sonucunu hic bildirmez;
+suresi dolan isler kayip olarak raporlanir ve durum gunlugune yazilmadigi
+icin sonraki calismada yeniden islenir.
+"""
+
+import sys
+import os
+import time
+import argparse
+import functools
+import multiprocessing
+
+from augmentation import (
+    EFFECTS,
+    get_effect,
+    DirectorySink,
+    plan_jobs,
+    run_jobs,
+    init_worker,
+    new_seed,
+    to_json_value,
+    update_manifest,
+    register_pipeline,
+    effect_fingerprint,
+    IncrementalState,
+    DEFAULT_CACHE_MB,
+    set_cache_limit,
+    Encoding,
+    encoding_settings,
+)
+from augmentation.jobs import INTENSITY_RANGE
+from augmentation.stream import (
+    DirectoryWatcher,
+    QueueFileReader,
+    StdinReader,
+    run_stream,
+    pool_submitter,
+    serial_submitter,
+)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Yeni ekran goruntulerini geldikce tarayici/telefon/fotokopi efektleriyle PDF yapar."
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--watch", metavar="KLASOR", help="Klasoru izle")
+    source.add_argument("--stdin", action="store_true", help="Goruntu yollarini stdin'den oku")
+    source.add_argument("--queue", metavar="DOSYA", help="Kuyruk dosyasina eklenen yollari izle")
+    parser.add_argument("output_dir", nargs="?", default=os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "augmented", "batch"
+    ), help="PDF cikti klasoru (varsayilan: augmented/batch)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Paralel surec sayisi (varsayilan: 1 = seri, 0 = tum cekirdekler)")
+    parser.add_argument("--max-inflight", type=int, default=None, metavar="N",
+                        help="Ayni anda islenen en fazla goruntu (varsayilan: 2 x surec)")
+    parser.add_argument("--interval", type=float, default=2.0, metavar="SN",
+                        help="Yoklama araligi, saniye (varsayilan: 2)")
+    parser.add_argument("--job-timeout", type=float, default=600.0, metavar="SN",
+                        help="Bir goruntunun islerini en fazla bu kadar bekle, sonra kayip say (varsayilan: 600)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Kok tohum; verilmezse durum gunlugundeki veya yeni bir tohum")
+    parser.add_argument("--single-random", action="store_true",
+                        help="Her goruntu icin rastgele TEK efekt uygula")
+    parser.add_argument("--pipeline", action="append", default=[], metavar="SPEC",
+                        help="YAML/JSON pipeline spec'ini efekt olarak ekle (tekrarlanabilir)")
+    parser.add_argument("--effects", default=None, metavar="AD,AD",
+                        help="Calisacak efektler, virgulle (varsayilan: tum kayitli efektler)")
+    parser.add_argument("--fused", action="store_true",
+                        help="Nokta bazli asamalari tek float32 tamponda calistir (daha az bellek)")
+    parser.add_argument("--max-dpi", type=int, default=None, metavar="DPI",
+                        help="A4'te bu DPI'yi asan goruntuleri kucuk oku ve efektleri o boyutta calistir")
+    parser.add_argument("--cache-mb", type=int, default=DEFAULT_CACHE_MB, metavar="MB",
+                        help=f"Surec basina boyut onbellegi, MB (varsayilan: {DEFAULT_CACHE_MB}, 0 = kapali)")
+    parser.add_argument("--quality", type=int, default=90, metavar="Q",
+                        help="JPEG kalitesi; --target-kb ile ust sinir (varsayilan: 90)")
+    parser.add_argument("--gray", action="store_true",
+                        help="Gri sayfalari (fotokopi) tek kanalli kodla")
+    parser.add_argument("--target-kb", type=int, default=None, metavar="KB",
+                        help="JPEG kalitesini sayfa bu boyutu gecmeyecek sekilde ikili aramayla sec")
+    parser.add_argument("--lossless", action="store_true",
+                        help="Kayipsiz (PNG/Flate) sayfa JPEG'den kucukse onu kullan")
+    return parser.parse_args(argv)
+
+
+def main(argv):
+    args = parse_args(argv)
+    output_dir = args.output_dir
+    workers = args.workers if args.workers > 0 else os.cpu_count()
+    max_inflight = args.max_inflight or 2 * workers
+    if not 1 <= args.quality <= 100 or (args.target_kb is not None and args.target_kb <= 0):
+        print("HATA: --quality 1-100 arasinda, --target-kb pozitif olmali")
+        sys.exit(1)
+    encoding = Encoding(args.quality, args.gray, args.target_kb, args.lossless)
+
+    set_cache_limit(args.cache_mb)
+    for path in args.pipeline:
+        try:
+            register_pipeline(path)
+        except (OSError, ValueError) as e:
+            print(f"HATA: {path}: {e}")
+            sys.exit(1)
+    effect_names = args.effects.split(",") if args.effects else list(EFFECTS)
+    # "a+b" birlesik efektleri burada derlenir; isci surecler kendileri derler
+    for name in effect_names:
+        try:
+            get_effect(name)
+        except ValueError as e:
+            print(f"HATA: {e}")
+            sys.exit(1)
+    fingerprints = {name: effect_fingerprint(name) for name in effect_names}
+
+    if args.watch:
+        source = DirectoryWatcher(args.watch)
+        source_desc = f"klasor {args.watch}"
+    elif args.queue:
+        source = QueueFileReader(args.queue)
+        source_desc = f"kuyruk {args.queue}"
+    else:
+        source = StdinReader(sys.stdin, max_inflight)
+        source_desc = "stdin"
+
+    os.makedirs(output_dir, exist_ok=True)
+    state = IncrementalState(output_dir)
+    seed = args.seed if args.seed is not None else (state.seed if state.seed is not None else new_seed())
+    state.start_run(seed)
+    sink = DirectorySink(output_dir)
+
+    print(f"=" * 60)
+    print(f"SUREKLI AUGMENTATION")
+    print(f"=" * 60)
+    print(f"Kaynak        : {source_desc}")
+    print(f"Cikti klasoru : {output_dir}")
+    print(f"Efektler      : {', '.join(effect_names)}")
+    print(f"Surec sayisi  : {workers} (ayni anda en fazla {max_inflight} goruntu)")
+    print(f"Tohum         : {seed}")
+    print(f"=" * 60)
+    print()
+
+    stats = {"images": 0, "skipped": 0, "success": 0, "errors": 0, "lost": 0, "bytes": 0}
+    manifest_entries = []
+    manifest_settings = {
+        "script": os.path.basename(__file__),
+        "seed": seed,
+        "single_random": args.single_random,
+        "combine": None,
+        "intensity_range": list(INTENSITY_RANGE),
+        "effects": effect_names,
+        "fused": args.fused,
+        "max_dpi": args.max_dpi,
+        "encoding": encoding_settings(encoding),
+        "pipelines": [os.path.abspath(path) for path in args.pipeline],
+    }
+
+    def plan(img_path):
+        try:
+            idx = state.add_source(source.key(img_path), img_path)
+        except OSError as e:
+            print(f"UYARI: {img_path}: {e.strerror}")
+            return []
+        jobs = plan_jobs([img_path], args.single_random, seed, effect_names, {img_path: idx})
+        pending = [job for job in jobs
+                   if not state.is_fresh(job, fingerprints[job.effect_name], args.fused, args.max_dpi,
+                                         encoding_settings(encoding))]
+        stats["skipped"] += len(jobs) - len(pending)
+        return pending
+
+    def handle(results):
+        job = results[0].job
+        stats["images"] += 1
+        print(f"[{stats['images']}] {job.img_path}")
+        for job, jpeg, shape, error, intensity, params, _ in results:
+            if jpeg is None and error is None:
+                print(f"  HATA: Okunamadi, atlaniyor!")
+                stats["errors"] += 1
+                break
+            if error is not None:
+                print(f"  HATA [{job.effect_name}]: {error}")
+                stats["errors"] += 1
+                continue
+            location, pdf_size = sink.add(job, jpeg, shape)
+            state.record_output(job, location["file"], pdf_size, fingerprints[job.effect_name],
+                                args.fused, args.max_dpi, encoding_settings(encoding))
+            print(f"  {job.effect_name}: {location['file']} ({pdf_size//1024} KB) [yogunluk: {intensity:.1f}]")
+            stats["success"] += 1
+            stats["bytes"] += pdf_size
+            manifest_entries.append({
+                "name": job.name,
+                **location,
+                "source": os.path.basename(job.img_path),
+                "index": job.idx,
+                "effect": job.effect_name,
+                "intensity": float(intensity),
+                "params": to_json_value(params),
+            })
+
+    def lost(jobs):
+        print(f"UYARI: {jobs[0].img_path}: {args.job_timeout:g} sn icinde sonuc gelmedi, "
+              f"{len(jobs)} is kayip (isci oldu mu?)")
+        stats["lost"] += len(jobs)
+
+    def flush_manifest():
+        update_manifest(output_dir, manifest_settings, manifest_entries)
+        manifest_entries.clear()
+
+    group_fn = functools.partial(run_jobs, fused=args.fused, max_dpi=args.max_dpi, encoding=encoding)
+    pool = None
+    if workers > 1:
+        pool = multiprocessing.Pool(workers, initializer=init_worker, initargs=(args.pipeline, args.cache_mb))
+        submit = pool_submitter(pool, group_fn)
+    else:
+        submit = serial_submitter(group_fn)
+
+    total_start = time.time()
+    try:
+        run_stream(source, plan, submit, max_inflight, args.interval, handle, idle=flush_manifest,
+                   timeout=args.job_timeout, lost=lost)
+    except KeyboardInterrupt:
+        print()
+        print("Durduruldu.")
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        state.close()
+        flush_manifest()
+
+    print()
+    print(f"=" * 60)
+    print(f"Islenen goruntu : {stats['images']}")
+    print(f"Basarili PDF    : {stats['success']}")
+    print(f"Guncel (atlanan): {stats['skipped']}")
+    print(f"Hata            : {stats['errors']}")
+    print(f"Kayip is        : {stats['lost']}")
+    print(f"Toplam PDF boyut: {stats['bytes'] // (1024*1024)} MB")
+    print(f"Gecen sure      : {time.time() - total_start:.1f} saniye")
+    print(f"=" * 60)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,52 @@
+"""
+Azure DI egitim verisi icin goruntu bozma (augmentation) kutuphanesi.
+
+augment-batch.py ve augment-image.py bu paketin ince CLI'laridir; efektler,
+PDF uretimi ve is calistirma tek yerde tanimlidir.
+"""
+
+from .effects import (
+    EFFECTS,
+    BUILTIN_PROFILES,
+    register_effect,
+    get_effect,
+    pipeline_effect,
+    register_pipeline,
+    effect_fingerprint,
+    scanner_effect,
+    phone_camera_effect,
+    photocopy_effect,
+)
+from .pipeline import Pipeline, PipelineContext, load_pipeline_spec, load_pipeline
+from .stages import STAGES, Stage, register_stage
+from .masks import edge_profiles, apply_edge_mask
+from .seeding import new_seed, job_rng
+from .pdf import (
+    atomic_write,
+    encode_jpeg,
+    encode_png,
+    encode_page,
+    Encoding,
+    DEFAULT_ENCODING,
+    encoding_settings,
+    jpeg_to_pdf,
+    encode_pdf,
+    save_as_pdf,
+    StreamingPdfWriter,
+)
+from .sinks import DirectorySink, CombinedPdfSink, ArchiveSink, ARCHIVE_INDEX_NAME
+from .jobs import (
+    Job,
+    Result,
+    find_images,
+    plan_jobs,
+    run_job,
+    run_jobs,
+    group_jobs,
+    run_job_batch,
+    init_worker,
+)
+from .manifest import to_json_value, write_json, update_manifest
+from .state import IncrementalState, file_hash
+from .profiling import Profile, Spans
+from .cache import SHAPE_CACHE, ShapeCache, DEFAULT_CACHE_MB, set_cache_limit
@@ -0,0 +1,107 @@
+"""
+Goruntu boyutuna bagli, onceden hesaplanan verilerin bayt sinirli LRU onbellegi.
+
+Veri setlerindeki ekran goruntuleri birkac cozunurlukte toplanir; boyuta
+bagli alanlar (ornek: gradyanin uzaklik izgarasi) her goruntude yeniden
+kurulmaz. Rastgele degisim (isik merkezi gibi) onbellekteki alandan
+kaydirilmis bir gorunum (view) alinarak uygulanir.
+
+Onbellek surec basinadir; isci surecler kendi kopyalarini tutar. Toplam
+boyut max_bytes'i asarsa en eski kullanilan kayitlar atilir; butcenin
+yarisindan buyuk bir kayit hic saklanmaz (cagiran dogrudan hesaplar).
+
+SourceCache ise tek bir kaynak goruntunun renk donusumlerini (gri, LAB)
+tutar; ayni goruntunun efekt ve yogunluk varyantlari (--sweep) bunlari
+yeniden hesaplamaz.
+"""
+
+from collections import OrderedDict
+
+import cv2
+
+# Surec basina varsayilan butce (--cache-mb)
+DEFAULT_CACHE_MB = 128
+
+
+class ShapeCache:
+    """Anahtar -> salt okunur numpy dizisi; toplam bayt sinirli LRU."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def fits(self, nbytes):
+        return nbytes <= self.max_bytes // 2
+
+    def get(self, key, build, nbytes):
+        """Kayitli diziyi dondurur, yoksa build() ile kurar.
+
+        nbytes kurulacak dizinin tahmini boyutudur; sigmiyorsa build
+        cagrilmaz ve None doner.
+        """
+        array = self.entries.get(key)
+        if array is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return array
+        if not self.fits(nbytes):
+            return None
+        self.misses += 1
+        array = build()
+        array.flags.writeable = False
+        self.entries[key] = array
+        self.nbytes += array.nbytes
+        while self.nbytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+        return array
+
+    def resize(self, max_bytes):
+        self.max_bytes = max_bytes
+        while self.entries and self.nbytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+
+
+class SourceCache:
+    """Kaynak goruntunun cv2.cvtColor sonuclari; donusum kodu basina bir kez.
+
+    Yalnizca girdi kaynak goruntunun kendisiyse (ornek: pipeline'in ilk
+    asamasi) onbellek kullanilir. Donen diziler paylasildigi icin salt
+    okunurdur; yerinde calisan asamalar once kopyalar (bkz. Pipeline.run).
+    """
+
+    def __init__(self, image):
+        self.image = image
+        self.conversions = {}
+        self.resized_sources = {}
+
+    def resized(self, size):
+        """INTER_AREA ile (genislik, yukseklik)'a kucultulmus goruntunun
+        SourceCache'i; boyut basina bir kez (--max-dpi, bkz. Pipeline.fit)."""
+        source = self.resized_sources.get(size)
+        if source is None:
+            image = cv2.resize(self.image, size, interpolation=cv2.INTER_AREA)
+            image.flags.writeable = False
+            source = self.resized_sources[size] = SourceCache(image)
+        return source
+
+    def convert(self, image, code):
+        if image is not self.image:
+            return cv2.cvtColor(image, code)
+        converted = self.conversions.get(code)
+        if converted is None:
+            converted = self.conversions[code] = cv2.cvtColor(image, code)
+            converted.flags.writeable = False
+        return converted
+
+
+SHAPE_CACHE = ShapeCache(DEFAULT_CACHE_MB << 20)
+
+
+def set_cache_limit(megabytes):
+    """Surecin onbellek butcesini ayarlar (0 = onbellek kapali)."""
+    SHAPE_CACHE.resize(megabytes << 20)
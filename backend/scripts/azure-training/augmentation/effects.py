@@ -0,0 +1,100 @@
+"""
+Bozulma efektleri ve efekt kaydi (registry).
+
+Efektler rastgeleligi sadece `rng`den (np.random.Generator) alir.
+`params` sozlugu verilirse cekilen degerler manifest icin buna yazilir.
+
+Yerlesik efektler (scanner, phone, photocopy) profiles/ altindaki JSON
+pipeline'lardan derlenir; register_pipeline ile YAML/JSON spec'ten yeni
+efekt eklemek Python kodu gerektirmez.
+"""
+
+import numpy as np
+
+from .pipeline import Pipeline, PipelineContext, builtin_profile_path, load_pipeline_spec
+
+# Ad -> efekt fonksiyonu; kayit sirasi --single-random secimini belirler
+EFFECTS = {}
+
+# Yerlesik profiller, efekt sirasiyla
+BUILTIN_PROFILES = ("scanner", "phone", "photocopy")
+
+
+def register_effect(name, description):
+    """Efekti EFFECTS kaydina ekleyen dekorator."""
+    def decorator(fn):
+        fn.effect_name = name
+        fn.description = description
+        EFFECTS[name] = fn
+        return fn
+    return decorator
+
+
+def get_effect(name):
+    """Kayitli efekti dondurur; "a+b" adlari ilk kullanimda birlestirilip kaydedilir."""
+    if name not in EFFECTS and "+" in name:
+        return combined_effect(name)
+    try:
+        return EFFECTS[name]
+    except KeyError:
+        raise ValueError(f"Bilinmeyen efekt: {name} (mevcut: {', '.join(EFFECTS)})") from None
+
+
+def effect_fingerprint(name):
+    """Efektin tanimini ozetler; pipeline'lar icin spec ozeti, digerleri icin adi."""
+    fn = get_effect(name)
+    pipeline = getattr(fn, "pipeline", None)
+    if pipeline is not None:
+        return pipeline.fingerprint
+    return f"{fn.__module__}.{fn.__qualname__}"
+
+
+def pipeline_effect(pipeline):
+    """Derlenmis pipeline'i efekt imzasiyla sarar ve kaydeder."""
+    def effect(image, intensity=None, rng=None, params=None, fused=False, timer=None, scale=1.0, source=None,
+               size=None):
+        # Rastgele yogunluk (rng verilmezse tohumsuz)
+        if rng is None:
+            rng = np.random.default_rng()
+        if intensity is None:
+            intensity = rng.uniform(0.5, 1.5)
+        ctx = PipelineContext(rng, intensity, scale, source, size=size)
+        return pipeline.run(image, ctx, params, fused=fused, timer=timer)
+
+    effect.__name__ = effect.__qualname__ = f"{pipeline.name}_effect"
+    effect.__doc__ = pipeline.description
+    effect.pipeline = pipeline
+    return register_effect(pipeline.name, pipeline.description)(effect)
+
+
+def combined_effect(name):
+    """"scanner+phone" gibi bir adi tek pipeline'a derleyip kaydeder.
+
+    Bilesenlerin asamalari sirayla art arda eklenir; tek rng ve tek yogunluk
+    kullanilir. Yalnizca pipeline efektleri birlestirilebilir.
+    """
+    stages, descriptions = [], []
+    for part in name.split("+"):
+        pipeline = getattr(get_effect(part), "pipeline", None)
+        if pipeline is None:
+            raise ValueError(f"{name}: {part} bir pipeline efekti degil, birlestirilemez")
+        stages.extend(pipeline.spec["stages"])
+        descriptions.append(pipeline.description)
+    spec = {"name": name, "description": " + ".join(descriptions), "stages": stages}
+    return pipeline_effect(Pipeline.from_spec(spec))
+
+
+def register_pipeline(path):
+    """YAML/JSON spec dosyasini derleyip efekt olarak kaydeder, adini dondurur.
+
+    Ayni adla kayitli bir efekt varsa (yerlesik profiller dahil) yerini alir.
+    """
+    pipeline = Pipeline.from_spec(load_pipeline_spec(path))
+    pipeline_effect(pipeline)
+    return pipeline.name
+
+
+scanner_effect, phone_camera_effect, photocopy_effect = (
+    pipeline_effect(Pipeline.from_spec(load_pipeline_spec(builtin_profile_path(name))))
+    for name in BUILTIN_PROFILES
+)
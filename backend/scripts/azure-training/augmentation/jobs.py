@@ -0,0 +1,281 @@
+"""
+Is planlama ve calistirma: bir is, bir goruntuye bir efekt uygulayip bir sayfa uretir.
+
+Isler hem seri (map) hem surec havuzunda (Pool.imap) ayni sekilde calisir.
+"""
+
+import glob
+import os
+from collections import namedtuple
+
+import cv2
+
+from .cache import SourceCache, set_cache_limit
+from .effects import EFFECTS, get_effect, register_pipeline
+from .pipeline import PipelineContext
+from .pdf import DEFAULT_ENCODING, encode_page
+from .loading import read_reduced
+from .profiling import Spans
+from .seeding import job_rng
+
+IMAGE_PATTERNS = ['*.png', '*.PNG', '*.jpg', '*.JPG', '*.jpeg', '*.JPEG']
+
+# Yogunluk her is icin bu araliktan cekilir
+INTENSITY_RANGE = (0.4, 1.6)
+
+# name uzantisiz cikti adidir (sayfa-001_scanner, ekran-001). intensity yalnizca
+# --sweep islerinde doludur; aksi halde yogunluk rng'den cekilir.
+Job = namedtuple("Job", ["idx", "img_path", "effect_name", "name", "seed", "intensity"],
+                 defaults=(None,))
+# Okuma hatasinda jpeg ve error ikisi de None'dir; spans yalnizca --profile ile doludur
+Result = namedtuple("Result", ["job", "jpeg", "shape", "error", "intensity", "params", "spans"],
+                    defaults=(None,))
+
+# --batch kovalari: boyutlar bu kadar pikselin katina yuvarlanir (dolgu en
+# fazla BATCH_STEP - 1 piksel); bundan buyuk goruntuler tek basina islenir
+BATCH_STEP = 32
+BATCH_MAX_PIXELS = 4_000_000
+
+# Ayni goruntunun efektleri ardisik islerdir; son okunan goruntu ve renk
+# donusumleri (SourceCache) surec basina tutulur. Anahtar dosya boyutu ve
+# mtime'i da icerir: augment-watch ayni yola yazilan yeni goruntuyu yeniden okur.
+_last_image = (None, None, 1.0, None, None)
+
+
+def find_images(input_dir):
+    image_files = []
+    for pattern in IMAGE_PATTERNS:
+        image_files.extend(glob.glob(os.path.join(input_dir, pattern)))
+    return sorted(set(image_files))
+
+
+def plan_jobs(image_files, single_random, seed, effect_names=None, indices=None, intensities=None):
+    """Tum isleri seri calisma sirasiyla uretir.
+
+    Rastgelelik yalnizca job_rng'den gelir; isler hangi surecte ve hangi
+    sirayla calisirsa calissin ayni ciktiyi uretir. indices verilirse
+    ({img_path: sira}) goruntu sira numaralari listedeki konum yerine
+    oradan alinir (--incremental). intensities verilirse (--sweep) her
+    efekt bu yogunluklarin her biriyle uretilir (sayfa-001_scanner_i0.8);
+    bir goruntunun tum varyantlari ardisiktir.
+    """
+    effect_names = list(effect_names or EFFECTS)
+    variants = [(intensity, f"_i{intensity:g}") for intensity in intensities] if intensities else [(None, "")]
+    jobs = []
+    for position, img_path in enumerate(image_files, 1):
+        idx = indices[img_path] if indices else position
+        # --single-random modu: her goruntu icin rastgele TEK efekt
+        # Normal mod: her goruntu icin tum efektler
+        if single_random:
+            effect_name = effect_names[job_rng(seed, idx).integers(0, len(effect_names))]
+            for intensity, suffix in variants:
+                jobs.append(Job(idx, img_path, effect_name, f"ekran-{idx:03d}{suffix}", seed, intensity))
+        else:
+            # Kisa isim olustur (sayfa-001, sayfa-002, ...)
+            short_name = f"sayfa-{idx:03d}"
+            for effect_name in effect_names:
+                for intensity, suffix in variants:
+                    jobs.append(Job(idx, img_path, effect_name, f"{short_name}_{effect_name}{suffix}",
+                                    seed, intensity))
+    return jobs
+
+
+def job_intensity(job, rng):
+    """Isin yogunlugu.
+
+    Yogunluk --sweep'te de rng'den cekilir ve atilir: ayni (goruntu, efekt)
+    cifti her yogunlukta ayni rastgele cekimleri kullanir, sadece yogunluk
+    degisir.
+    """
+    intensity = rng.uniform(*INTENSITY_RANGE)
+    return intensity if job.intensity is None else job.intensity
+
+
+def read_image(img_path, spans, max_dpi=None):
+    """(goruntu, olcek, hedef boyut) dondurur; bkz. loading.read_reduced."""
+    with spans.measure("imread", "io") as record:
+        img, scale, size = read_reduced(img_path, max_dpi)
+        if img is not None:
+            record["nbytes"] = os.path.getsize(img_path)
+    return img, scale, size
+
+
+def image_key(img_path, max_dpi):
+    """Okunan goruntunun anahtari; dosya okunamiyorsa None (hic eslesmez)."""
+    try:
+        stat = os.stat(img_path)
+    except OSError:
+        return None
+    return (img_path, max_dpi, stat.st_size, stat.st_mtime_ns)
+
+
+def load_image(img_path, spans, max_dpi=None):
+    """(goruntu, olcek, SourceCache, hedef boyut) dondurur; ayni goruntunun isleri paylasir."""
+    global _last_image
+    key = image_key(img_path, max_dpi)
+    if key is None or _last_image[0] != key:
+        img, scale, size = read_image(img_path, spans, max_dpi)
+        _last_image = (key, img, scale, SourceCache(img) if img is not None else None, size)
+    return _last_image[1:]
+
+
+def encode(image, spans, encoding=DEFAULT_ENCODING):
+    """(sayfa baytlari, kodlanan boyut) dondurur; bkz. pdf.encode_page."""
+    with spans.measure("encode", "io") as record:
+        data, shape = encode_page(image, encoding)
+        record["nbytes"] = len(data)
+    return data, shape
+
+
+def run_job(job, fused=False, profile=False, max_dpi=None, encoding=DEFAULT_ENCODING):
+    """Isi calistirir ve Result dondurur.
+
+    Efekt ve JPEG kodlama iscide yapilir; PDF'e yazmak ana surecteki
+    cikti hedefinin (DirectorySink/CombinedPdfSink) isidir. fused=True
+    pipeline efektlerini birlesik float32 modunda calistirir. profile=True
+    okuma, efekt, asama ve kodlama surelerini Result.spans'e yazar.
+    max_dpi verilirse goruntu A4'te en fazla o DPI'ye denk gelecek boyutta
+    okunur ve efekt o boyutta calisir (kesirli kucultme pipeline'in ilk
+    geometry asamasina katilabilir, bkz. Pipeline.fit). encoding sayfanin nasil kodlanacagini
+    (kalite, gri, hedef boyut, kayipsiz) belirler; Result.shape kodlanan
+    boyuttur (gri kodlamada 2 boyutlu).
+    """
+    spans = Spans(profile)
+    img, scale, source, size = load_image(job.img_path, spans, max_dpi)
+    return run_loaded(job, img, scale, source, size, spans, fused, profile, encoding)
+
+
+def run_loaded(job, img, scale, source, size, spans, fused=False, profile=False, encoding=DEFAULT_ENCODING):
+    """run_job'un okuma sonrasi kismi (run_job_batch Python efektleri icin de kullanir)."""
+    if img is None:
+        return Result(job, None, None, None, None, None, spans if profile else None)
+    rng = job_rng(job.seed, job.idx, job.effect_name)
+    intensity = job_intensity(job, rng)
+    params = {}
+    try:
+        effect = get_effect(job.effect_name)
+        # Python ile kaydedilmis efektler fused/timer/scale/source argumanlarini bilmeyebilir
+        options = {"fused": True} if fused else {}
+        if hasattr(effect, "pipeline"):
+            options["source"] = source
+            if profile:
+                options["timer"] = spans.stage_timer(job.effect_name)
+            if scale != 1.0:
+                options["scale"] = scale
+            if size is not None:
+                options["size"] = size
+        elif size is not None:
+            img = source.resized(size).image
+        with spans.measure(job.effect_name, "effect") as record:
+            augmented = effect(img, intensity=intensity, rng=rng, params=params, **options)
+            record["nbytes"] = augmented.nbytes
+        jpeg, shape = encode(augmented, spans, encoding)
+        return Result(job, jpeg, shape, None, intensity, params, spans if profile else None)
+    except Exception as e:
+        return Result(job, None, None, str(e), intensity, params, spans if profile else None)
+
+
+def run_jobs(jobs, fused=False, max_dpi=None, encoding=DEFAULT_ENCODING):
+    """Ayni goruntunun islerini sirayla calistirir (goruntu bir kez okunur)."""
+    return [run_job(job, fused, max_dpi=max_dpi, encoding=encoding) for job in jobs]
+
+
+def group_jobs(jobs, images_per_group):
+    """Ardisik isleri en fazla images_per_group goruntuluk gruplara boler.
+
+    Bir goruntunun tum isleri ayni gruptadir; her grup run_job_batch'e
+    tek gorev olarak gider.
+    """
+    groups = []
+    current, images = [], set()
+    for job in jobs:
+        if job.img_path not in images and len(images) >= images_per_group:
+            groups.append(current)
+            current, images = [], set()
+        current.append(job)
+        images.add(job.img_path)
+    if current:
+        groups.append(current)
+    return groups
+
+
+def batch_key(job, img, position):
+    """(efekt, boyut sinifi); buyuk goruntuler kendi kovalarinda kalir."""
+    h, w = img.shape[:2]
+    if h * w > BATCH_MAX_PIXELS:
+        return (job.effect_name, position)
+    return (job.effect_name, -(-h // BATCH_STEP), -(-w // BATCH_STEP), img.shape[2:])
+
+
+def run_job_batch(jobs, fused=False, profile=False, max_dpi=None, encoding=DEFAULT_ENCODING):
+    """Is grubunu yiginlar halinde calistirir; Result listesi is sirasiyla doner.
+
+    Grubun her goruntusu bir kez okunur ve kendi SourceCache'ini alir.
+    Pipeline efektlerinin isleri (efekt, boyut sinifi) kovalarina ayrilir
+    ve her kova tek Pipeline.run_batch cagrisiyla islenir; boyut sinifi
+    BATCH_STEP'e yuvarlanmis boyuttur, kucuk farklar dolguyla ayni yigina
+    girer. Gurultu tablo ornekleyiciyle cekilir (PipelineContext.table_noise);
+    bu yuzden ciktilar varsayilan moddan farklidir, ama her is yine yalnizca
+    kendi rng'sine baglidir: grup boyutu ve komsu goruntuler sonucu
+    degistirmez. Python efektleri ve okunamayan goruntuler run_job gibi tek
+    tek islenir. profile=True iken yigin asamalarinin sureleri kovanin ilk
+    isine yazilir.
+    """
+    spans = [Spans(profile) for _ in jobs]
+    results = [None] * len(jobs)
+    loaded = {}
+    buckets = {}
+    for i, job in enumerate(jobs):
+        if job.img_path not in loaded:
+            img, scale, size = read_image(job.img_path, spans[i], max_dpi)
+            loaded[job.img_path] = (img, scale, SourceCache(img) if img is not None else None, size)
+        img, scale, source, size = loaded[job.img_path]
+        try:
+            pipeline = getattr(get_effect(job.effect_name), "pipeline", None)
+        except ValueError:
+            pipeline = None
+        if img is None or pipeline is None:
+            results[i] = run_loaded(job, img, scale, source, size, spans[i], fused, profile, encoding)
+        else:
+            buckets.setdefault(batch_key(job, img, i), []).append(i)
+
+    for (effect_name, *_), indices in buckets.items():
+        pipeline = get_effect(effect_name).pipeline
+        images, ctxs, params_list = [], [], []
+        for i in indices:
+            img, scale, source, size = loaded[jobs[i].img_path]
+            rng = job_rng(jobs[i].seed, jobs[i].idx, effect_name)
+            images.append(img)
+            ctxs.append(PipelineContext(rng, job_intensity(jobs[i], rng), scale, source, table_noise=True,
+                                        size=size))
+            params_list.append({})
+        first = spans[indices[0]]
+        try:
+            with first.measure(effect_name, "effect") as record:
+                timer = first.stage_timer(effect_name) if profile else None
+                outputs = pipeline.run_batch(images, ctxs, params_list, fused, timer)
+                record["nbytes"] = sum(out.nbytes for out in outputs)
+        except Exception as e:
+            for i, ctx, params in zip(indices, ctxs, params_list):
+                results[i] = Result(jobs[i], None, None, str(e), ctx.intensity, params,
+                                    spans[i] if profile else None)
+            continue
+        for i, augmented, ctx, params in zip(indices, outputs, ctxs, params_list):
+            try:
+                jpeg, shape = encode(augmented, spans[i], encoding)
+                results[i] = Result(jobs[i], jpeg, shape, None, ctx.intensity, params,
+                                    spans[i] if profile else None)
+            except Exception as e:
+                results[i] = Result(jobs[i], None, None, str(e), ctx.intensity, params,
+                                    spans[i] if profile else None)
+    return results
+
+
+def init_worker(pipeline_paths=(), cache_mb=None):
+    # spawn ile baslayan surecler ana surecin kaydini gormez; --pipeline efektleri yeniden derlenir
+    for path in pipeline_paths:
+        register_pipeline(path)
+    if cache_mb is not None:
+        set_cache_limit(cache_mb)
+    # Surecler zaten cekirdekleri paylasiyor, OpenCV'nin kendi thread havuzu asiri yuklemeye yol acar
+    cv2.setNumThreads(1)
@@ -0,0 +1,78 @@
+"""
+Goruntu okuma: --max-dpi ile buyuk taramalari dusuk cozunurlukte acar.
+
+Cikti PDF'i her zaman A4'e sigdirilir (pdf.A4_LAYOUT); sayfadaki etkin
+cozunurluk max(genislik / 8.27", yukseklik / 11.69") DPI'dir. Bunun
+ustundeki pikseller PDF'te yine atilacagi icin goruntu hedef DPI'ye
+kucultulerek okunur ve efektler o boyutta calisir.
+
+Boyut once yalnizca dosya basligindan (PIL, pikseller cozulmeden) okunur.
+JPEG'ler IMREAD_REDUCED_* ile DCT olceklemesi kullanilarak 1/2, 1/4 veya
+1/8 cozunurlukte cozulur; kalan kesirli oran INTER_AREA ile kapatilir.
+PNG'de OpenCV tam cozup kucultur, yine de efektler kucuk goruntude calisir.
+read_reduced kesirli kucultmeyi yapmaz: goruntuyu zaten yeniden ornekleyen
+ilk asama (geometry) onu kendi homografisine katar (bkz. Pipeline.fit).
+"""
+
+import cv2
+from PIL import Image
+
+A4_WIDTH_IN = 210 / 25.4
+A4_HEIGHT_IN = 297 / 25.4
+
+REDUCED_FLAGS = {
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+def page_dpi(width, height):
+    """A4'e sigdirilan w x h goruntunun sayfadaki etkin DPI'si."""
+    return max(width / A4_WIDTH_IN, height / A4_HEIGHT_IN)
+
+
+def image_size(img_path):
+    """(genislik, yukseklik) yalnizca basliktan; okunamazsa None."""
+    try:
+        with Image.open(img_path) as image:
+            return image.size
+    except (OSError, ValueError):
+        return None
+
+
+def read_scaled(img_path, max_dpi=None):
+    """Goruntuyu en fazla max_dpi etkin cozunurlukle okur; (goruntu, olcek) dondurur.
+
+    olcek okunan / tam boyut oranidir (1.0 = kucultulmedi). Piksel cinsinden
+    efekt parametreleri bu oranla olceklenir (bkz. PipelineContext.scale).
+    Okunamayan dosyada goruntu None'dir.
+    """
+    img, scale, target = read_reduced(img_path, max_dpi)
+    if target is not None:
+        img = cv2.resize(img, target, interpolation=cv2.INTER_AREA)
+    return img, scale
+
+
+def read_reduced(img_path, max_dpi=None):
+    """read_scaled gibi ama yalnizca tamsayi indirgemeyle; (goruntu, olcek, hedef) dondurur.
+
+    hedef, goruntu olcek x tam boyuttan buyuk okunduysa (genislik, yukseklik)
+    hedef boyutudur, aksi halde None. olcek her zaman hedefe goredir.
+    """
+    size = image_size(img_path) if max_dpi else None
+    scale = min(1.0, max_dpi / page_dpi(*size)) if size else 1.0
+    if scale == 1.0:
+        return cv2.imread(img_path), 1.0, None
+
+    # Hedeften kucuk olmayan en guclu indirgeme
+    reduction = max([1] + [r for r in REDUCED_FLAGS if r * scale <= 1.0])
+    img = cv2.imread(img_path, REDUCED_FLAGS.get(reduction, cv2.IMREAD_COLOR))
+    if img is None:
+        return None, 1.0, None
+    width, height = size
+    if (img.shape[1] >= img.shape[0]) != (width >= height):
+        # EXIF yonu uygulandi; baslik boyutu donuk
+        width, height = height, width
+    target = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return img, scale, None if (img.shape[1], img.shape[0]) == target else target
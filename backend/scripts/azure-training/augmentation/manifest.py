@@ -0,0 +1,73 @@
+"""
+Manifest yardimcilari: efekt parametrelerini JSON'a yazilabilir hale getirir
+ve calisma manifest'ini (augment-manifest.json) gunceller.
+"""
+
+import json
+import os
+import time
+
+import numpy as np
+
+from .pdf import atomic_write
+
+
+def to_json_value(value):
+    """numpy skalerlerini/dizilerini ve tuple'lari JSON'a yazilabilir hale getirir."""
+    if isinstance(value, dict):
+        return {k: to_json_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json_value(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def write_json(path, data):
+    """JSON'u atomik olarak yazar."""
+    atomic_write(path, json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8"))
+
+
+MANIFEST_NAME = "augment-manifest.json"
+
+# Bunlardan biri degisirse onceki ciktilar baska bir calismaya aittir
+MERGE_KEYS = ("seed", "single_random", "combine", "archive", "fused", "batched", "sweep", "max_dpi",
+              "encoding")
+# Sonradan eklenen mod anahtarlari; eski manifest'lerde ve vermeyen scriptlerde kapali sayilir
+FLAG_KEYS = ("fused", "batched")
+
+
+def update_manifest(output_dir, settings, entries, removed=()):
+    """Her cikti icin tohum, yogunluk ve efekt parametrelerini yazar.
+
+    settings calisma ayarlaridir (script, seed, effects, ...). Ayni
+    ayarlarla yapilmis onceki bir calismanin manifest'i varsa (ornek:
+    --only ile kismi yeniden uretim) kayitlar onunla birlestirilir;
+    `removed` adlari manifest'ten cikarilir.
+    """
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    outputs = {}
+    if os.path.exists(manifest_path):
+        try:
+            with open(manifest_path, "r") as f:
+                previous = json.load(f)
+            if all(previous.get(key, False if key in FLAG_KEYS else None)
+                   == settings.get(key, False if key in FLAG_KEYS else None)
+                   for key in MERGE_KEYS):
+                outputs = {e["name"]: e for e in previous.get("outputs", [])}
+        except (OSError, ValueError, KeyError):
+            pass
+    for name in removed:
+        outputs.pop(name, None)
+    for entry in entries:
+        outputs[entry["name"]] = entry
+
+    manifest = {
+        **settings,
+        "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "outputs": sorted(outputs.values(), key=lambda e: e["name"]),
+    }
+    write_json(manifest_path, manifest)
+    return manifest_path
@@ -0,0 +1,106 @@
+"""
+Pipeline spec'lerindeki parametre ifadeleri.
+
+Bir parametre sabit (sayi, metin, liste) ya da asagidaki sozluk
+bicimlerinden biri olabilir; sinirlar da yine ifade olabilir:
+
+    {"uniform": [lo, hi]}             rng.uniform(lo, hi)
+    {"randint": [lo, hi]}             rng.integers(lo, hi)  (hi haric)
+    {"randint": [lo, hi], "size": 3}  3 elemanli liste
+    {"choice": [a, b, c]}             listeden biri
+    {"linear": [a, b]}                a + b * yogunluk
+    {"below": x, "then": v, "else": u}  yogunluk < x ise v, degilse u
+
+Ek anahtarlar sonuca sirayla uygulanir:
+    "times_intensity": true  -> deger * yogunluk
+    "int": true              -> int(deger)
+    "min": m, "max": M       -> [m, M] araligina kirpma
+"""
+
+FORMS = ("uniform", "randint", "choice", "linear", "below")
+MODIFIERS = ("times_intensity", "int", "min", "max", "size", "then", "else")
+
+
+def validate(spec, where):
+    """Spec'i derleme sirasinda dogrular; hatali ifade ValueError verir."""
+    if isinstance(spec, list):
+        for item in spec:
+            validate(item, where)
+        return
+    if not isinstance(spec, dict):
+        return
+    forms = [key for key in spec if key in FORMS]
+    unknown = [key for key in spec if key not in FORMS and key not in MODIFIERS]
+    if len(forms) != 1 or unknown:
+        raise ValueError(f"{where}: gecersiz parametre ifadesi {spec!r}")
+    form = forms[0]
+    if form == "below":
+        if "then" not in spec or "else" not in spec:
+            raise ValueError(f"{where}: 'below' ifadesi 'then' ve 'else' ister")
+        validate(spec["then"], where)
+        validate(spec["else"], where)
+    elif form == "choice":
+        if not isinstance(spec[form], list) or not spec[form]:
+            raise ValueError(f"{where}: 'choice' bos olmayan bir liste ister")
+    elif not isinstance(spec[form], list) or len(spec[form]) != 2:
+        raise ValueError(f"{where}: '{form}' iki elemanli bir liste ister")
+    else:
+        validate(spec[form], where)
+
+
+def resolve(spec, ctx):
+    """Ifadeyi ctx.rng ve ctx.intensity ile degerlendirir."""
+    if isinstance(spec, list):
+        return [resolve(item, ctx) for item in spec]
+    if not isinstance(spec, dict):
+        return spec
+
+    if "uniform" in spec:
+        lo, hi = resolve(spec["uniform"], ctx)
+        value = ctx.rng.uniform(lo, hi)
+    elif "randint" in spec:
+        lo, hi = resolve(spec["randint"], ctx)
+        size = spec.get("size")
+        value = ctx.rng.integers(lo, hi, size)
+        value = value.tolist() if size else int(value)
+    elif "choice" in spec:
+        options = spec["choice"]
+        value = resolve(options[int(ctx.rng.integers(0, len(options)))], ctx)
+    elif "linear" in spec:
+        a, b = resolve(spec["linear"], ctx)
+        value = a + b * ctx.intensity
+    else:
+        value = resolve(spec["then"] if ctx.intensity < spec["below"] else spec["else"], ctx)
+
+    if spec.get("times_intensity"):
+        value = value * ctx.intensity
+    if spec.get("int"):
+        value = int(value)
+    if "min" in spec:
+        value = max(spec["min"], value)
+    if "max" in spec:
+        value = min(spec["max"], value)
+    return value
+
+
+class StageParams:
+    """Bir asamanin parametreleri; her biri ilk erisimde bir kez cekilir.
+
+    Cekim sirasi asamanin kodundaki erisim sirasidir, boylece ayni tohum
+    ayni sonucu verir. Cekilen degerler `values` icinde manifest'e gider.
+    draw() ayni ifadeden her cagrida yeni bir deger ceker (ornek: her toz
+    noktasi icin yaricap) ve kaydedilmez.
+    """
+
+    def __init__(self, specs, ctx):
+        self.specs = specs
+        self.ctx = ctx
+        self.values = {}
+
+    def __getitem__(self, name):
+        if name not in self.values:
+            self.values[name] = resolve(self.specs[name], self.ctx)
+        return self.values[name]
+
+    def draw(self, name):
+        return resolve(self.specs[name], self.ctx)
@@ -0,0 +1,265 @@
+"""
+PDF uretimi: bellekte JPEG kodlama, tek sayfalik A4 PDF ve akan cok sayfali PDF.
+
+Sayfa goruntusu varsayilan olarak kalite 90 JPEG'dir. Encoding ile:
+  gray       kanallari esit (gri) sayfalar tek kanalli kodlanir
+  target_kb  JPEG kalitesi ikili aramayla bu boyutu gecmeyen en yuksek
+             degere ayarlanir (min_quality altina inilmez)
+  lossless   ayni sayfanin PNG'si (PDF'te FlateDecode) daha kucukse o
+             kullanilir; faks/ikili gibi az tonlu sayfalarda kayipsiz ve
+             kucuk. PNG boyutu once satir bantlarindan tahmin edilir;
+             gurultulu sayfalarda tam PNG kodlamasi hic yapilmaz.
+"""
+
+import os
+import struct
+from collections import namedtuple
+
+import cv2
+import img2pdf
+import numpy as np
+
+# A4 sayfaya sigdir (img2pdf.FitMode.into)
+A4_WIDTH_PT = img2pdf.mm_to_pt(210)
+A4_HEIGHT_PT = img2pdf.mm_to_pt(297)
+A4_LAYOUT = img2pdf.get_layout_fun(
+    fit=img2pdf.FitMode.into,
+    pagesize=(A4_WIDTH_PT, A4_HEIGHT_PT)
+)
+
+
+def atomic_write(path, data):
+    """Veriyi ayni klasorde gecici dosyaya yazip tek rename ile yerine koyar.
+
+    Okuyanlar (ornek: build-dataset.mjs --local) yarim yazilmis PDF gormez.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+Encoding = namedtuple("Encoding", ["quality", "gray", "target_kb", "lossless"],
+                      defaults=(90, False, None, False))
+DEFAULT_ENCODING = Encoding()
+
+# --target-kb ikili aramasinin alt siniri
+MIN_QUALITY = 30
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# 9'a yakin boyut, gurultulu sayfalarda cok daha hizli
+PNG_COMPRESSION = 6
+# Kayipsiz tahmin: goruntunun 1/16'si, esit aralikli 8 bant
+LOSSLESS_SAMPLE_BANDS = 8
+LOSSLESS_SAMPLE_FRACTION = 16
+
+
+def is_gray(cv_image):
+    """Uc kanali birbirine esit BGR goruntu (ornek: fotokopi to_bgr ciktisi)."""
+    if cv_image.ndim == 2:
+        return True
+    if cv_image.shape[2] != 3:
+        return False
+    return (np.array_equal(cv_image[:, :, 0], cv_image[:, :, 1])
+            and np.array_equal(cv_image[:, :, 0], cv_image[:, :, 2]))
+
+
+def encode_jpeg(cv_image, quality=90):
+    """OpenCV image -> JPEG baytlari (bellekte)."""
+    ok, jpeg = cv2.imencode('.jpg', cv_image, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+    if not ok:
+        raise RuntimeError("JPEG kodlanamadi")
+    return jpeg.tobytes()
+
+
+def encode_png(cv_image):
+    """OpenCV image -> PNG baytlari (kayipsiz; PDF'e FlateDecode olarak gomulur)."""
+    ok, png = cv2.imencode('.png', cv_image, [int(cv2.IMWRITE_PNG_COMPRESSION), PNG_COMPRESSION])
+    if not ok:
+        raise RuntimeError("PNG kodlanamadi")
+    return png.tobytes()
+
+
+def estimate_png_size(cv_image):
+    """Esit aralikli satir bantlarinin PNG boyutundan tum sayfanin PNG boyutu."""
+    h = cv_image.shape[0]
+    # Kucuk sayfalarda bant en az 16 satir; ornek sayfanin yarisini gecerse tahmin yapilmaz
+    band = max(16, h // (LOSSLESS_SAMPLE_BANDS * LOSSLESS_SAMPLE_FRACTION))
+    if 2 * LOSSLESS_SAMPLE_BANDS * band > h:
+        return 0
+    starts = np.linspace(0, h - band, LOSSLESS_SAMPLE_BANDS).astype(int)
+    sample = np.concatenate([cv_image[start:start + band] for start in starts])
+    return len(encode_png(sample)) * h / sample.shape[0]
+
+
+def encode_jpeg_for_size(cv_image, target_bytes, max_quality=90):
+    """target_bytes'i gecmeyen en yuksek kaliteli JPEG (ikili arama).
+
+    MIN_QUALITY bile sigmiyorsa MIN_QUALITY JPEG'i doner. Ayni goruntu icin
+    sonuc kararlidir.
+    """
+    best = None
+    lo, hi = min(MIN_QUALITY, max_quality), max_quality
+    floor = lo
+    while lo <= hi:
+        quality = (lo + hi) // 2
+        jpeg = encode_jpeg(cv_image, quality)
+        if len(jpeg) <= target_bytes:
+            best, lo = jpeg, quality + 1
+        else:
+            hi = quality - 1
+    return best if best is not None else encode_jpeg(cv_image, floor)
+
+
+def encoding_settings(encoding):
+    """Manifest ve durum gunlugu icin kodlama ayarlari; varsayilan kodlama None."""
+    return None if encoding == DEFAULT_ENCODING else encoding._asdict()
+
+
+def encode_page(cv_image, encoding=DEFAULT_ENCODING):
+    """Sayfa goruntusunu kodlar; (JPEG veya PNG baytlari, kodlanan boyut) dondurur.
+
+    Boyut gri kodlamada (yukseklik, genislik) olur; PDF yazicilari kanal
+    sayisini buradan alir.
+    """
+    if encoding.gray and cv_image.ndim == 3 and is_gray(cv_image):
+        cv_image = cv2.cvtColor(cv_image, cv2.COLOR_BGR2GRAY)
+    if encoding.target_kb:
+        data = encode_jpeg_for_size(cv_image, encoding.target_kb * 1024, encoding.quality)
+    else:
+        data = encode_jpeg(cv_image, encoding.quality)
+    # Tahmin %10 payla JPEG'i geciyorsa (gurultulu sayfa) PNG denenmez
+    if encoding.lossless and estimate_png_size(cv_image) < 1.1 * len(data):
+        png = encode_png(cv_image)
+        if len(png) < len(data):
+            data = png
+    return data, cv_image.shape
+
+
+def png_stream(png):
+    """PNG'nin birlesik IDAT verisi; PDF'e /Predictor 15 ile oldugu gibi gomulur."""
+    pos, chunks = len(PNG_SIGNATURE), []
+    while pos < len(png):
+        length, kind = struct.unpack(">I4s", png[pos:pos + 8])
+        if kind == b"IDAT":
+            chunks.append(png[pos + 8:pos + 8 + length])
+        elif kind == b"IEND":
+            break
+        pos += 12 + length
+    return b"".join(chunks)
+
+
+def jpeg_to_pdf(jpeg):
+    """JPEG (veya encode_page'in PNG'si) baytlari -> tek sayfalik A4 PDF baytlari."""
+    # Tarih ve zamana bagli /ID yazilmaz; ayni tohum bayt bayt ayni PDF'i uretir
+    return img2pdf.convert(jpeg, layout_fun=A4_LAYOUT,
+                           nodate=True, engine=img2pdf.Engine.internal)
+
+
+def encode_pdf(cv_image, quality=90):
+    """OpenCV image -> A4 PDF baytlari; JPEG bellekte kodlanir, diske ara dosya yazilmaz."""
+    return jpeg_to_pdf(encode_jpeg(cv_image, quality))
+
+
+def save_as_pdf(cv_image, pdf_path):
+    """OpenCV image -> A4 PDF; PDF boyutunu dondurur"""
+    pdf_bytes = encode_pdf(cv_image)
+    atomic_write(pdf_path, pdf_bytes)
+    return len(pdf_bytes)
+
+
+class StreamingPdfWriter:
+    """JPEG sayfalarini cok sayfali A4 PDF'e akitarak yazar.
+
+    Her sayfa eklendigi anda diske yazilir; bellekte sadece nesne ofsetleri
+    tutulur, sayfa sayisi ne olursa olsun bellek kullanimi sabit kalir.
+    Dosya gecici adla yazilir ve close() ile tek rename'le yerine konur.
+    Sayfa yerlesimi jpeg_to_pdf ile aynidir (A4'e sigdir, ortala).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.tmp_path = f"{path}.{os.getpid()}.tmp"
+        self.file = open(self.tmp_path, "wb")
+        self.offsets = {}
+        self.page_ids = []
+        # 1: Catalog, 2: Pages (sayfa listesi belli olunca close()'da yazilir)
+        self.next_id = 3
+        self.file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._write_object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+    @property
+    def page_count(self):
+        return len(self.page_ids)
+
+    def tell(self):
+        return self.file.tell()
+
+    def _write_object(self, obj_id, body, stream=None):
+        self.offsets[obj_id] = self.file.tell()
+        self.file.write(b"%d 0 obj\n" % obj_id)
+        self.file.write(body)
+        if stream is not None:
+            self.file.write(b"\nstream\n")
+            self.file.write(stream)
+            self.file.write(b"\nendstream")
+        self.file.write(b"\nendobj\n")
+
+    def add_jpeg(self, jpeg, width, height, channels=3):
+        """JPEG'i yeni bir A4 sayfasi olarak ekler; sayfa numarasini (1'den) dondurur."""
+        return self._add_image(jpeg, width, height, channels, b"/Filter /DCTDecode")
+
+    def add_png(self, png, width, height, channels=3):
+        """8 bit, taramasiz PNG'yi (encode_png) kod cozmeden FlateDecode olarak ekler."""
+        decode = b"/Filter /FlateDecode /DecodeParms << /Predictor 15 /Colors %d /BitsPerComponent 8 /Columns %d >>" % (
+            channels, width)
+        return self._add_image(png_stream(png), width, height, channels, decode)
+
+    def add_image(self, data, width, height, channels=3):
+        """encode_page ciktisini (JPEG veya PNG) ekler."""
+        if data.startswith(PNG_SIGNATURE):
+            return self.add_png(data, width, height, channels)
+        return self.add_jpeg(data, width, height, channels)
+
+    def _add_image(self, stream, width, height, channels, filters):
+        image_id, content_id, page_id = self.next_id, self.next_id + 1, self.next_id + 2
+        self.next_id += 3
+
+        colorspace = b"/DeviceGray" if channels == 1 else b"/DeviceRGB"
+        self._write_object(image_id, (
+            b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace %s "
+            b"/BitsPerComponent 8 %s /Length %d >>"
+        ) % (width, height, colorspace, filters, len(stream)), stream)
+
+        scale = min(A4_WIDTH_PT / width, A4_HEIGHT_PT / height)
+        draw_w, draw_h = width * scale, height * scale
+        content = b"q %.4f 0 0 %.4f %.4f %.4f cm /Im0 Do Q" % (
+            draw_w, draw_h, (A4_WIDTH_PT - draw_w) / 2, (A4_HEIGHT_PT - draw_h) / 2
+        )
+        self._write_object(content_id, b"<< /Length %d >>" % len(content), content)
+
+        self._write_object(page_id, (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.4f %.4f] "
+            b"/Resources << /XObject << /Im0 %d 0 R >> >> /Contents %d 0 R >>"
+        ) % (A4_WIDTH_PT, A4_HEIGHT_PT, image_id, content_id))
+        self.page_ids.append(page_id)
+        return self.page_count
+
+    def close(self):
+        kids = b" ".join(b"%d 0 R" % page_id for page_id in self.page_ids)
+        self._write_object(2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, self.page_count))
+
+        xref_offset = self.file.tell()
+        self.file.write(b"xref\n0 %d\n0000000000 65535 f \n" % self.next_id)
+        for obj_id in range(1, self.next_id):
+            self.file.write(b"%010d 00000 n \n" % self.offsets[obj_id])
+        self.file.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+            self.next_id, xref_offset
+        ))
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
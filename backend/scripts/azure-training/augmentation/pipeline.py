@@ -0,0 +1,345 @@
+"""
+Bildirimsel (YAML/JSON) augmentation pipeline'lari.
+
+Spec ornegi (profiles/ altindaki yerlesik profillere bakin):
+
+    {
+      "name": "fax",
+      "description": "Faks efekti",
+      "stages": [
+        {"type": "grayscale"},
+        {"type": "rotate", "angle": {"uniform": [-2, 2]}},
+        {"type": "noise", "p": 0.5, "sigma": {"linear": [2, 4], "int": true}}
+      ]
+    }
+
+Spec bir kez Pipeline'a derlenir (asama siniflari ve parametre ifadeleri
+dogrulanir), sonra her goruntu icin yeniden kullanilir. "p" < 1 olan asama
+o olasilikla uygulanir; atlanan asama manifest'te null olarak gorunur.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+from .stages import STAGES
+
+PROFILES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles")
+
+
+def quantize(buf):
+    """Birlesik modun float32 tamponunu yerinde kirpar ve uint8'e cevirir."""
+    np.clip(buf, 0, 255, out=buf)
+    return buf.astype(np.uint8)
+
+
+class PipelineContext:
+    """Bir calistirmanin rng'si ve yogunlugu; parametre ifadeleri bunu okur.
+
+    scale, goruntu kucultulerek okunduysa (--max-dpi) okunan / tam boyut
+    oranidir. Piksel cinsinden parametreler (kenar genisligi, toz yaricapi,
+    cizgi araligi, gurultu, bulaniklik) cekildikten sonra asamada bu oranla
+    olceklenir; cekilen degerler ve manifest tam boyuta gore kalir.
+
+    source, kaynak goruntunun SourceCache'idir (verilirse); ayni goruntunun
+    varyantlari gri/LAB donusumlerini paylasir.
+
+    size, goruntu --max-dpi hedefinden buyuk okunduysa (yalnizca tamsayi
+    indirgemeyle) hedef (genislik, yukseklik)'tir; bkz. Pipeline.fit.
+
+    table_noise=True iken gurultu normal dagilim yerine tablo ornekleyiciyle
+    cekilir (bkz. stages.noise_table; --batch modu).
+    """
+
+    def __init__(self, rng, intensity, scale=1.0, source=None, table_noise=False, size=None):
+        self.rng = rng
+        self.intensity = intensity
+        self.scale = scale
+        self.source = source
+        self.table_noise = table_noise
+        self.size = size
+
+
+class ImageStack:
+    """Bir kovadaki goruntulerin N x H x W [x C] yigini.
+
+    Goruntuler sol ust koseye yaslanir; H x W kovadaki en buyuk boyuttur,
+    kalan alan dolgudur. sizes her goruntunun gercek (h, w)'sidir; asamalar
+    yalnizca view(i) bolgesini okur, dolgu hicbir sonuca karismaz.
+    pristine[i], i. satir hala kaynak goruntuyle ayniysa True'dur (SourceCache
+    donusumleri icin).
+    """
+
+    def __init__(self, images):
+        self.sizes = [image.shape[:2] for image in images]
+        h = max(size[0] for size in self.sizes)
+        w = max(size[1] for size in self.sizes)
+        self.array = np.zeros((len(images), h, w) + images[0].shape[2:], dtype=images[0].dtype)
+        for i, image in enumerate(images):
+            self.view(i)[...] = image
+        self.pristine = [True] * len(images)
+
+    @staticmethod
+    def compatible(images):
+        """Goruntuler ayni kanal duzenindeyse (ve ayni turdeyse) yiginlanabilir."""
+        first = images[0]
+        return all(image.shape[2:] == first.shape[2:] and image.ndim == first.ndim
+                   and image.dtype == first.dtype for image in images)
+
+    def view(self, i):
+        h, w = self.sizes[i]
+        return self.array[i, :h, :w]
+
+    def unstack(self):
+        return [self.view(i).copy() for i in range(len(self.sizes))]
+
+
+class Pipeline:
+    """Derlenmis asama dizisi."""
+
+    def __init__(self, name, stages, description="", spec=None):
+        self.name = name
+        self.stages = stages
+        self.description = description or name
+        self.spec = spec
+
+    @property
+    def fingerprint(self):
+        """Spec'in kararli ozeti; --incremental spec degisince ciktilari yeniler."""
+        canonical = json.dumps(self.spec, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+    @classmethod
+    def from_spec(cls, spec):
+        """Spec sozlugunu dogrulayip derler; hatalar ValueError verir."""
+        if not isinstance(spec, dict) or not spec.get("name"):
+            raise ValueError("Pipeline spec'inde 'name' zorunlu")
+        name = spec["name"]
+        stage_specs = spec.get("stages")
+        if not isinstance(stage_specs, list) or not stage_specs:
+            raise ValueError(f"{name}: 'stages' bos olmayan bir liste olmali")
+
+        stages = []
+        labels = set()
+        for i, stage_spec in enumerate(stage_specs, 1):
+            stage_spec = dict(stage_spec)
+            stage_type = stage_spec.pop("type", None)
+            if stage_type not in STAGES:
+                raise ValueError(
+                    f"{name}: {i}. asamanin tipi gecersiz: {stage_type!r} "
+                    f"(mevcut: {', '.join(sorted(STAGES))})"
+                )
+            stage = STAGES[stage_type](**stage_spec)
+            # Ayni tipten birden fazla asama manifest'te ayri anahtarlar alir
+            if stage.label in labels:
+                if "label" in stage_spec:
+                    raise ValueError(f"{name}: '{stage.label}' etiketi tekrar ediyor")
+                n = 2
+                while f"{stage.label}_{n}" in labels:
+                    n += 1
+                stage.label = f"{stage.label}_{n}"
+            labels.add(stage.label)
+            stages.append(stage)
+        return cls(name, stages, spec.get("description", ""), spec)
+
+    def run(self, image, ctx, params=None, fused=False, timer=None):
+        """Asamalari sirayla uygular; cekilen degerler params[label]'a yazilir.
+
+        Girdi goruntu hicbir zaman degistirilmez: yerinde calisan bir asama
+        henuz kopyasi alinmamis girdiye veya salt okunur bir diziye
+        (ctx.source onbellegi) gelirse once kopya alinir.
+
+        fused=True: ardisik fusable asamalar tek bir float32 tamponu yerinde
+        gunceller ve zincirin sonunda bir kez uint8'e kuantalanir. Ara
+        uint8/int16/float kopyalari olusmaz; tepe bellek yaklasik iki
+        goruntu tamponudur (uint8 girdi + float32 tampon).
+
+        timer(label, saniye) verilirse her uygulanan asamadan sonra cagrilir
+        (benchmark ve --profile icin).
+        """
+        if params is None:
+            params = {}
+        image = self.fit(image, ctx)
+        source = image
+        buf = None
+        for stage in self.stages:
+            if stage.p < 1.0 and ctx.rng.random() >= stage.p:
+                params[stage.label] = None
+                continue
+            start = time.perf_counter()
+            stage_params = stage.param_values(ctx)
+            if fused and stage.fusable:
+                if buf is None:
+                    buf = image.astype(np.float32)
+                    image = None
+                stage.apply_float(buf, stage_params, ctx)
+            else:
+                if buf is not None:
+                    image, buf = quantize(buf), None
+                if stage.in_place and (image is source or not image.flags.writeable):
+                    image = image.copy()
+                image = stage.apply(image, stage_params, ctx)
+            params[stage.label] = stage_params.values
+            if timer is not None:
+                timer(stage.label, time.perf_counter() - start)
+        if buf is not None:
+            start = time.perf_counter()
+            image = quantize(buf)
+            if timer is not None:
+                timer("quantize", time.perf_counter() - start)
+        return image
+
+    def fit(self, image, ctx):
+        """Goruntuyu ctx.size'a (--max-dpi hedefi) getirir.
+
+        Ilk asama kosulsuz (p = 1) ve olcegi homografisine katabilen bir
+        asamaysa (geometry) goruntu oldugu gibi kalir; kucultme o asamanin tek
+        yeniden orneklemesine katilir. Aksi halde INTER_AREA ile kucultulur;
+        girdi kaynak goruntuyse sonuc ve donusumleri ctx.source uzerinden
+        ayni goruntunun diger efektleriyle paylasilir.
+        """
+        if ctx.size is None:
+            return image
+        first = self.stages[0]
+        if first.folds_size and first.p == 1.0:
+            return image
+        if ctx.source is not None and image is ctx.source.image:
+            ctx.source = ctx.source.resized(ctx.size)
+            image = ctx.source.image
+        else:
+            image = cv2.resize(image, ctx.size, interpolation=cv2.INTER_AREA)
+        ctx.size = None
+        return image
+
+    def run_batch(self, images, ctxs, params_list=None, fused=False, timer=None):
+        """Goruntu listesini tek yiginda (ImageStack) isler, cikti listesi dondurur.
+
+        Her goruntu kendi ctx'ini kullanir ve cekimleri run() ile ayni sirada
+        yapilir: i. cikti run(images[i], ctxs[i], params_list[i], fused) ile
+        birebir aynidir ve yigindaki diger goruntulere bagli degildir. Girdi
+        goruntuler degistirilmez.
+
+        apply_batch'i olan asamalar yigini tek islemde gunceller; digerleri
+        goruntu goruntu yigin gorunumleri uzerinde calisir. Kaynagiyla ayni
+        kalan satirlar asamaya ctx.source.image olarak verilir (SourceCache
+        isabet eder). Bir asama boyutu veya kanal sayisini goruntuler arasinda
+        farkli degistirirse ya da birlesik modda p < 1 yuzunden goruntulerin
+        tampon turu ayrisirsa kalan asamalar goruntu goruntu (run() gibi)
+        calisir. timer asama basina bir kez, tum yigin icin cagrilir.
+        """
+        if params_list is None:
+            params_list = [{} for _ in images]
+        stack = ImageStack([self.fit(image, ctx) for image, ctx in zip(images, ctxs)])
+        listed = None
+        for stage in self.stages:
+            active = []
+            for i, (ctx, params) in enumerate(zip(ctxs, params_list)):
+                if stage.p < 1.0 and ctx.rng.random() >= stage.p:
+                    params[stage.label] = None
+                else:
+                    active.append(i)
+            if not active:
+                continue
+            start = time.perf_counter()
+            items = [(i, stage.param_values(ctxs[i]), ctxs[i]) for i in active]
+            use_float = fused and stage.fusable
+            if listed is None:
+                is_float = stack.array.dtype == np.float32
+                if use_float != is_float and len(active) < len(images):
+                    listed = stack.unstack()
+                elif use_float and not is_float:
+                    stack.array = stack.array.astype(np.float32)
+                elif is_float and not use_float:
+                    stack.array = quantize(stack.array)
+            if listed is None:
+                stack = apply_stack(stage, stack, items, use_float)
+                if isinstance(stack, list):
+                    listed = stack
+            else:
+                for i, stage_params, ctx in items:
+                    listed[i] = apply_one(stage, listed[i], stage_params, ctx, use_float)
+            for i, stage_params, _ in items:
+                params_list[i][stage.label] = stage_params.values
+            if timer is not None:
+                timer(stage.label, time.perf_counter() - start)
+        outputs = listed if listed is not None else stack.unstack()
+        return [quantize(image) if image.dtype == np.float32 else image for image in outputs]
+
+    def __repr__(self):
+        return f"<Pipeline {self.name}: {' > '.join(s.label for s in self.stages)}>"
+
+
+def apply_stack(stage, stack, items, use_float):
+    """Asamayi yigindaki secili satirlara uygular; yigini veya (boyutlar
+    ayristiysa) goruntu listesini dondurur."""
+    if stage.apply_batch(stack, items) is not NotImplemented:
+        for i, _, _ in items:
+            stack.pristine[i] = False
+        return stack
+    outputs = {}
+    for i, p, ctx in items:
+        view = stack.view(i)
+        if use_float:
+            stage.apply_float(view, p, ctx)
+            continue
+        image = view
+        if ctx.source is not None and stack.pristine[i] and not stage.in_place:
+            image = ctx.source.image
+        out = stage.apply(image, p, ctx)
+        if out is not view:
+            outputs[i] = out
+    for i, _, _ in items:
+        stack.pristine[i] = False
+    if all(out.shape == stack.view(i).shape for i, out in outputs.items()):
+        for i, out in outputs.items():
+            stack.view(i)[...] = out
+        return stack
+    rows = [outputs[i] if i in outputs else stack.view(i) for i in range(len(stack.sizes))]
+    if ImageStack.compatible(rows):
+        restacked = ImageStack(rows)
+        restacked.pristine = stack.pristine
+        return restacked
+    return [outputs[i] if i in outputs else stack.view(i).copy() for i in range(len(stack.sizes))]
+
+
+def apply_one(stage, image, p, ctx, use_float):
+    """Liste modunda tek goruntuye run() ile ayni adim."""
+    if use_float:
+        if image.dtype != np.float32:
+            image = image.astype(np.float32)
+        stage.apply_float(image, p, ctx)
+        return image
+    if image.dtype == np.float32:
+        image = quantize(image)
+    if stage.in_place and not image.flags.writeable:
+        image = image.copy()
+    return stage.apply(image, p, ctx)
+
+
+def load_pipeline_spec(path):
+    """.json veya .yaml/.yml pipeline spec'ini okur.
+
+    PyYAML yalnizca YAML dosyasi verildiginde gerekir.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if path.endswith((".yaml", ".yml")):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError(f"{path}: YAML spec icin PyYAML gerekli (pip install pyyaml) "
+                             "veya spec'i JSON olarak yazin") from None
+        return yaml.safe_load(text)
+    return json.loads(text)
+
+
+def load_pipeline(path):
+    return Pipeline.from_spec(load_pipeline_spec(path))
+
+
+def builtin_profile_path(name):
+    return os.path.join(PROFILES_DIR, f"{name}.json")
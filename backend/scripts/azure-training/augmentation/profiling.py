@@ -0,0 +1,143 @@
+"""
+--profile: asama ve G/C sureleri, bayt sayilari, ozet tablo ve Chrome trace.
+
+Isci surecler her is icin bir Spans listesi doldurur ve Result ile ana
+surece gonderir; ana surecteki Profile bunlari toplar. Her span'de ad,
+kategori, baslangic, sure, bayt ve pid tutulur. Kategoriler:
+  io       imread (dosya boyutu), encode (JPEG boyutu), pdf_write (PDF boyutu)
+  effect   efektin tamami (cikti goruntu tampon boyutu)
+  <efekt>  o efektin pipeline asamalari (Pipeline.run timer kancasi)
+
+Chrome trace dosyasi chrome://tracing veya ui.perfetto.dev ile acilir;
+her surec ayri bir satirdir, asamalar efekt span'inin altinda gorunur.
+"""
+
+import json
+import os
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+import numpy as np
+
+Span = namedtuple("Span", ["name", "cat", "start", "seconds", "nbytes", "pid"])
+
+# Histogram kova sinirlari (ms); son kova bunlarin ustu
+HISTOGRAM_EDGES_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+HISTOGRAM_CHARS = " .:-=+*#%@"
+
+
+class Spans(list):
+    """Bir isin olcumleri. enabled=False iken kayit tutulmaz."""
+
+    def __init__(self, enabled=True):
+        super().__init__()
+        self.enabled = enabled
+
+    def add(self, name, cat, start, seconds, nbytes=0):
+        if self.enabled:
+            self.append(Span(name, cat, start, seconds, int(nbytes), os.getpid()))
+
+    @contextmanager
+    def measure(self, name, cat):
+        """Blogu olcer; bayt sayisi yield edilen dict'in "nbytes" alanina yazilir."""
+        record = {"nbytes": 0}
+        start, t0 = time.time(), time.perf_counter()
+        yield record
+        self.add(name, cat, start, time.perf_counter() - t0, record["nbytes"])
+
+    def stage_timer(self, effect_name):
+        """Pipeline.run(timer=...) icin asama kaydedici."""
+        def timer(label, seconds):
+            self.add(label, effect_name, time.time() - seconds, seconds)
+        return timer
+
+
+def histogram(seconds):
+    """Sureleri HISTOGRAM_EDGES_MS kovalarina sayar."""
+    buckets = np.searchsorted(HISTOGRAM_EDGES_MS, np.asarray(seconds) * 1000, side="right")
+    return np.bincount(buckets, minlength=len(HISTOGRAM_EDGES_MS) + 1)
+
+
+def sparkline(counts):
+    top = counts.max()
+    scale = len(HISTOGRAM_CHARS) - 1
+    return "".join(HISTOGRAM_CHARS[int(np.ceil(c / top * scale))] for c in counts)
+
+
+class Profile(Spans):
+    """Ana surecteki toplayici: isci span'lerini ve kendi G/C olcumlerini tutar."""
+
+    def __init__(self, enabled=True):
+        super().__init__(enabled)
+        self.origin = time.time()
+
+    def summary(self):
+        """(kategori, ad) basina istatistik satirlari.
+
+        Sira: G/C adimlari, sonra her efekt ve altinda toplam sureye gore
+        azalan asamalari.
+        """
+        groups = {}
+        for span in self:
+            groups.setdefault((span.cat, span.name), []).append(span)
+
+        def row(cat, name):
+            spans = groups[(cat, name)]
+            seconds = np.array([span.seconds for span in spans])
+            return {
+                "cat": cat,
+                "name": name,
+                "count": len(spans),
+                "total_s": float(seconds.sum()),
+                "mean_ms": 1000 * float(seconds.mean()),
+                "p50_ms": 1000 * float(np.percentile(seconds, 50)),
+                "p95_ms": 1000 * float(np.percentile(seconds, 95)),
+                "max_ms": 1000 * float(seconds.max()),
+                "bytes": sum(span.nbytes for span in spans),
+                "histogram": histogram(seconds).tolist(),
+            }
+
+        rows = [row(cat, name) for cat, name in groups if cat == "io"]
+        for cat, effect_name in groups:
+            if cat != "effect":
+                continue
+            rows.append(row("effect", effect_name))
+            stages = [row(cat, name) for cat, name in groups if cat == effect_name]
+            rows.extend(sorted(stages, key=lambda r: -r["total_s"]))
+        return rows
+
+    def print_summary(self):
+        edges = "/".join(str(edge) for edge in HISTOGRAM_EDGES_MS)
+        print(f"{'ADIM':26s} {'ADET':>6s} {'TOPLAM s':>9s} {'ORT ms':>8s} {'p50':>8s} "
+              f"{'p95':>8s} {'MAKS':>8s} {'MB':>8s}  HISTOGRAM (ms: {edges}/+)")
+        for row in self.summary():
+            if row["cat"] in ("io", "effect"):
+                label = row["name"] if row["cat"] == "io" else f"{row['name']} (efekt)"
+            else:
+                label = f"  {row['name']}"
+            mb = f"{row['bytes'] / 2**20:8.1f}" if row["bytes"] else f"{'-':>8s}"
+            print(f"{label:26s} {row['count']:6d} {row['total_s']:9.2f} {row['mean_ms']:8.1f} "
+                  f"{row['p50_ms']:8.1f} {row['p95_ms']:8.1f} {row['max_ms']:8.1f} {mb}  "
+                  f"[{sparkline(np.array(row['histogram']))}]")
+
+    def write_trace(self, path):
+        """Chrome trace / Perfetto JSON'u (tam sureli "X" olaylari) yazar."""
+        main_pid = os.getpid()
+        events = []
+        for pid in sorted({span.pid for span in self}):
+            name = "ana surec" if pid == main_pid else f"isci {pid}"
+            events.append({"name": "process_name", "ph": "M", "pid": pid, "tid": pid, "args": {"name": name}})
+        for span in self:
+            events.append({
+                "name": span.name,
+                "cat": span.cat,
+                "ph": "X",
+                "ts": round((span.start - self.origin) * 1e6),
+                "dur": round(span.seconds * 1e6),
+                "pid": span.pid,
+                "tid": span.pid,
+                "args": {"bytes": span.nbytes} if span.nbytes else {},
+            })
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
@@ -0,0 +1,26 @@
+"""
+Tekrarlanabilir rastgelelik: her (goruntu sirasi, efekt) cifti kendi Generator'unu kullanir.
+"""
+
+import zlib
+import numpy as np
+
+
+def new_seed():
+    """--seed verilmediginde kullanilan yeni kok tohum (manifest'e yazilir)."""
+    return np.random.SeedSequence().entropy
+
+
+def effect_key(effect_name):
+    # Efekt listesindeki siradan bagimsiz, kararli bir sayi
+    return zlib.crc32(effect_name.encode("utf-8"))
+
+
+def job_rng(seed, idx, effect_name=None):
+    """(goruntu sirasi, efekt) ciftine ozel Generator.
+
+    Her cikti kendi SeedSequence'inden beslenir; bir PDF, diger islerden
+    bagimsiz olarak ayni tohumla tek basina yeniden uretilebilir.
+    """
+    entropy = [seed, idx] if effect_name is None else [seed, idx, effect_key(effect_name)]
+    return np.random.default_rng(np.random.SeedSequence(entropy))
@@ -0,0 +1,198 @@
+"""
+Cikti hedefleri: isci sureclerden gelen JPEG sayfalarini diske yazar.
+"""
+
+import io
+import json
+import os
+import tarfile
+import time
+import zipfile
+
+from .manifest import write_json
+from .pdf import atomic_write, jpeg_to_pdf, StreamingPdfWriter
+
+
+class DirectorySink:
+    """Varsayilan mod: her cikti ayri, tek sayfalik bir PDF."""
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+
+    def add(self, job, jpeg, shape):
+        pdf_name = f"{job.name}.pdf"
+        pdf_bytes = jpeg_to_pdf(jpeg)
+        atomic_write(os.path.join(self.output_dir, pdf_name), pdf_bytes)
+        return {"file": pdf_name}, len(pdf_bytes)
+
+    def close(self):
+        pass
+
+
+class CombinedPdfSink:
+    """--combine modu: sayfalari cok sayfali PDF'lere akitir.
+
+    group_by="effect" her efekt icin ayri dosya (scanner-001.pdf, ...),
+    group_by="chunk" sirayla tek dosya dizisi (parca-001.pdf, ...) uretir.
+    pages_per_file dolunca yeni parca acilir (0 = sinirsiz). Her PDF'in
+    yanina sayfa -> kaynak goruntu/efekt eslemesini veren bir JSON yazilir.
+    """
+
+    def __init__(self, output_dir, group_by, pages_per_file):
+        self.output_dir = output_dir
+        self.group_by = group_by
+        self.pages_per_file = pages_per_file
+        self.open_files = {}
+        self.part_numbers = {}
+
+    def _open(self, group):
+        part = self.part_numbers.get(group, 0) + 1
+        self.part_numbers[group] = part
+        pdf_name = f"{group}-{part:03d}.pdf"
+        entry = {
+            "name": pdf_name,
+            "writer": StreamingPdfWriter(os.path.join(self.output_dir, pdf_name)),
+            "pages": [],
+        }
+        self.open_files[group] = entry
+        return entry
+
+    def _finish(self, entry):
+        entry["writer"].close()
+        sidecar = {"file": entry["name"], "page_count": len(entry["pages"]), "pages": entry["pages"]}
+        sidecar_path = os.path.join(self.output_dir, entry["name"][:-len(".pdf")] + ".json")
+        write_json(sidecar_path, sidecar)
+
+    def add(self, job, jpeg, shape):
+        group = job.effect_name if self.group_by == "effect" else "parca"
+        entry = self.open_files.get(group)
+        if entry is not None and self.pages_per_file and entry["writer"].page_count >= self.pages_per_file:
+            self._finish(entry)
+            entry = None
+        if entry is None:
+            entry = self._open(group)
+
+        writer = entry["writer"]
+        start = writer.tell()
+        channels = shape[2] if len(shape) == 3 else 1
+        page = writer.add_image(jpeg, shape[1], shape[0], channels)
+        entry["pages"].append({
+            "page": page,
+            "name": job.name,
+            "source": os.path.basename(job.img_path),
+            "index": job.idx,
+            "effect": job.effect_name,
+        })
+        return {"file": entry["name"], "page": page}, writer.tell() - start
+
+    def close(self):
+        for entry in self.open_files.values():
+            self._finish(entry)
+        self.open_files = {}
+
+
+ARCHIVE_INDEX_NAME = "archive-index.json"
+
+
+class ArchiveSink:
+    """--archive modu: PDF'ler tek tek dosya yerine tar/zip arsivlerine akitilir.
+
+    Her PDF bellekte uretilip arsive sirayla eklenir; ara dosya olusmaz,
+    binlerce kucuk dosya yerine birkac buyuk dosyaya ardisik yazilir.
+    shard_bytes > 0 ise parca o boyuta ulasinca yenisi acilir
+    (augmented-00001.tar, augmented-00002.tar, ...). Zip uyeleri
+    sikistirilmadan (STORED) yazilir; PDF'ler zaten JPEG'dir.
+
+    archive-index.json her PDF icin parca adini, parca icindeki bayt
+    ofsetini ve boyutunu tutar; build-dataset.mjs --local PDF'leri
+    arsivi acmadan bu ofsetlerden okur. Parcalar gecici adla yazilir ve
+    kapaninca yerine konur; indeks her kapanan parcadan sonra guncellenir.
+    Onceki calismanin indeksindeki, bu calismada yeniden yazilmayan
+    parcalar close()'da silinir.
+    """
+
+    def __init__(self, output_dir, archive_format, shard_bytes=0):
+        self.output_dir = output_dir
+        self.format = archive_format
+        self.shard_bytes = shard_bytes
+        self.index_path = os.path.join(output_dir, ARCHIVE_INDEX_NAME)
+        self.previous_shards = self._previous_shards()
+        self.shards = []
+        self.current = None
+        self.mtime = int(time.time())
+
+    def _previous_shards(self):
+        try:
+            with open(self.index_path, "r") as f:
+                return [shard["file"] for shard in json.load(f)["shards"]]
+        except (OSError, ValueError, KeyError):
+            return []
+
+    def _open(self):
+        name = f"augmented-{len(self.shards) + 1:05d}.{self.format}"
+        tmp_path = os.path.join(self.output_dir, f"{name}.{os.getpid()}.tmp")
+        f = open(tmp_path, "wb")
+        if self.format == "tar":
+            archive = tarfile.open(fileobj=f, mode="w")
+        else:
+            archive = zipfile.ZipFile(f, "w", zipfile.ZIP_STORED)
+        self.current = {"file": name, "tmp_path": tmp_path, "fileobj": f, "archive": archive, "entries": []}
+
+    def _write(self, name, data):
+        """Uyeyi ekler, verinin parca icindeki bayt ofsetini dondurur."""
+        archive = self.current["archive"]
+        if self.format == "tar":
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = self.mtime
+            info.mode = 0o644
+            archive.addfile(info, io.BytesIO(data))
+            # Veri 512 baytlik bloga doldurulur; baslik boyutu ada gore degisebilir
+            padded = -(-len(data) // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE
+            return self.current["fileobj"].tell() - padded
+        info = zipfile.ZipInfo(name, time.localtime(self.mtime)[:6])
+        info.external_attr = 0o644 << 16
+        archive.writestr(info, data)
+        return self.current["fileobj"].tell() - len(data)
+
+    def _finish(self):
+        entry = self.current
+        entry["archive"].close()
+        size = entry["fileobj"].tell()
+        entry["fileobj"].close()
+        os.replace(entry["tmp_path"], os.path.join(self.output_dir, entry["file"]))
+        self.shards.append({"file": entry["file"], "size": size, "entries": entry["entries"]})
+        self.current = None
+        write_json(self.index_path, {"format": self.format, "shards": self.shards})
+
+    def add(self, job, jpeg, shape):
+        pdf_name = f"{job.name}.pdf"
+        pdf_bytes = jpeg_to_pdf(jpeg)
+        entry = self.current
+        if (entry is not None and self.shard_bytes and entry["entries"]
+                and entry["fileobj"].tell() + len(pdf_bytes) > self.shard_bytes):
+            self._finish()
+        if self.current is None:
+            self._open()
+        offset = self._write(pdf_name, pdf_bytes)
+        self.current["entries"].append({
+            "name": pdf_name,
+            "offset": offset,
+            "size": len(pdf_bytes),
+            "source": os.path.basename(job.img_path),
+            "index": job.idx,
+            "effect": job.effect_name,
+        })
+        return {"file": pdf_name, "archive": self.current["file"], "offset": offset}, len(pdf_bytes)
+
+    def close(self):
+        if self.current is not None:
+            self._finish()
+        written = {shard["file"] for shard in self.shards}
+        for name in self.previous_shards:
+            if name not in written:
+                try:
+                    os.remove(os.path.join(self.output_dir, name))
+                except FileNotFoundError:
+                    pass
+        self.previous_shards = []
@@ -0,0 +1,820 @@
+"""
+Pipeline asamalari: her bozulma adimi yeniden kullanilabilir bir Stage sinifidir.
+
+Her asama `defaults` ile parametrelerini ve varsayilan ifadelerini
+(bkz. params.py) tanimlar; spec'teki degerler bunlari ezer. Asamalar
+STAGES kaydina `type_name` ile eklenir ve spec'te "type" ile secilir.
+"""
+
+import functools
+import math
+
+import cv2
+import numpy as np
+
+from .cache import SHAPE_CACHE
+from .masks import apply_edge_mask
+from .params import StageParams, validate
+
+# type_name -> Stage sinifi
+STAGES = {}
+
+# Gradyan ve birlesik moddaki gurultu bu kadar satirlik parcalarla uretilir
+ROW_CHUNK = 256
+
+# Tablo ornekleyicinin girdi sayisi (uint16 cekim basina bir deger)
+NOISE_TABLE_SIZE = 1 << 16
+
+
+def register_stage(cls):
+    """Stage sinifini STAGES kaydina ekleyen dekorator."""
+    STAGES[cls.type_name] = cls
+    return cls
+
+
+class Stage:
+    """Pipeline asamasi.
+
+    apply(image, p, ctx) yeni (veya in_place ise ayni) goruntuyu dondurur;
+    `p` StageParams'tir, `ctx` rng ve yogunlugu tasir. in_place=True olan
+    asamalar girdiyi yerinde degistirir; Pipeline gerekirse once kopyalar.
+
+    fusable=True olan asamalar apply_float(buf, p, ctx) ile float32 bir
+    tamponu yerinde gunceller (birlesik mod, bkz. Pipeline.run). Rastgele
+    cekimler apply ile ayni sirada yapilir; ara adimlarda kirpma/yuvarlama
+    olmadigi icin sonuc uint8 moddan piksel duzeyinde biraz farklidir.
+
+    Piksel cinsinden parametreler kullanilirken scaled/scaled_px ile
+    ctx.scale'e gore olceklenir (--max-dpi); scale 1 iken degismez.
+
+    apply_batch(stack, items) yigini (bkz. pipeline.ImageStack) tek islemde
+    gunceller; items (satir, p, ctx) listesidir. Sonuc her satir icin tek
+    goruntu yoluyla (yiginin turune gore apply/apply_float) birebir ayni
+    olmalidir. Varsayilan NotImplemented'dir: Pipeline.run_batch asamayi
+    goruntu goruntu uygular.
+    """
+
+    type_name = None
+    defaults = {}
+    in_place = False
+    fusable = False
+    # True: ilk asamayken ctx.size kucultmesini kendi orneklemesine katar (bkz. Pipeline.fit)
+    folds_size = False
+
+    def __init__(self, label=None, p=1.0, **params):
+        unknown = sorted(set(params) - set(self.defaults))
+        if unknown:
+            raise ValueError(
+                f"{self.type_name}: bilinmeyen parametre(ler) {', '.join(unknown)} "
+                f"(gecerli: {', '.join(self.defaults) or '-'})"
+            )
+        if not 0.0 <= p <= 1.0:
+            raise ValueError(f"{self.type_name}: p 0 ile 1 arasinda olmali")
+        for name, spec in params.items():
+            validate(spec, f"{self.type_name}.{name}")
+        self.label = label or self.type_name
+        self.p = p
+        self.specs = {**self.defaults, **params}
+
+    def param_values(self, ctx):
+        return StageParams(self.specs, ctx)
+
+    def apply(self, image, p, ctx):
+        raise NotImplementedError
+
+    def apply_float(self, buf, p, ctx):
+        raise NotImplementedError
+
+    def apply_batch(self, stack, items):
+        return NotImplemented
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.label} p={self.p}>"
+
+
+def add_gaussian_noise(image, sigma, rng):
+    """Isaretli gauss gurultusu ekler, 0-255'e kirpar."""
+    noise = rng.normal(0, sigma, image.shape).astype(np.int16)
+    return (image.astype(np.int16) + noise).clip(0, 255).astype(np.uint8)
+
+
+@functools.lru_cache(maxsize=64)
+def noise_table(sigma):
+    """trunc(N(0, sigma)) dagiliminin NOISE_TABLE_SIZE girdili int8 tablosu.
+
+    Tablodan esit olasilikla secilen deger, add_gaussian_noise'un
+    normal cekimini int16'ya kesmesiyle ayni dagilimdadir; olasiliklar
+    1/65536'ya yuvarlanir (simetrik kalir), bu yuzden ~4 sigma otesindeki
+    kuyruk kesilir. Bir uint16 cekimi float64 normal cekiminden ~10 kat ucuzdur.
+    Degerler int8'e sigmiyorsa None doner.
+    """
+    limit = int(math.ceil(6 * sigma)) + 1 if sigma > 0 else 0
+    if limit > 127:
+        return None
+
+    def cdf(x):
+        return 0.5 * (1.0 + math.erf(x / (sigma * math.sqrt(2.0))))
+
+    # trunc: |n| = k, n in (k, k+1) (ve negatif aynasi)
+    counts = [round((cdf(k + 1) - cdf(k)) * NOISE_TABLE_SIZE) for k in range(1, limit + 1)]
+    values = np.arange(-limit, limit + 1, dtype=np.int8)
+    counts = counts[::-1] + [NOISE_TABLE_SIZE - 2 * sum(counts)] + counts
+    table = np.repeat(values, counts)
+    table.flags.writeable = False
+    return table
+
+
+def table_noise(shape, sigma, rng):
+    """noise_table'dan `shape` boyutunda int8 gurultu; tablo yoksa None."""
+    table = noise_table(float(sigma))
+    if table is None:
+        return None
+    return np.take(table, rng.integers(0, NOISE_TABLE_SIZE, shape, dtype=np.uint16))
+
+
+def distance_grid(h, w):
+    """(2h-1) x (2w-1) float32 izgara: (h-1, w-1) merkezine uzaklik.
+
+    Herhangi bir (cx, cy) merkezinin h x w uzaklik alani bu izgaranin
+    kaydirilmis bir gorunumudur; boyut basina bir kez kurulur (SHAPE_CACHE).
+    Onbellege sigmiyorsa None doner.
+    """
+    def build():
+        dy2 = (np.arange(2*h - 1, dtype=np.float32) - np.float32(h - 1)) ** 2
+        dx2 = (np.arange(2*w - 1, dtype=np.float32) - np.float32(w - 1)) ** 2
+        return np.sqrt(dy2[:, None] + dx2[None, :])
+
+    return SHAPE_CACHE.get(("distance", h, w), build, 4 * (2*h - 1) * (2*w - 1))
+
+
+def light_gradient_rows(h, w, cx, cy, strength, r0, r1):
+    """(cx, cy) merkezinden uzaklastikca kararan radyal isik gradyaninin
+    [r0, r1) satirlari (float32 carpanlar).
+
+    Uzaklik alani onbellekteki izgaradan kaydirilarak alinir; sigmiyorsa
+    ayrilabilir float32 kare toplamlarindan kurulur. Iki yol da ayni
+    float32 degerleri verir.
+    """
+    grid = distance_grid(h, w)
+    if grid is not None:
+        dist = grid[h - 1 - cy + r0:h - 1 - cy + r1, w - 1 - cx:2*w - 1 - cx]
+        gradient = dist * np.float32(-strength / np.sqrt(w**2 + h**2))
+    else:
+        dy2 = (np.arange(r0, r1, dtype=np.float32) - np.float32(cy)) ** 2
+        dx2 = (np.arange(w, dtype=np.float32) - np.float32(cx)) ** 2
+        gradient = np.sqrt(dy2[:, None] + dx2[None, :])
+        gradient *= np.float32(-strength / np.sqrt(w**2 + h**2))
+    gradient += np.float32(1.0)
+    return gradient
+
+
+def apply_light_gradient(image, cx, cy, strength):
+    """Radyal isik gradyanini uygular (bkz. light_gradient_rows).
+
+    Satir parcalariyla calisir: float32 ara diziler tam goruntu boyutunda
+    olusmaz, sonuc tek gecisteki carp/kirp/kes ile birebir aynidir.
+    """
+    h, w = image.shape[:2]
+    out = np.empty_like(image)
+    for r0, r1 in row_chunks(h):
+        gradient = light_gradient_rows(h, w, cx, cy, strength, r0, r1)
+        if image.ndim == 3:
+            gradient = gradient[:, :, np.newaxis]
+        rows = image[r0:r1] * gradient
+        np.clip(rows, 0, 255, out=rows)
+        out[r0:r1] = rows
+    return out
+
+
+def row_chunks(h):
+    # Birlesik modda gecici diziler bu kadar satirla sinirli kalir
+    for r0 in range(0, h, ROW_CHUNK):
+        yield r0, min(h, r0 + ROW_CHUNK)
+
+
+def channel_lut(factor):
+    return (np.arange(256, dtype=np.float32) * np.float32(factor)).clip(0, 255).astype(np.uint8)
+
+
+def bgr_lut(blue, red):
+    """Mavi ve kirmizi kanali olcekleyen 3 kanalli LUT (cv2.LUT tek geciste uygular)."""
+    identity = np.arange(256, dtype=np.uint8)
+    return np.stack([channel_lut(blue), identity, channel_lut(red)], axis=1)[:, np.newaxis, :]
+
+
+def scaled(value, ctx):
+    """Piksel cinsinden surekli parametreyi calisma cozunurlugune olcekler."""
+    return value if ctx.scale == 1.0 else value * ctx.scale
+
+
+def scaled_px(value, ctx, minimum=1):
+    """Piksel cinsinden tamsayi parametreyi olcekler (en az `minimum`, None = sinirsiz)."""
+    if ctx.scale == 1.0:
+        return value
+    px = int(round(value * ctx.scale))
+    return px if minimum is None else max(minimum, px)
+
+
+def convert_color(image, code, ctx):
+    """cv2.cvtColor; girdi kaynak goruntuyse sonuc ctx.source'tan paylasilir."""
+    if ctx.source is None:
+        return cv2.cvtColor(image, code)
+    return ctx.source.convert(image, code)
+
+
+def border_value(color):
+    # Spec'te tek sayi (gri) veya [b, g, r] listesi olabilir
+    return tuple(color) if isinstance(color, list) else color
+
+
+# ============================================
+# GEOMETRI
+# ============================================
+
+@register_stage
+class Rotate(Stage):
+    """Merkez etrafinda hafif dondurme (tarayicida egik kagit)."""
+
+    type_name = "rotate"
+    defaults = {
+        "angle": {"uniform": [-1.5, 1.5], "times_intensity": True},
+        "border_color": {"randint": [235, 250], "size": 3},
+    }
+
+    def apply(self, image, p, ctx):
+        h, w = image.shape[:2]
+        M = cv2.getRotationMatrix2D((w/2, h/2), p["angle"], 1.0)
+        return cv2.warpAffine(image, M, (w, h), borderValue=border_value(p["border_color"]))
+
+
+@register_stage
+class Perspective(Stage):
+    """Kose kaydirmali perspektif (telefon tam duz tutulmaz).
+
+    Kose kaymasi en fazla min(w, h) * margin_ratio * yogunluk pikseldir.
+    """
+
+    type_name = "perspective"
+    defaults = {
+        "margin_ratio": 0.015,
+        "bg_color": {"randint": [230, 245], "size": 3},
+    }
+
+    def apply(self, image, p, ctx):
+        h, w = image.shape[:2]
+        M = perspective_matrix(w, h, p, ctx)
+        return cv2.warpPerspective(image, M, (w, h), borderValue=border_value(p["bg_color"]))
+
+
+def perspective_matrix(w, h, p, ctx):
+    """Rastgele kose kaymali perspektif matrisi; koseler p.values'a yazilir."""
+    rng = ctx.rng
+    margin = max(1, int(min(w, h) * p["margin_ratio"] * ctx.intensity))
+    src_pts = np.float32([[0, 0], [w, 0], [w, h], [0, h]])
+    dst_pts = np.float32([
+        [rng.integers(0, margin+1), rng.integers(0, margin+1)],
+        [w - rng.integers(0, margin+1), rng.integers(0, margin*2+1)],
+        [w - rng.integers(0, margin*2+1), h - rng.integers(0, margin+1)],
+        [rng.integers(0, margin*2+1), h - rng.integers(0, margin+1)]
+    ])
+    p.values["corners"] = dst_pts.tolist()
+    return cv2.getPerspectiveTransform(src_pts, dst_pts)
+
+
+@register_stage
+class Geometry(Stage):
+    """Dondurme + perspektif + olcekleme tek homografi ve tek yeniden ornekleme.
+
+    Ayri rotate / perspective / boyutlandirma asamalarinin her biri goruntuyu
+    bastan ornekler; her gecis hem tam goruntu maliyeti hem interpolasyon
+    bulanikligi ekler. Burada matrisler (olcek x perspektif x dondurme)
+    carpilir ve goruntu bir kez warpPerspective ile orneklenir. Cekimler
+    rotate ve perspective ile ayni anlamdadir (margin_ratio 0 = perspektif
+    yok). Cikti boyutu `size` ([genislik, yukseklik], oran korunarak icine
+    sigdirilir) veya `scale` ile secilir; size verilirse scale yok sayilir.
+
+    Pipeline'in ilk asamasiysa --max-dpi'in kalan kesirli kucultmesi de
+    (ctx.size) ayni homografiye katilir; boyut parametreleri o hedefe gore
+    okunur. 2x'ten guclu kucultmede dogrusal ornekleme ortusme (aliasing)
+    yapacagi icin goruntu once pyrDown ile suzulup yarilanir (matris buna
+    gore duzeltilir), kalan oran en fazla 2x olur.
+    """
+
+    type_name = "geometry"
+    defaults = {
+        "angle": 0.0,
+        "margin_ratio": 0.0,
+        "scale": 1.0,
+        "size": None,
+        "border_color": {"randint": [235, 250], "size": 3},
+    }
+    folds_size = True
+
+    def output_size(self, w, h, p):
+        if p["size"] is not None:
+            factor = min(p["size"][0] / w, p["size"][1] / h)
+        else:
+            factor = p["scale"]
+        return max(1, round(w * factor)), max(1, round(h * factor))
+
+    def apply(self, image, p, ctx):
+        h, w = image.shape[:2]
+        target, ctx.size = ctx.size, None
+        M = np.eye(3)
+        if p["angle"]:
+            M = np.vstack([cv2.getRotationMatrix2D((w/2, h/2), p["angle"], 1.0), [0, 0, 1]])
+        if p["margin_ratio"]:
+            M = perspective_matrix(w, h, p, ctx) @ M
+        out_w, out_h = self.output_size(*(target or (w, h)), p)
+        if (out_w, out_h) != (w, h):
+            # Piksel merkezleri hizali (cv2.resize gibi): x' = sx * (x + 0.5) - 0.5
+            sx, sy = out_w / w, out_h / h
+            M = np.array([[sx, 0, (sx - 1) / 2], [0, sy, (sy - 1) / 2], [0, 0, 1.0]]) @ M
+        if np.array_equal(M, np.eye(3)):
+            return image
+        factor = min(out_w / w, out_h / h)
+        while factor < 0.5:
+            # pyrDown ciktisinin (x, y) pikseli girdinin (2x, 2y) pikselidir
+            image = cv2.pyrDown(image)
+            M = M @ np.diag([2.0, 2.0, 1.0])
+            factor *= 2
+        return cv2.warpPerspective(image, M, (out_w, out_h), borderValue=border_value(p["border_color"]))
+
+
+@register_stage
+class Downscale(Stage):
+    """Kucultup geri buyutme: dusuk cozunurluklu tarama / faks gorunumu."""
+
+    type_name = "downscale"
+    defaults = {
+        "factor": {"uniform": [0.35, 0.6]},
+        "upscale": "nearest",
+    }
+
+    def apply(self, image, p, ctx):
+        h, w = image.shape[:2]
+        # Hedef tarama cozunurlugu mutlaktir; kucuk okunmus goruntude oran buyur
+        factor = min(1.0, p["factor"] / ctx.scale)
+        small = cv2.resize(image, (max(1, int(w * factor)), max(1, int(h * factor))),
+                           interpolation=cv2.INTER_AREA)
+        interpolation = cv2.INTER_NEAREST if p["upscale"] == "nearest" else cv2.INTER_LINEAR
+        return cv2.resize(small, (w, h), interpolation=interpolation)
+
+
+# ============================================
+# TON / RENK
+# ============================================
+
+@register_stage
+class Clahe(Stage):
+    """L kanalinda (gri goruntude dogrudan) CLAHE kontrast artisi."""
+
+    type_name = "clahe"
+    defaults = {
+        "clip_limit": {"linear": [1.0, 1.0]},
+        "tile_grid": [8, 8],
+    }
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.clahe_objects = {}
+
+    def clahe(self, clip_limit, tile_grid):
+        # CLAHE nesnesi izgara basina bir kez olusturulur, her goruntude sadece esik degisir
+        tile_grid = tuple(tile_grid)
+        clahe = self.clahe_objects.get(tile_grid)
+        if clahe is None:
+            clahe = self.clahe_objects[tile_grid] = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=tile_grid)
+        else:
+            clahe.setClipLimit(clip_limit)
+        return clahe
+
+    def apply(self, image, p, ctx):
+        clahe = self.clahe(p["clip_limit"], p["tile_grid"])
+        if image.ndim == 2:
+            return clahe.apply(image)
+        lab = convert_color(image, cv2.COLOR_BGR2LAB, ctx)
+        l, a, b = cv2.split(lab)
+        l = clahe.apply(l)
+        return cv2.cvtColor(cv2.merge([l, a, b]), cv2.COLOR_LAB2BGR)
+
+
+@register_stage
+class Gradient(Stage):
+    """Radyal isik gradyani; merkez goruntunun orta bolgesinden cekilir."""
+
+    type_name = "gradient"
+    defaults = {
+        "strength": {"linear": [0.15, 0.15]},
+        "center_range": [0.25, 0.75],
+    }
+    fusable = True
+
+    def center(self, h, w, p, ctx):
+        lo, hi = p["center_range"]
+        cx = int(ctx.rng.integers(int(w * lo), int(w * hi)))
+        cy = int(ctx.rng.integers(int(h * lo), int(h * hi)))
+        p.values["light_center"] = [cx, cy]
+        return cx, cy
+
+    def apply(self, image, p, ctx):
+        h, w = image.shape[:2]
+        cx, cy = self.center(h, w, p, ctx)
+        return apply_light_gradient(image, cx, cy, p["strength"])
+
+    def apply_float(self, buf, p, ctx):
+        h, w = buf.shape[:2]
+        cx, cy = self.center(h, w, p, ctx)
+        strength = p["strength"]
+        for r0, r1 in row_chunks(h):
+            gradient = light_gradient_rows(h, w, cx, cy, strength, r0, r1)
+            buf[r0:r1] *= gradient[:, :, np.newaxis] if buf.ndim == 3 else gradient
+
+    def apply_batch(self, stack, items):
+        # Merkezler goruntu basina cekilir; carpma tum yiginda tek islemde
+        array = stack.array
+        gradients = np.ones((len(items),) + array.shape[1:3], dtype=np.float32)
+        for k, (i, p, ctx) in enumerate(items):
+            h, w = stack.sizes[i]
+            cx, cy = self.center(h, w, p, ctx)
+            gradients[k, :h, :w] = light_gradient_rows(h, w, cx, cy, p["strength"], 0, h)
+        if array.ndim == 4:
+            gradients = gradients[..., np.newaxis]
+        rows = [i for i, _, _ in items]
+        whole = len(rows) == len(array)
+        out = (array if whole else array[rows]) * gradients
+        if array.dtype == np.uint8:
+            np.clip(out, 0, 255, out=out)
+        if whole:
+            array[...] = out
+        else:
+            array[rows] = out
+
+
+@register_stage
+class WhiteBalance(Stage):
+    """Mavi/kirmizi kanal kaymasi (telefon beyaz dengesi)."""
+
+    type_name = "white_balance"
+    defaults = {
+        "blue": {"uniform": [0.95, 1.0]},
+        "red": {"uniform": [1.0, 1.05]},
+    }
+    in_place = True
+    fusable = True
+
+    def apply(self, image, p, ctx):
+        blue, red = p["blue"], p["red"]
+        if image.ndim == 3:
+            cv2.LUT(image, bgr_lut(blue, red), dst=image)
+        return image
+
+    def apply_float(self, buf, p, ctx):
+        blue, red = p["blue"], p["red"]
+        if buf.ndim == 3:
+            buf[:, :, 0] *= np.float32(blue)
+            buf[:, :, 2] *= np.float32(red)
+            np.minimum(buf[:, :, 2], 255, out=buf[:, :, 2])
+
+    def apply_batch(self, stack, items):
+        # uint8'de goruntu basina tek 3 kanalli LUT yigin aritmetiginden hizli
+        array = stack.array
+        if array.dtype != np.float32:
+            return NotImplemented
+        rows = [i for i, _, _ in items]
+        blue = np.array([p["blue"] for _, p, _ in items], dtype=np.float32)[:, None, None]
+        red = np.array([p["red"] for _, p, _ in items], dtype=np.float32)[:, None, None]
+        if array.ndim != 4:
+            return None
+        array[rows, :, :, 0] *= blue
+        array[rows, :, :, 2] = np.minimum(array[rows, :, :, 2] * red, 255)
+
+
+@register_stage
+class Grayscale(Stage):
+    """BGR -> gri."""
+
+    type_name = "grayscale"
+
+    def apply(self, image, p, ctx):
+        return convert_color(image, cv2.COLOR_BGR2GRAY, ctx) if image.ndim == 3 else image
+
+
+@register_stage
+class ToBgr(Stage):
+    """Gri -> 3 kanalli BGR."""
+
+    type_name = "to_bgr"
+
+    def apply(self, image, p, ctx):
+        return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR) if image.ndim == 2 else image
+
+
+@register_stage
+class Contrast(Stage):
+    """Dogrusal kontrast/parlaklik: |alpha * x + beta|."""
+
+    type_name = "contrast"
+    defaults = {
+        "alpha": {"linear": [1.2, 0.3]},
+        "beta": {"linear": [-20, -20]},
+    }
+    fusable = True
+
+    def apply(self, image, p, ctx):
+        return cv2.convertScaleAbs(image, alpha=p["alpha"], beta=p["beta"])
+
+    def apply_float(self, buf, p, ctx):
+        buf *= np.float32(p["alpha"])
+        buf += np.float32(p["beta"])
+        np.abs(buf, out=buf)
+        # convertScaleAbs gibi doyur: sonraki esik/cizgiler beyazi 255 gormeli
+        np.minimum(buf, 255, out=buf)
+
+
+@register_stage
+class ThresholdBlend(Stage):
+    """Esiklenmis goruntuyu orijinalle harmanlar (fotokopi metni koyulastirir)."""
+
+    type_name = "threshold_blend"
+    defaults = {
+        "threshold": {"linear": [190, 10], "int": True},
+        "blend": {"linear": [0.6, 0.1]},
+    }
+    fusable = True
+
+    def apply(self, image, p, ctx):
+        _, mask = cv2.threshold(image, p["threshold"], 255, cv2.THRESH_BINARY)
+        blend = p["blend"]
+        return cv2.addWeighted(image, blend, mask, 1 - blend, 0)
+
+    def apply_float(self, buf, p, ctx):
+        # uint8 modda esik doymus degerlere uygulanir; 255 ustu de maskeye girer
+        mask = buf > p["threshold"]
+        blend = p["blend"]
+        buf *= np.float32(blend)
+        np.add(buf, np.float32((1 - blend) * 255), out=buf, where=mask)
+
+
+@register_stage
+class Binarize(Stage):
+    """Sert siyah-beyaz esikleme (faks)."""
+
+    type_name = "binarize"
+    defaults = {
+        "threshold": {"randint": [140, 180]},
+    }
+
+    def apply(self, image, p, ctx):
+        _, binary = cv2.threshold(image, p["threshold"], 255, cv2.THRESH_BINARY)
+        return binary
+
+
+# ============================================
+# GURULTU / LEKELER
+# ============================================
+
+@register_stage
+class Noise(Stage):
+    """Gauss sensor gurultusu."""
+
+    type_name = "noise"
+    defaults = {
+        "sigma": {"linear": [3, 5], "int": True},
+    }
+    fusable = True
+
+    def apply(self, image, p, ctx):
+        sigma = scaled(p["sigma"], ctx)
+        noise = table_noise(image.shape, sigma, ctx.rng) if ctx.table_noise else None
+        if noise is None:
+            return add_gaussian_noise(image, sigma, ctx.rng)
+        # int16 toplayip kirpmakla ayni sonuc, ara dizi olmadan
+        return cv2.add(image, noise, dtype=cv2.CV_8U)
+
+    def apply_float(self, buf, p, ctx):
+        # Satir parcalari tam boyutlu cekimle ayni akistan ayni sirayla gelir
+        sigma = scaled(p["sigma"], ctx)
+        noise = table_noise(buf.shape, sigma, ctx.rng) if ctx.table_noise else None
+        if noise is not None:
+            buf += noise
+            return
+        for r0, r1 in row_chunks(buf.shape[0]):
+            noise = ctx.rng.normal(0, sigma, buf[r0:r1].shape)
+            np.trunc(noise, out=noise)
+            buf[r0:r1] += noise
+
+    def apply_batch(self, stack, items):
+        # Cekimler goruntu basina; tablo gurultusu tum yigina tek islemde eklenir
+        array = stack.array
+        noise = np.zeros(array.shape, dtype=np.int8)
+        rows = []
+        for i, p, ctx in items:
+            view = stack.view(i)
+            sample = table_noise(view.shape, scaled(p["sigma"], ctx), ctx.rng) if ctx.table_noise else None
+            if sample is None:
+                if array.dtype == np.float32:
+                    self.apply_float(view, p, ctx)
+                else:
+                    view[...] = self.apply(view, p, ctx)
+                continue
+            h, w = stack.sizes[i]
+            noise[i, :h, :w] = sample
+            rows.append(i)
+        if array.dtype == np.float32:
+            array[rows] += noise[rows]
+        elif len(rows) == len(array):
+            flat = array.reshape((-1,) + array.shape[2:])
+            cv2.add(flat, noise.reshape(flat.shape), dst=flat, dtype=cv2.CV_8U)
+        else:
+            for i in rows:
+                cv2.add(array[i], noise[i], dst=array[i], dtype=cv2.CV_8U)
+
+
+@register_stage
+class SaltPepper(Stage):
+    """Rastgele siyah/beyaz pikseller (faks hatti, kirli cam)."""
+
+    type_name = "salt_pepper"
+    defaults = {
+        "amount": {"linear": [0.0005, 0.001]},
+        "salt_ratio": 0.5,
+    }
+    in_place = True
+    fusable = True
+
+    def apply(self, image, p, ctx):
+        h, w = image.shape[:2]
+        count = int(h * w * p["amount"])
+        ys = ctx.rng.integers(0, h, count)
+        xs = ctx.rng.integers(0, w, count)
+        salt = ctx.rng.random(count) < p["salt_ratio"]
+        image[ys[salt], xs[salt]] = 255
+        image[ys[~salt], xs[~salt]] = 0
+        return image
+
+    def apply_float(self, buf, p, ctx):
+        self.apply(buf, p, ctx)
+
+
+@register_stage
+class Vignette(Stage):
+    """Kenar karartma; kenarda `floor`dan ice dogru 1.0'a cikar."""
+
+    type_name = "vignette"
+    defaults = {
+        "border": {"linear": [20, 20], "int": True},
+        "floor": 0.0,
+    }
+    in_place = True
+    fusable = True
+
+    def apply(self, image, p, ctx):
+        return apply_edge_mask(image, scaled_px(p["border"], ctx), p["floor"])
+
+    def apply_float(self, buf, p, ctx):
+        apply_edge_mask(buf, scaled_px(p["border"], ctx), p["floor"])
+
+    def apply_batch(self, stack, items):
+        # Ayni boyut ve maskedeki goruntuler birlikte karartilir
+        groups = {}
+        for i, p, ctx in items:
+            key = stack.sizes[i] + (scaled_px(p["border"], ctx), p["floor"])
+            groups.setdefault(key, []).append(i)
+        array = stack.array
+        for (h, w, border, floor), rows in groups.items():
+            if len(rows) == len(array) and (h, w) == array.shape[1:3]:
+                apply_edge_mask(array, border, floor, batched=True)
+            else:
+                region = array[rows, :h, :w]
+                array[rows, :h, :w] = apply_edge_mask(region, border, floor, batched=True)
+
+
+@register_stage
+class Dust(Stage):
+    """Toz noktaciklari."""
+
+    type_name = "dust"
+    defaults = {
+        "count": {"randint": [3, {"linear": [0, 15], "int": True}]},
+        "radius": {"randint": [1, 3]},
+        "color": {"randint": [80, 200]},
+    }
+    in_place = True
+    fusable = True
+
+    def apply(self, image, p, ctx):
+        h, w = image.shape[:2]
+        for _ in range(p["count"]):
+            x, y = int(ctx.rng.integers(0, w)), int(ctx.rng.integers(0, h))
+            r = scaled_px(p.draw("radius"), ctx)
+            color = p.draw("color")
+            cv2.circle(image, (x, y), r, (color, color, color), -1)
+        return image
+
+    def apply_float(self, buf, p, ctx):
+        self.apply(buf, p, ctx)
+
+
+@register_stage
+class DrumLines(Stage):
+    """Fotokopi tambur izi: aralikli, hafif koyu yatay cizgiler."""
+
+    type_name = "drum_lines"
+    defaults = {
+        "spacing": {"randint": [60, 130]},
+        "thickness": {"randint": [1, 2]},
+        "alpha": {"uniform": [0.02, {"linear": [0, 0.06]}]},
+        "jitter": {"randint": [-3, 4]},
+    }
+    in_place = True
+    fusable = True
+
+    def lines(self, h, p, ctx):
+        """(y, kalinlik, alpha) listesi; goruntu disinda kalan cizgiler de cekilir."""
+        lines = []
+        for y in range(0, h, scaled_px(p["spacing"], ctx)):
+            thickness = scaled_px(p.draw("thickness"), ctx)
+            line_alpha = p.draw("alpha")
+            line_y = y + scaled_px(p.draw("jitter"), ctx, None)
+            if 0 <= line_y < h - thickness:
+                lines.append((line_y, thickness, line_alpha))
+        return lines
+
+    def apply(self, image, p, ctx):
+        for line_y, thickness, line_alpha in self.lines(image.shape[0], p, ctx):
+            image[line_y:line_y+thickness, :] = (
+                image[line_y:line_y+thickness, :].astype(np.float32) * (1 - line_alpha)
+            ).astype(np.uint8)
+        return image
+
+    def apply_float(self, buf, p, ctx):
+        for line_y, thickness, line_alpha in self.lines(buf.shape[0], p, ctx):
+            buf[line_y:line_y+thickness, :] *= np.float32(1 - line_alpha)
+
+    def apply_batch(self, stack, items):
+        # Tum goruntulerin cizgileri tek indekslemeyle karartilir
+        array = stack.array
+        images, rows, factors = [], [], []
+        for i, p, ctx in items:
+            lines = self.lines(stack.sizes[i][0], p, ctx)
+            covered = [y for line_y, thickness, _ in lines for y in range(line_y, line_y + thickness)]
+            if len(set(covered)) != len(covered):
+                # Ust uste binen cizgiler tek goruntu yolundaki gibi sirayla carpilir
+                view = stack.view(i)
+                for line_y, thickness, line_alpha in lines:
+                    view[line_y:line_y+thickness] = (
+                        view[line_y:line_y+thickness] * np.float32(1 - line_alpha)
+                    ).astype(view.dtype)
+                continue
+            for line_y, thickness, line_alpha in lines:
+                images.extend([i] * thickness)
+                rows.extend(range(line_y, line_y + thickness))
+                factors.extend([1 - line_alpha] * thickness)
+        if not rows:
+            return None
+        factors = np.array(factors, dtype=np.float32).reshape((-1,) + (1,) * (array.ndim - 2))
+        array[images, rows] = (array[images, rows] * factors).astype(array.dtype)
+
+
+# ============================================
+# BULANIKLIK / SIKISTIRMA
+# ============================================
+
+@register_stage
+class Blur(Stage):
+    """Gauss bulaniklik (odak tam net degil)."""
+
+    type_name = "blur"
+    defaults = {
+        "size": {"below": 1.0, "then": 3, "else": 5},
+        "sigma": {"linear": [0.5, 0.5]},
+    }
+    # Nokta bazli degil ama OpenCV float32 tamponu yerinde bulaniklastirabilir
+    fusable = True
+
+    def kernel(self, p, ctx):
+        # Cekirdek boyutu tek sayi kalmali
+        return scaled_px(p["size"], ctx) | 1, scaled(p["sigma"], ctx)
+
+    def apply(self, image, p, ctx):
+        size, sigma = self.kernel(p, ctx)
+        return cv2.GaussianBlur(image, (size, size), sigma)
+
+    def apply_float(self, buf, p, ctx):
+        size, sigma = self.kernel(p, ctx)
+        cv2.GaussianBlur(buf, (size, size), sigma, dst=buf)
+
+
+@register_stage
+class Jpeg(Stage):
+    """JPEG sikistirma artefakti (kodla, geri coz)."""
+
+    type_name = "jpeg"
+    defaults = {
+        "quality": {"linear": [80, -20], "int": True, "min": 45},
+    }
+
+    def apply(self, image, p, ctx):
+        _, buf = cv2.imencode('.jpg', image, [int(cv2.IMWRITE_JPEG_QUALITY), p["quality"]])
+        return cv2.imdecode(buf, cv2.IMREAD_UNCHANGED)
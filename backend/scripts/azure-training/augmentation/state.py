@@ -0,0 +1,204 @@
+"""
+--incremental modu icin durum gunlugu (augment-state.jsonl).
+
+Gunluk cikti klasorunde, satir basina bir JSON kaydidir ve yalnizca sona
+eklenir; her kayit yazildiktan sonra flush edilir. Yarida kesilen bir
+calismanin tamamlanan isleri boylece kaybolmaz, yeniden baslatinca kalan
+isler uretilir. Calisma sonunda gunluk guncel durumla sikistirilir.
+
+Kayit turleri:
+    {"kind": "run", "seed": S}
+    {"kind": "source", "path": ..., "hash": ..., "size": ..., "mtime_ns": ..., "index": N}
+    {"kind": "source_removed", "path": ...}
+    {"kind": "output", "name": ..., "file": ..., "index": N, "hash": ..., "effect": ...,
+     "effect_hash": ..., "seed": S, "fused": false, "batched": false, "max_dpi": null, "size": ...,
+     "version": V}
+    {"kind": "output_removed", "name": ...}
+
+Kaynak goruntu, dosya adindan bagimsiz olarak icerik ozetiyle (sha256)
+tanimlanir. Sira numarasi (sayfa-NNN) kaynaga ilk goruldugunde verilir ve
+sabit kalir; yeni goruntu eklemek mevcut ciktilarin adini ve tohumunu
+degistirmez. Yeniden adlandirilan bir dosya ayni sira numarasini alir.
+"""
+
+import hashlib
+import json
+import os
+
+from .pdf import atomic_write
+
+STATE_NAME = "augment-state.jsonl"
+
+# Efekt uygulamasi eski ciktilari gecersiz kilacak sekilde degisirse artirilir
+STATE_VERSION = 1
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IncrementalState:
+    """Cikti klasorunun durum gunlugu: kaynaklar, sira numaralari ve ciktilar."""
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, STATE_NAME)
+        self.seed = None
+        self.sources = {}   # goreli yol -> source kaydi
+        self.outputs = {}   # cikti adi -> output kaydi
+        self.hashes = {}    # img_path -> icerik ozeti (assign_indices/add_source doldurur)
+        self.max_index = 0  # verilmis en buyuk sira numarasi (silinenler dahil, tekrar verilmez)
+        partial = self._load()
+        self._journal = open(self.path, "a", encoding="utf-8")
+        if partial:
+            # Yarim satir bir sonraki kaydi bozmasin
+            self._journal.write("\n")
+
+    def _load(self):
+        """Gunlugu okur; son satir yarim kalmissa True dondurur."""
+        line = "\n"
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Oldurulen calismanin yarim kalan son satiri
+                    continue
+                kind = record.get("kind")
+                if kind == "run":
+                    self.seed = record["seed"]
+                elif kind == "source":
+                    self.sources[record["path"]] = record
+                    self.max_index = max(self.max_index, record["index"])
+                elif kind == "source_removed":
+                    self.sources.pop(record["path"], None)
+                elif kind == "output":
+                    self.outputs[record["name"]] = record
+                    self.max_index = max(self.max_index, record["index"])
+                elif kind == "output_removed":
+                    self.outputs.pop(record["name"], None)
+        return not line.endswith("\n")
+
+    def _append(self, record):
+        self._journal.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._journal.flush()
+
+    def start_run(self, seed):
+        self.seed = seed
+        self._append({"kind": "run", "seed": seed})
+
+    def _digest(self, key, img_path, st):
+        # Boyutu ve mtime'i degismeyen dosyanin ozeti gunlukten alinir
+        known = self.sources.get(key)
+        if known and known["size"] == st.st_size and known["mtime_ns"] == st.st_mtime_ns:
+            return known["hash"]
+        return file_hash(img_path)
+
+    def _set_source(self, key, img_path, digest, st, index):
+        record = {"kind": "source", "path": key, "hash": digest,
+                  "size": st.st_size, "mtime_ns": st.st_mtime_ns, "index": index}
+        if self.sources.get(key) != record:
+            self._append(record)
+            self.sources[key] = record
+        self.max_index = max(self.max_index, index)
+        self.hashes[img_path] = digest
+
+    def add_source(self, key, img_path):
+        """Tek bir goruntuyu kaydeder ve sira numarasini dondurur (akis modu).
+
+        assign_indices'in aksine diger kaynaklara dokunmaz; hicbir sey silinmez.
+        """
+        st = os.stat(img_path)
+        digest = self._digest(key, img_path, st)
+        known = self.sources.get(key)
+        index = known["index"] if known else self.max_index + 1
+        self._set_source(key, img_path, digest, st, index)
+        return index
+
+    def assign_indices(self, input_dir, image_files):
+        """Her goruntuye kalici sira numarasi verir: {img_path: index}.
+
+        Boyutu ve mtime'i degismeyen dosyalarin ozeti gunlukten alinir.
+        Silinen kaynaklarin kaydi dusurulur; ciktilari remove_stale ile silinir.
+        """
+        current = {}
+        for img_path in image_files:
+            rel = os.path.relpath(img_path, input_dir)
+            st = os.stat(img_path)
+            current[rel] = (img_path, self._digest(rel, img_path, st), st)
+
+        missing = {rel: rec for rel, rec in self.sources.items() if rel not in current}
+        by_hash = {rec["hash"]: rec["index"] for rec in missing.values()}
+        used = {rec["index"] for rel, rec in self.sources.items() if rel in current}
+
+        for rel in missing:
+            self._append({"kind": "source_removed", "path": rel})
+            del self.sources[rel]
+
+        indices = {}
+        for rel, (img_path, digest, st) in sorted(current.items()):
+            known = self.sources.get(rel)
+            if known:
+                index = known["index"]
+            elif digest in by_hash and by_hash[digest] not in used:
+                # Yeniden adlandirilmis dosya: eski sira numarasi ve ciktilari korunur
+                index = by_hash.pop(digest)
+            else:
+                index = self.max_index + 1
+            used.add(index)
+            self._set_source(rel, img_path, digest, st, index)
+            indices[img_path] = index
+        return indices
+
+    def remove_stale(self, live_indices):
+        """Kaynagi silinmis ciktilari diskten ve gunlukten kaldirir, adlarini dondurur."""
+        removed = []
+        for name, record in sorted(self.outputs.items()):
+            if record["index"] in live_indices:
+                continue
+            try:
+                os.remove(os.path.join(self.output_dir, record["file"]))
+            except FileNotFoundError:
+                pass
+            self._append({"kind": "output_removed", "name": name})
+            del self.outputs[name]
+            removed.append(name)
+        return removed
+
+    def is_fresh(self, job, effect_hash, fused, max_dpi=None, encoding=None, batched=False):
+        """Cikti diskte var ve ayni kaynak/efekt/tohum/mod ile uretilmisse True."""
+        record = self.outputs.get(job.name)
+        if (record is None or record["hash"] != self.hashes[job.img_path]
+                or record["effect"] != job.effect_name or record["effect_hash"] != effect_hash
+                or record["seed"] != job.seed or record["fused"] != fused
+                or record.get("batched", False) != batched
+                or record.get("max_dpi") != max_dpi or record.get("encoding") != encoding
+                or record.get("version") != STATE_VERSION):
+            return False
+        try:
+            return os.path.getsize(os.path.join(self.output_dir, record["file"])) == record["size"]
+        except OSError:
+            return False
+
+    def record_output(self, job, file, size, effect_hash, fused, max_dpi=None, encoding=None, batched=False):
+        record = {"kind": "output", "name": job.name, "file": file, "index": job.idx,
+                  "hash": self.hashes[job.img_path], "effect": job.effect_name,
+                  "effect_hash": effect_hash, "seed": job.seed, "fused": fused,
+                  "batched": batched, "max_dpi": max_dpi, "encoding": encoding, "size": size, "version": STATE_VERSION}
+        self._append(record)
+        self.outputs[job.name] = record
+
+    def close(self):
+        """Gunlugu guncel durumla yeniden yazar (eski/silinmis kayitlar atilir)."""
+        self._journal.close()
+        records = [{"kind": "run", "seed": self.seed}] if self.seed is not None else []
+        records += sorted(self.sources.values(), key=lambda r: r["index"])
+        records += sorted(self.outputs.values(), key=lambda r: r["name"])
+        atomic_write(self.path, "".join(json.dumps(r, ensure_ascii=False) + "\n"
+                                        for r in records).encode("utf-8"))
@@ -0,0 +1,208 @@
+"""
+Surekli (akis) mod: goruntuler geldikce augment edilir.
+
+Kaynaklar poll() ile calisir ve beklemez: yeni hazir yollarin listesini,
+kaynak bittiyse None dondurur. run_stream kaynagi yalnizca islenecek is
+kalmadiginda ve havuzda yer varken yoklar; ucustaki goruntu sayisi
+max_inflight ile sinirlidir (geri basinc). stdin okuyucusu da sinirli bir
+kuyruga yazar, tuketilmeyen satirlar boru hattini bekletir.
+
+Havuzda olen bir isci (ornek: bellek yetmedi) sonucunu hic bildirmez; bu
+yuzden her grup en fazla `timeout` saniye beklenir, suresi dolanlar kayip
+sayilip lost() ile bildirilir.
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+from .jobs import Result, find_images
+
+
+class DirectoryWatcher:
+    """Klasoru yoklar; boyutu ve mtime'i iki yoklama boyunca degismeyen
+    (yazimi bitmis) yeni veya degismis goruntuleri dondurur."""
+
+    def __init__(self, input_dir):
+        self.input_dir = input_dir
+        self.observed = {}   # yol -> son yoklamadaki (boyut, mtime)
+        self.handled = {}    # yol -> islenen surum (silinen dosyalar cikarilir)
+
+    def key(self, img_path):
+        return os.path.relpath(img_path, self.input_dir)
+
+    def poll(self):
+        ready = []
+        observed = {}
+        for img_path in find_images(self.input_dir):
+            try:
+                st = os.stat(img_path)
+            except FileNotFoundError:
+                continue
+            signature = (st.st_size, st.st_mtime_ns)
+            observed[img_path] = signature
+            if self.handled.get(img_path) == signature or st.st_size == 0:
+                continue
+            if self.observed.get(img_path) == signature:
+                ready.append(img_path)
+                self.handled[img_path] = signature
+        self.observed = observed
+        self.handled = {path: signature for path, signature in self.handled.items() if path in observed}
+        return ready
+
+
+class QueueFileReader:
+    """Kuyruk dosyasini `tail -f` gibi izler: her tam satir bir goruntu yolu.
+
+    '#' ile baslayan satirlar atlanir. Dosya kisalirsa (yeniden olusturulmus)
+    bastan okunur.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.partial = b""
+
+    def key(self, img_path):
+        return os.path.abspath(img_path)
+
+    def poll(self):
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() < self.offset:
+                    self.offset, self.partial = 0, b""
+                f.seek(self.offset)
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        self.offset += len(data)
+        lines = (self.partial + data).split(b"\n")
+        self.partial = lines.pop()
+        return parse_paths(line.decode("utf-8") for line in lines)
+
+
+class StdinReader:
+    """stdin'den satir satir yol okur; EOF'ta kaynak biter."""
+
+    def __init__(self, stream, maxsize):
+        self.lines = queue.Queue(maxsize)
+        self.exhausted = False
+        thread = threading.Thread(target=self._read, args=(stream,), daemon=True)
+        thread.start()
+
+    def _read(self, stream):
+        for line in stream:
+            self.lines.put(line)
+        self.lines.put(None)
+
+    def key(self, img_path):
+        return os.path.abspath(img_path)
+
+    def poll(self):
+        if self.exhausted:
+            return None
+        lines = []
+        while True:
+            try:
+                line = self.lines.get_nowait()
+            except queue.Empty:
+                break
+            if line is None:
+                self.exhausted = True
+                break
+            lines.append(line)
+        return parse_paths(lines)
+
+
+def parse_paths(lines):
+    return [line.strip() for line in lines if line.strip() and not line.lstrip().startswith("#")]
+
+
+def run_stream(source, plan, submit, max_inflight, interval, handle, idle=None, timeout=None, lost=None):
+    """Kaynaktan gelen goruntuleri sinirli sayida eszamanli isle.
+
+    plan(img_path) goruntunun is grubunu (bos olabilir) dondurur.
+    submit(jobs, done) grubu calistirir ve sonuc listesini done(results)
+    ile bildirir (havuz geri cagrisi veya seri cagri). handle(results) ana
+    surecte ciktilari yazar. idle() is kalmadiginda cagrilir (manifest).
+    timeout verilirse gonderilmesinden bu yana timeout saniye gecen grup
+    kayip sayilir ve lost(jobs) cagrilir; gec gelen sonucu atilir.
+    """
+    finished = queue.Queue()
+    pending = deque()
+    inflight = {}   # grup no -> (jobs, son bekleme ani)
+    submitted = 0
+    exhausted = False
+    dirty = False
+
+    def collect(block, wait=None):
+        nonlocal dirty
+        try:
+            token, results = finished.get(block, wait)
+        except queue.Empty:
+            return False
+        if inflight.pop(token, None) is not None:
+            handle(results)
+            dirty = True
+        return True
+
+    def expire():
+        now = time.monotonic()
+        for token, (jobs, deadline) in list(inflight.items()):
+            if deadline <= now:
+                del inflight[token]
+                if lost is not None:
+                    lost(jobs)
+
+    def wait_time():
+        if timeout is None:
+            return None
+        return max(0.0, min(deadline for _, deadline in inflight.values()) - time.monotonic())
+
+    while not (exhausted and not pending and not inflight):
+        while collect(False):
+            pass
+        if timeout is not None:
+            expire()
+        while pending and len(inflight) < max_inflight:
+            jobs = pending.popleft()
+            token = submitted
+            submitted += 1
+            deadline = time.monotonic() + timeout if timeout is not None else None
+            inflight[token] = (jobs, deadline)
+            submit(jobs, lambda results, token=token: finished.put((token, results)))
+        if inflight and (len(inflight) >= max_inflight or exhausted):
+            # Geri basinc: kaynak, bir goruntu bitene (veya suresi dolana) kadar yoklanmaz
+            collect(True, wait_time())
+            continue
+        if not inflight and dirty and idle is not None:
+            idle()
+            dirty = False
+        paths = source.poll()
+        if paths is None:
+            exhausted = True
+            continue
+        for img_path in paths:
+            jobs = plan(img_path)
+            if jobs:
+                pending.append(jobs)
+        if not pending:
+            collect(True, interval)
+
+
+def pool_submitter(pool, group_fn):
+    """Is gruplarini havuza gonderen submit fonksiyonu."""
+    def submit(jobs, done):
+        def failed(error):
+            done([Result(job, None, None, str(error), None, None) for job in jobs])
+        pool.apply_async(group_fn, (jobs,), callback=done, error_callback=failed)
+    return submit
+
+
+def serial_submitter(group_fn):
+    def submit(jobs, done):
+        done(group_fn(jobs))
+    return submit
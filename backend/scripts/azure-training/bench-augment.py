@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Augmentation benchmark'i: sentetik A4 sayfalarda ve kucuk ekran
+goruntulerinde efekt, asama ve mod sureleri.
+
+Kullanim: python3 bench-augment.py [--dpi 150,300,600] [--images 4] [--screens 96] [--workers N]
+                                   [--batch N] [--modes serial,batched,parallel]
+                                   [--json sonuc.json] [--compare onceki.json] [--threshold 10]
+
+Her DPI icin ve --screens adet karisik boyutlu (240x400 civari) ekran
+goruntusu icin:
+  - efekt basina goruntu suresi ve asama (stage) bazinda ortalama sure,
+    save_as_pdf suresi (JPEG kodlama + PDF yazma)
+  - serial / batched / parallel modlarda uctan uca calisma (PNG okuma ->
+    efekt -> PDF yazma): duvar suresi, goruntu/s, PDF/s ve tepe RSS
+
+batched mod augment-batch.py --batch N'dir; kazancin cogu tablo gurultusunden
+gelir, ciktilar serial'den farklidir. Sonda batched / serial orani yazilir.
+
+Her mod ayri (spawn) bir surecte olculur; tepe RSS o modun kendi tepesidir.
+parallel modda isci sureclerin en buyuk tepe RSS'i ayrica raporlanir.
+
+--json sonuclari yazar; --compare onceki bir JSON ile karsilastirir ve
+--threshold yuzdesinden fazla yavaslama varsa cikis kodu 1 olur.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import resource
+import tempfile
+import itertools
+import multiprocessing
+from collections import defaultdict
+
+import cv2
+import numpy as np
+
+from augmentation import (
+    EFFECTS,
+    DirectorySink,
+    find_images,
+    plan_jobs,
+    run_job,
+    run_job_batch,
+    group_jobs,
+    init_worker,
+    job_rng,
+    save_as_pdf,
+)
+from augmentation.jobs import INTENSITY_RANGE
+
+SEED = 1234
+MODES = ("serial", "batched", "parallel")
+
+# --screens goruntulerinin (genislik, yukseklik) boyutlari, sirayla
+SCREEN_SIZES = ((240, 400), (244, 402), (236, 398), (300, 500), (320, 480))
+
+# ru_maxrss Linux'ta KB, macOS'ta bayt
+RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+def a4_page(dpi, variant=0):
+    """Metin satirlari ve tablo iceren sentetik A4 sayfa (BGR)."""
+    h, w = round(297 / 25.4 * dpi), round(210 / 25.4 * dpi)
+    s = dpi / 150
+    page = np.full((h, w, 3), 248, dtype=np.uint8)
+    rng = np.random.default_rng(variant)
+    margin = int(80 * s)
+    cv2.putText(page, f"TEKNIK SARTNAME {variant + 1}", (margin, int(120 * s)),
+                cv2.FONT_HERSHEY_SIMPLEX, 1.6 * s, (20, 20, 20), max(1, int(3 * s)))
+    y = int(180 * s)
+    line_h = int(28 * s)
+    while y < h * 0.55:
+        words_x = margin
+        while words_x < w - margin:
+            word_w = int(rng.integers(30, 120) * s)
+            cv2.rectangle(page, (words_x, y), (min(words_x + word_w, w - margin), y + int(12 * s)),
+                          (40, 40, 40), -1)
+            words_x += word_w + int(14 * s)
+        y += line_h
+    # Tablo
+    top, rows, cols = int(h * 0.6), 12, 5
+    cell_h, cell_w = int(40 * s), (w - 2 * margin) // cols
+    for r in range(rows + 1):
+        cv2.line(page, (margin, top + r * cell_h), (margin + cols * cell_w, top + r * cell_h), (0, 0, 0), max(1, int(s)))
+    for c in range(cols + 1):
+        cv2.line(page, (margin + c * cell_w, top), (margin + c * cell_w, top + rows * cell_h), (0, 0, 0), max(1, int(s)))
+    return page
+
+
+def screenshot(variant=0):
+    """Baslik cubugu, metin bloklari ve dugmeler iceren sentetik ekran goruntusu (BGR)."""
+    w, h = SCREEN_SIZES[variant % len(SCREEN_SIZES)]
+    rng = np.random.default_rng(variant)
+    page = np.full((h, w, 3), 250, dtype=np.uint8)
+    color = tuple(int(c) for c in rng.integers(40, 200, 3))
+    cv2.rectangle(page, (0, 0), (w, 44), color, -1)
+    cv2.putText(page, f"Ekran {variant + 1}", (12, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+    y = 64
+    while y < h - 70:
+        x = 12
+        while x < w - 12:
+            word_w = int(rng.integers(18, 60))
+            cv2.rectangle(page, (x, y), (min(x + word_w, w - 12), y + 7), (60, 60, 60), -1)
+            x += word_w + 8
+        y += 18
+    cv2.rectangle(page, (12, h - 56), (w - 12, h - 16), color, -1)
+    return page
+
+
+def measure_effects(pages, pdf_dir):
+    """Efekt ve asama sureleri (ms, goruntu basina ortalama)."""
+    result = {}
+    pdf_times = []
+    for effect_name, effect_fn in EFFECTS.items():
+        stage_times = defaultdict(list)
+        effect_times = []
+
+        def timer(label, seconds):
+            stage_times[label].append(seconds)
+
+        for idx, page in enumerate(pages, 1):
+            rng = job_rng(SEED, idx, effect_name)
+            intensity = rng.uniform(*INTENSITY_RANGE)
+            kwargs = {"timer": timer} if hasattr(effect_fn, "pipeline") else {}
+            start = time.perf_counter()
+            augmented = effect_fn(page, intensity=intensity, rng=rng, params={}, **kwargs)
+            effect_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            save_as_pdf(augmented, os.path.join(pdf_dir, f"{effect_name}-{idx}.pdf"))
+            pdf_times.append(time.perf_counter() - start)
+
+        result[effect_name] = {
+            "mean_ms": 1000 * float(np.mean(effect_times)),
+            "min_ms": 1000 * float(np.min(effect_times)),
+            "stages_ms": {label: 1000 * float(np.mean(times)) for label, times in stage_times.items()},
+        }
+    return result, 1000 * float(np.mean(pdf_times))
+
+
+def run_mode(mode, image_dir, out_dir, workers, batch, queue):
+    """Tek bir modu uctan uca calistirir (ayri surecte); sonucu kuyruga yazar."""
+    cv2.setNumThreads(1 if mode == "parallel" else cv2.getNumThreads())
+    image_files = find_images(image_dir)
+    jobs = plan_jobs(image_files, False, SEED)
+    sink = DirectorySink(out_dir)
+    pool = None
+    start = time.perf_counter()
+    if mode == "serial":
+        results = map(run_job, jobs)
+    elif mode == "batched":
+        results = itertools.chain.from_iterable(map(run_job_batch, group_jobs(jobs, batch)))
+    else:
+        pool = multiprocessing.Pool(workers, initializer=init_worker)
+        results = pool.imap(run_job, jobs, chunksize=len(EFFECTS))
+    outputs = 0
+    for result in results:
+        if result.jpeg is not None:
+            sink.add(result.job, result.jpeg, result.shape)
+            outputs += 1
+    wall = time.perf_counter() - start
+    if pool is not None:
+        pool.close()
+        pool.join()
+    queue.put({
+        "wall_s": wall,
+        "images": len(image_files),
+        "outputs": outputs,
+        "images_per_s": len(image_files) / wall,
+        "outputs_per_s": outputs / wall,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * RSS_UNIT / 2**20,
+        "peak_worker_rss_mb": (resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * RSS_UNIT / 2**20
+                               if pool is not None else None),
+    })
+
+
+def measure_mode(mode, image_dir, workers, batch):
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    out_dir = tempfile.mkdtemp(prefix=f"bench-{mode}-")
+    try:
+        process = ctx.Process(target=run_mode, args=(mode, image_dir, out_dir, workers, batch, queue))
+        process.start()
+        result = queue.get()
+        process.join()
+        return result
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+def pct(new, old):
+    return 100.0 * (new - old) / old if old else 0.0
+
+
+def set_label(key):
+    return "ekran goruntuleri" if key == "screens" else f"{key} DPI"
+
+
+def compare(current, baseline, threshold):
+    """Onceki sonuclarla karsilastirir, yavaslama sayisini dondurur."""
+    regressions = 0
+    print(f"KARSILASTIRMA ({baseline.get('created_at', '?')} -> {current['created_at']}, esik %{threshold:g})")
+    for key, now in current["results"].items():
+        old = baseline.get("results", {}).get(key)
+        if old is None:
+            continue
+        print(f"  {set_label(key)}")
+        rows = []
+        for name, effect in now["effects"].items():
+            if name in old["effects"]:
+                # Sure artisi yavaslamadir
+                rows.append((f"{name} (ms)", old["effects"][name]["mean_ms"], effect["mean_ms"], 1))
+        rows.append(("save_as_pdf (ms)", old["save_as_pdf_ms"], now["save_as_pdf_ms"], 1))
+        for mode, stats in now["modes"].items():
+            if mode in old["modes"]:
+                # Hiz dususu yavaslamadir
+                rows.append((f"{mode} (goruntu/s)", old["modes"][mode]["images_per_s"], stats["images_per_s"], -1))
+        for label, before, after, direction in rows:
+            change = pct(after, before)
+            slower = change * direction > threshold
+            regressions += slower
+            print(f"    {label:24s} {before:10.2f} -> {after:10.2f}  {change:+6.1f}%{'  YAVAS' if slower else ''}")
+    return regressions
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Augmentation efekt/asama/mod benchmark'i")
+    parser.add_argument("--dpi", default="150,300,600", help="Virgulle DPI listesi (varsayilan: 150,300,600)")
+    parser.add_argument("--images", type=int, default=4, help="DPI basina sentetik sayfa sayisi")
+    parser.add_argument("--screens", type=int, default=96,
+                        help="Kucuk ekran goruntusu sayisi (varsayilan: 96, 0 = atla)")
+    parser.add_argument("--workers", type=int, default=0, help="parallel mod surec sayisi (0 = tum cekirdekler)")
+    parser.add_argument("--batch", type=int, default=8, help="batched mod grup boyutu (varsayilan: 8)")
+    parser.add_argument("--modes", default=",".join(MODES), help="Virgulle modlar: serial,batched,parallel")
+    parser.add_argument("--json", metavar="DOSYA", help="Sonuclari JSON olarak yaz")
+    parser.add_argument("--compare", metavar="DOSYA", help="Onceki JSON ile karsilastir")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Yavaslama esigi, yuzde (varsayilan: 10)")
+    args = parser.parse_args(argv)
+
+    dpis = [int(d) for d in args.dpi.split(",")]
+    modes = [m for m in args.modes.split(",") if m]
+    unknown = [m for m in modes if m not in MODES]
+    if unknown:
+        parser.error(f"bilinmeyen mod: {', '.join(unknown)}")
+    workers = args.workers or os.cpu_count()
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "opencv": cv2.__version__,
+            "cpu_count": os.cpu_count(),
+        },
+        "config": {"images": args.images, "screens": args.screens, "workers": workers, "batch": args.batch,
+                   "seed": SEED,
+                   "effects": list(EFFECTS)},
+        "results": {},
+    }
+
+    sets = [(str(dpi), [a4_page(dpi, i) for i in range(args.images)]) for dpi in dpis]
+    if args.screens > 0:
+        sets.append(("screens", [screenshot(i) for i in range(args.screens)]))
+    for key, pages in sets:
+        work_dir = tempfile.mkdtemp(prefix=f"bench-{key}-")
+        try:
+            image_dir = os.path.join(work_dir, "pages")
+            os.makedirs(image_dir)
+            for i, page in enumerate(pages):
+                cv2.imwrite(os.path.join(image_dir, f"sayfa-{i:03d}.png"), page)
+            h, w = pages[0].shape[:2]
+            print(f"{set_label(key)} ({w}x{h}), {len(pages)} goruntu")
+
+            effects, pdf_ms = measure_effects(pages, work_dir)
+            for name, effect in effects.items():
+                stages = ", ".join(f"{label} {ms:.1f}" for label, ms in
+                                   sorted(effect["stages_ms"].items(), key=lambda kv: -kv[1]))
+                print(f"  {name:10s} {effect['mean_ms']:8.1f} ms/goruntu  [{stages}]")
+            print(f"  {'save_as_pdf':10s} {pdf_ms:8.1f} ms/goruntu")
+
+            mode_results = {}
+            for mode in modes:
+                stats = measure_mode(mode, image_dir, workers, args.batch)
+                mode_results[mode] = stats
+                worker_rss = (f", isci tepe RSS {stats['peak_worker_rss_mb']:.0f} MB"
+                              if stats["peak_worker_rss_mb"] is not None else "")
+                print(f"  {mode:10s} {stats['wall_s']:6.2f} s  {stats['images_per_s']:6.2f} goruntu/s  "
+                      f"{stats['outputs_per_s']:6.2f} PDF/s  tepe RSS {stats['peak_rss_mb']:.0f} MB{worker_rss}")
+            if "serial" in mode_results and "batched" in mode_results:
+                speedup = mode_results["batched"]["images_per_s"] / mode_results["serial"]["images_per_s"]
+                print(f"  batched / serial: {speedup:.2f}x")
+            print()
+            report["results"][key] = {
+                "size": [w, h],
+                "effects": effects,
+                "save_as_pdf_ms": pdf_ms,
+                "modes": mode_results,
+            }
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Sonuclar: {args.json}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+        print()
+        if compare(report, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Kenar karartma (vignette) mikro-benchmark'i.
+Eski satir satir Python dongusu ile augmentation.masks'taki ayrilabilir
+maskeyi (apply_edge_mask) 300 DPI A4 sentetik sayfa uzerinde karsilastirir.
+
+Kullanim: python3 bench-vignette.py [--dpi 300] [--repeat 5]
+"""
+
+import time
+import argparse
+import numpy as np
+
+from augmentation.masks import apply_edge_mask
+
+
+def legacy_scanner_mask(result, border):
+    """augment-batch.py'nin eski scanner kenar karartmasi (referans)."""
+    mask = np.ones_like(result, dtype=np.float32)
+    for i in range(border):
+        alpha = i / border
+        mask[i, :] *= alpha
+        mask[-(i+1), :] *= alpha
+        mask[:, i] *= alpha
+        mask[:, -(i+1)] *= alpha
+    return (result.astype(np.float32) * mask).astype(np.uint8)
+
+
+def legacy_photocopy_mask(gray, border):
+    """augment-batch.py'nin eski photocopy kenar karartmasi (referans)."""
+    h, w = gray.shape[:2]
+    mask_edge = np.ones((h, w), dtype=np.float32)
+    for i in range(border):
+        val = 0.6 + 0.4 * (i / border)
+        mask_edge[i, :] = val
+        mask_edge[-(i+1), :] = val
+        mask_edge[:, i] *= val
+        mask_edge[:, -(i+1)] *= val
+    return (gray.astype(np.float32) * mask_edge).astype(np.uint8)
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kenar karartma mikro-benchmark'i")
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    h, w = round(297 / 25.4 * args.dpi), round(210 / 25.4 * args.dpi)
+    rng = np.random.default_rng(0)
+    color = rng.integers(0, 256, (h, w, 3), dtype=np.uint8)
+    gray = color[:, :, 0].copy()
+
+    print(f"Sayfa: {w}x{h} ({args.dpi} DPI A4), en iyi {args.repeat} tekrar")
+    print()
+
+    cases = [
+        ("scanner (3 kanal)", color, 40, 0.0, legacy_scanner_mask),
+        ("photocopy (gri)", gray, 30, 0.6, legacy_photocopy_mask),
+    ]
+    for name, image, border, floor, legacy in cases:
+        # Onbellek sicak olsun: gercek calismada ayni boyut tekrar tekrar gelir
+        apply_edge_mask(image.copy(), border, floor)
+        t_old = best_of(lambda: legacy(image, border), args.repeat)
+        t_new = best_of(lambda: apply_edge_mask(image.copy(), border, floor), args.repeat)
+        t_copy = best_of(lambda: image.copy(), args.repeat)
+
+        same = np.array_equal(legacy(image, border), apply_edge_mask(image.copy(), border, floor))
+        print(f"{name}")
+        print(f"  eski dongu       : {t_old * 1000:8.1f} ms")
+        print(f"  ayrilabilir maske: {(t_new - t_copy) * 1000:8.1f} ms (kopya haric)")
+        print(f"  hizlanma         : {t_old / max(t_new - t_copy, 1e-9):8.1f}x")
+        print(f"  birebir ayni     : {'evet' if same else 'hayir (koseler; eski maske kose carpanini kismen eziyordu)'}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -23,6 +23,7 @@
  * Kullanım:
  *   node build-dataset.mjs                              # Tüm URL'leri işle
  *   node build-dataset.mjs --local ./augmented/batch    # Lokal PDF klasörü
+ *   node build-dataset.mjs --local ./augmented/arsiv    # augment-batch.py --archive çıktısı (tar/zip parçaları)
  *   node build-dataset.mjs --dry-run                    # Sadece listeyi göster
  *   node build-dataset.mjs --clean                      # Önce blob'u temizle
  *   node build-dataset.mjs --train                      # İşlem sonunda model eğit
@@ -241,8 +242,21 @@ async function streamPdfToBlob(pdfUrl, blobName) {
 // 2b. Lokal PDF'i Blob'a Yükle
 // ═══════════════════════════════════════════════════════════════════════════
 
-async function uploadLocalPdfToBlob(localPath, blobName) {
-  const buffer = fs.readFileSync(localPath);
+// Arşiv parçasındaki PDF (offset tanımlı) sadece kendi baytları okunarak alınır
+function readLocalPdf(pdfFile) {
+  if (pdfFile.offset === undefined) return fs.readFileSync(pdfFile.localPath);
+  const buffer = Buffer.alloc(pdfFile.size);
+  const fd = fs.openSync(pdfFile.localPath, 'r');
+  try {
+    fs.readSync(fd, buffer, 0, pdfFile.size, pdfFile.offset);
+  } finally {
+    fs.closeSync(fd);
+  }
+  return buffer;
+}
+
+async function uploadLocalPdfToBlob(pdfFile, blobName) {
+  const buffer = readLocalPdf(pdfFile);
   const blockClient = container.getBlockBlobClient(blobName);
   
   await blockClient.upload(buffer, buffer.length, {
@@ -274,11 +288,34 @@ function generateBlobSasUrl(blobName) {
 // 2d. Lokal Klasördeki PDF'leri Tara
 // ═══════════════════════════════════════════════════════════════════════════
 
+// augment-batch.py --archive: PDF'ler tar/zip parçalarında, archive-index.json
+// her PDF'in parçasını, bayt ofsetini ve boyutunu verir (arşiv açılmaz)
+const ARCHIVE_INDEX_NAME = 'archive-index.json';
+
+function scanArchiveIndex(indexPath) {
+  const index = JSON.parse(fs.readFileSync(indexPath, 'utf8'));
+  const dir = path.dirname(indexPath);
+  return index.shards
+    .flatMap(shard => shard.entries.map(e => ({
+      name: e.name,
+      localPath: path.join(dir, shard.file),
+      offset: e.offset,
+      size: e.size,
+    })))
+    .sort((a, b) => (a.name < b.name ? -1 : a.name > b.name ? 1 : 0));
+}
+
 function scanLocalPdfs(folderPath) {
   const absPath = path.resolve(folderPath);
   if (!fs.existsSync(absPath)) {
     throw new Error(`Klasör bulunamadı: ${absPath}`);
   }
+  if (absPath.endsWith('.json')) {
+    return scanArchiveIndex(absPath);
+  }
+  if (fs.existsSync(path.join(absPath, ARCHIVE_INDEX_NAME))) {
+    return scanArchiveIndex(path.join(absPath, ARCHIVE_INDEX_NAME));
+  }
   
   const files = fs.readdirSync(absPath)
     .filter(f => f.toLowerCase().endsWith('.pdf'))
@@ -956,7 +993,7 @@ async function processLocalPdfs(localFolder, { dryRun, clean, doTrain, modelId,
     
     try {
       // 1. Lokal PDF'i blob'a yükle
-      await uploadLocalPdfToBlob(pdfFile.localPath, pdfFile.name);
+      await uploadLocalPdfToBlob(pdfFile, pdfFile.name);
 
       // 2. SAS URL oluştur ve Layout API ile OCR
       const sasUrl = generateBlobSasUrl(pdfFile.name);
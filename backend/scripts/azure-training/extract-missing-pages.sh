@@ -18,6 +18,9 @@ set -e
 SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
 TEMP_DIR="$SCRIPT_DIR/temp-pdfs"
 OUTPUT_DIR="$SCRIPT_DIR/extracted-pages"
+# Tanimliysa cikarilan her sayfanin yolu bu dosyaya eklenir:
+#   python3 augment-watch.py --queue "$AUGMENT_QUEUE" ile surekli augmentation
+AUGMENT_QUEUE="${AUGMENT_QUEUE:-}"
 
 mkdir -p "$TEMP_DIR" "$OUTPUT_DIR"
 
@@ -62,6 +65,9 @@ extract_page() {
   if [ -n "$TMP_PNG" ]; then
     mv "$TMP_PNG" "$OUT_PNG"
     echo "  $TAG Sayfa $PAGE → ${NAME}_s${PAGE}.png"
+    if [ -n "$AUGMENT_QUEUE" ]; then
+      echo "$OUT_PNG" >> "$AUGMENT_QUEUE"
+    fi
     TOTAL_EXTRACTED=$((TOTAL_EXTRACTED + 1))
   fi
 }
@@ -38,6 +38,16 @@ async function proxyRequest(serviceUrl, path, options = {}) {
   return await response.json();
 }
 
+// Query string forwarded to the service (e.g. limit + cursor pagination)
+function pickQuery(query, keys) {
+  const params = new URLSearchParams();
+  for (const key of keys) {
+    if (query[key]) params.set(key, query[key]);
+  }
+  const str = params.toString();
+  return str ? `?${str}` : '';
+}
+
 // ==================== WHATSAPP ROUTES ====================
 
 // WhatsApp health check
@@ -389,8 +399,7 @@ router.get('/instagram/profile', async (_req, res) => {
 // Get posts
 router.get('/instagram/posts', async (req, res) => {
   try {
-    const { limit } = req.query;
-    const queryStr = limit ? `?limit=${limit}` : '';
+    const queryStr = pickQuery(req.query, ['limit', 'cursor']);
     const result = await proxyRequest(INSTAGRAM_SERVICE, `/posts${queryStr}`);
     res.json(result);
   } catch (error) {
@@ -403,9 +412,10 @@ router.get('/instagram/posts', async (req, res) => {
 });
 
 // Get DMs
-router.get('/instagram/dms', async (_req, res) => {
+router.get('/instagram/dms', async (req, res) => {
   try {
-    const result = await proxyRequest(INSTAGRAM_SERVICE, '/dms');
+    const queryStr = pickQuery(req.query, ['limit', 'cursor']);
+    const result = await proxyRequest(INSTAGRAM_SERVICE, `/dms${queryStr}`);
     res.json(result);
   } catch (error) {
     logger.error('Social proxy endpoint hatasi', { error: error.message, stack: error.stack });
@@ -453,8 +463,7 @@ router.post('/instagram/dms/send', async (req, res) => {
 // Get followers
 router.get('/instagram/followers', async (req, res) => {
   try {
-    const { limit } = req.query;
-    const queryStr = limit ? `?limit=${limit}` : '';
+    const queryStr = pickQuery(req.query, ['limit', 'cursor']);
     const result = await proxyRequest(INSTAGRAM_SERVICE, `/followers${queryStr}`);
     res.json(result);
   } catch (error) {
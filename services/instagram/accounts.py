@@ -0,0 +1,309 @@
+"""
+Account registry: one instagrapi Client, session file and request budget per
+Instagram account, all served from one process.
+
+The account named "default" is the one the unscoped routes use. Its session
+file is session.json and its credentials are INSTAGRAM_USERNAME /
+INSTAGRAM_PASSWORD, as before accounts existed. Any other account NAME uses
+session-NAME.json and INSTAGRAM_NAME_USERNAME / INSTAGRAM_NAME_PASSWORD.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+import re
+import json
+import time
+import asyncio
+import functools
+import threading
+
+from fastapi import HTTPException
+from instagrapi import Client
+
+from cache import ResponseCache, CACHE_SIZE
+
+DEFAULT_ACCOUNT = "default"
+SESSION_FILE = "session.json"
+ACCOUNT_NAME = re.compile(r"^[a-z0-9][a-z0-9_-]{0,31}$")
+
+# Thread pool: instagrapi is synchronous, so every Instagram call runs here
+# instead of on the event loop (/health stays responsive during slow calls).
+# The pool is shared; ACCOUNT_CONCURRENCY caps how many of its workers one
+# account may hold, so a busy account cannot starve the others.
+IG_WORKERS = int(os.getenv("INSTAGRAM_WORKERS", "8"))
+IG_TIMEOUT = float(os.getenv("INSTAGRAM_TIMEOUT", "30"))
+IG_SLOW_TIMEOUT = float(os.getenv("INSTAGRAM_SLOW_TIMEOUT", "120"))  # login, upload
+ACCOUNT_CONCURRENCY = int(os.getenv("INSTAGRAM_ACCOUNT_CONCURRENCY", "2"))
+executor = ThreadPoolExecutor(max_workers=IG_WORKERS, thread_name_prefix="instagram")
+
+# Per-thread Client copies, {account name: (session generation, client)}
+thread_state = threading.local()
+
+
+def call_on_loop(loop, callback, *args):
+    try:
+        loop.call_soon_threadsafe(callback, *args)
+    except RuntimeError:
+        pass  # loop closed at shutdown
+
+async def run_blocking(fn, *args, timeout=IG_TIMEOUT, on_done=None, **kwargs):
+    """Run fn in the pool; 504 after `timeout` seconds.
+
+    A call still waiting in the queue is cancelled on timeout; one already
+    running finishes in the background (threads cannot be interrupted) and
+    its result is dropped. on_done(future) runs on the event loop once fn
+    has really finished or was cancelled before it started, which may be
+    after the 504.
+    """
+    loop = asyncio.get_running_loop()
+    future = executor.submit(functools.partial(fn, *args, **kwargs))
+    if on_done is not None:
+        future.add_done_callback(lambda f: call_on_loop(loop, on_done, f))
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail=f"Instagram request timed out after {timeout:g}s")
+
+
+class Account:
+    """One Instagram identity and everything kept per identity.
+
+    Client keeps per-request state (last_json, last_response), so concurrent
+    calls on one Client can swap results. Login/logout/session load use
+    `cl` under session_lock; other calls use a per-thread copy of its
+    settings, rebuilt when session_generation changes. Session changes made
+    on a copy are merged back into `cl` and saved after each call.
+    """
+
+    def __init__(self, name, pinned=False):
+        self.name = name
+        self.pinned = pinned  # loaded at startup, never unloaded when idle
+        self.session_file = SESSION_FILE if name == DEFAULT_ACCOUNT else f"session-{name}.json"
+        self.cl = Client()
+        self.is_logged_in = False
+        self.current_user = None
+        self.session_lock = threading.Lock()
+        self.session_generation = 0
+        self.semaphore = asyncio.Semaphore(ACCOUNT_CONCURRENCY)
+        self.load_lock = asyncio.Lock()
+        self.loaded = False
+        self.last_used = time.monotonic()
+        self.active = 0  # calls in flight
+        # Owned by main.py: response cache, local mirror and its sync task
+        self.cache = ResponseCache(CACHE_SIZE)
+        self.store = None
+        self.sync_task = None
+        self.sync_wakeup = asyncio.Event()
+
+    def env(self, key):
+        if self.name == DEFAULT_ACCOUNT:
+            return os.getenv(f"INSTAGRAM_{key}", "")
+        return os.getenv(f"INSTAGRAM_{self.name.upper().replace('-', '_')}_{key}", "")
+
+    # Thread pool helpers
+    def thread_client(self):
+        clients = getattr(thread_state, "clients", None)
+        if clients is None:
+            clients = thread_state.clients = {}
+        entry = clients.get(self.name)
+        if entry is None or entry[0] != self.session_generation:
+            client = Client()
+            with self.session_lock:
+                generation = self.session_generation
+                client.set_settings(self.cl.get_settings())
+            entry = clients[self.name] = (generation, client)
+        return entry[1]
+
+    def merge_settings(self):
+        """Fold session changes made on this thread's copy (refreshed cookies,
+        tokens) back into `cl` and the session file."""
+        generation, client = thread_state.clients[self.name]
+        settings = client.get_settings()
+        with self.session_lock:
+            # A login/logout/unload since the copy was made wins
+            if generation != self.session_generation or settings == self.cl.get_settings():
+                return
+            self.cl.set_settings(settings)
+            self.save_session()
+            self.session_changed()
+            thread_state.clients[self.name] = (self.session_generation, client)
+
+    def session_changed(self):
+        # Called with session_lock held, after `cl` changed
+        self.session_generation += 1
+
+    async def call(self, method, *args, timeout=IG_TIMEOUT, on_done=None, **kwargs):
+        """Call a Client method (by name) in the pool on the worker thread's client.
+
+        The account's concurrency slot is held until the thread is done, not
+        just until a timeout gives up on it. on_done is passed to run_blocking,
+        or called with None if the call never got a slot.
+        """
+        def call():
+            client = self.thread_client()
+            try:
+                return getattr(client, method)(*args, **kwargs)
+            finally:
+                self.merge_settings()
+
+        def finished(future):
+            self.semaphore.release()
+            self.active -= 1
+            self.last_used = time.monotonic()
+            if on_done is not None:
+                on_done(future)
+
+        self.last_used = time.monotonic()
+        self.active += 1
+        try:
+            await self.semaphore.acquire()
+        except BaseException:
+            self.active -= 1
+            if on_done is not None:
+                on_done(None)
+            raise
+        return await run_blocking(call, timeout=timeout, on_done=finished)
+
+    # Session management
+    def log(self, message):
+        print(message if self.name == DEFAULT_ACCOUNT else f"[{self.name}] {message}")
+
+    def save_session(self):
+        if self.cl.user_id:
+            session_data = self.cl.get_settings()
+            with open(self.session_file, "w") as f:
+                json.dump(session_data, f)
+
+    def load_session(self):
+        with self.session_lock:
+            loaded = self._load_session()
+            self.session_changed()
+        return loaded
+
+    def _load_session(self):
+        cl = self.cl
+
+        # Get credentials from .env
+        username = self.env("USERNAME")
+        password = self.env("PASSWORD")
+
+        # Try to load existing session first
+        if os.path.exists(self.session_file):
+            try:
+                with open(self.session_file, "r") as f:
+                    session_data = json.load(f)
+                cl.set_settings(session_data)
+
+                # Try to use session without re-login
+                try:
+                    cl.get_timeline_feed()  # Test if session is valid
+                    self.is_logged_in = True
+                    # Use user_info with user_id instead of username
+                    try:
+                        self.current_user = cl.user_info(cl.user_id)
+                    except Exception:
+                        self.current_user = None
+                    self.log(f"Session loaded successfully for user_id {cl.user_id}")
+                    return True
+                except Exception:
+                    pass  # Session invalid, try login
+            except Exception as e:
+                self.log(f"Session file load failed: {e}")
+
+        # If session failed, try login with credentials
+        if username and password:
+            try:
+                cl.login(username, password)
+                self.is_logged_in = True
+                # Use user_info with user_id
+                try:
+                    self.current_user = cl.user_info(cl.user_id)
+                except Exception:
+                    self.current_user = None
+                self.save_session()  # Save new session
+                self.log(f"Logged in successfully as {username}")
+                return True
+            except Exception as e:
+                self.log(f"Login failed: {e}")
+                return False
+
+        self.log("Session load failed: Both username and password must be provided.")
+        return False
+
+    def login_blocking(self, username, password, verification_code=None):
+        with self.session_lock:
+            self.cl.login(username, password, verification_code=verification_code)
+            self.is_logged_in = True
+
+            # Get user info using user_id
+            try:
+                self.current_user = self.cl.user_info(self.cl.user_id)
+            except Exception:
+                self.current_user = None
+
+            self.save_session()
+            self.session_changed()
+
+    def logout_blocking(self):
+        with self.session_lock:
+            self.cl.logout()
+            self.is_logged_in = False
+            self.current_user = None
+            if os.path.exists(self.session_file):
+                os.remove(self.session_file)
+            self.session_changed()
+
+    def unload(self):
+        """Drop the in-memory session; the session file stays for the next load."""
+        with self.session_lock:
+            self.cl = Client()
+            self.is_logged_in = False
+            self.current_user = None
+            self.session_changed()
+        self.loaded = False
+
+    def summary(self):
+        return {
+            "account": self.name,
+            "loaded": self.loaded,
+            "connected": self.is_logged_in,
+            "username": self.current_user.username if self.current_user else None
+        }
+
+
+class AccountRegistry:
+    """Known accounts: "default", INSTAGRAM_ACCOUNTS and saved session files.
+
+    Accounts are created unloaded; main.py loads a session on first use.
+    """
+
+    def __init__(self):
+        self.accounts = {}
+
+    def discover(self):
+        names = [name.strip().lower() for name in os.getenv("INSTAGRAM_ACCOUNTS", "").split(",")]
+        for filename in sorted(os.listdir(".")):
+            match = re.match(r"^session-(.+)\.json$", filename)
+            if match:
+                names.append(match.group(1))
+        self.accounts[DEFAULT_ACCOUNT] = Account(DEFAULT_ACCOUNT, pinned=True)
+        for name in names:
+            if name and ACCOUNT_NAME.match(name) and name not in self.accounts:
+                self.accounts[name] = Account(name)
+
+    def __iter__(self):
+        return iter(list(self.accounts.values()))
+
+    def get(self, name):
+        account = self.accounts.get(name)
+        if account is None:
+            raise HTTPException(status_code=404, detail=f"Unknown account: {name}")
+        return account
+
+    def get_or_create(self, name):
+        """Used by login, which may introduce a new account."""
+        if name not in self.accounts:
+            if not ACCOUNT_NAME.match(name):
+                raise HTTPException(status_code=400, detail="Account names: a-z, 0-9, '_' and '-', at most 32 characters")
+            self.accounts[name] = Account(name)
+        return self.accounts[name]
@@ -0,0 +1,107 @@
+"""
+In-process response cache for the polled GET endpoints (one per account).
+"""
+
+from collections import OrderedDict
+import os
+import time
+import asyncio
+import functools
+
+from fastapi import HTTPException
+
+# Response cache for the polled GET endpoints: seconds an entry is fresh,
+# then up to CACHE_STALE more seconds it is served while refreshed in the
+# background. 0 disables caching for that endpoint.
+CACHE_TTL = {
+    "profile": float(os.getenv("INSTAGRAM_CACHE_TTL_PROFILE", "300")),
+    "posts": float(os.getenv("INSTAGRAM_CACHE_TTL_POSTS", "120")),
+    "followers": float(os.getenv("INSTAGRAM_CACHE_TTL_FOLLOWERS", "300")),
+    "dms": float(os.getenv("INSTAGRAM_CACHE_TTL_DMS", "15")),
+}
+CACHE_STALE = float(os.getenv("INSTAGRAM_CACHE_STALE", "600"))
+CACHE_SIZE = int(os.getenv("INSTAGRAM_CACHE_SIZE", "256"))
+
+
+class ResponseCache:
+    """TTL + LRU cache of route responses, keyed by (endpoint, *params).
+
+    Fresh entries are returned as-is. Stale ones (up to CACHE_STALE past
+    their TTL) are returned immediately and refreshed in the background;
+    older ones are fetched inline. Only successful fetches are stored.
+
+    Fetches are single-flight: concurrent requests for the same key (page
+    load bursts, several tabs) share one upstream call and all get its
+    result or error. This also applies to endpoints with no TTL.
+    invalidate() bumps a generation and forgets in-flight calls, so a
+    fetch that started before it is neither shared nor stored.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # key -> (value, stored_at)
+        self.generation = 0
+        self.inflight = {}  # key -> task of the running fetch
+
+    def _cacheable(self, key):
+        return CACHE_TTL.get(key[0], 0) > 0 and self.max_entries > 0
+
+    def _put(self, key, value, generation):
+        if generation != self.generation or not self._cacheable(key):
+            return
+        self.entries[key] = (value, time.monotonic())
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def put(self, key, value):
+        """Store a response obtained elsewhere (e.g. profile after login)."""
+        self._put(key, value, self.generation)
+
+    async def get(self, key, fetch):
+        """Cached response for key; fetch() is an async callable producing it."""
+        entry = self.entries.get(key) if self._cacheable(key) else None
+        if entry is not None:
+            value, stored_at = entry
+            age = time.monotonic() - stored_at
+            ttl = CACHE_TTL[key[0]]
+            if age < ttl + CACHE_STALE:
+                self.entries.move_to_end(key)
+                if age >= ttl and key not in self.inflight:
+                    task = self._flight(key, fetch)
+                    task.add_done_callback(functools.partial(self._refresh_done, key))
+                return value
+        # shield: a client disconnecting must not cancel the shared call
+        return await asyncio.shield(self._flight(key, fetch))
+
+    def _flight(self, key, fetch):
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(key, fetch, self.generation))
+            self.inflight[key] = task
+        return task
+
+    async def _fetch(self, key, fetch, generation):
+        try:
+            value = await fetch()
+            self._put(key, value, generation)
+            return value
+        finally:
+            if self.inflight.get(key) is asyncio.current_task():
+                del self.inflight[key]
+
+    def _refresh_done(self, key, task):
+        if task.cancelled():
+            return
+        e = task.exception()
+        if e is not None:
+            # Keep serving the stale entry; the next hit retries
+            detail = e.detail if isinstance(e, HTTPException) else e
+            print(f"Cache refresh failed for {key}: {detail}")
+
+    def invalidate(self, *endpoints):
+        """Drop entries of the given endpoints (all entries if none given)."""
+        self.generation += 1
+        for store in (self.entries, self.inflight):
+            for key in [k for k in store if not endpoints or k[0] in endpoints]:
+                del store[key]
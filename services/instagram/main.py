@@ -1,15 +1,26 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, Request, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List
-from instagrapi import Client
 from instagrapi.exceptions import LoginRequired, TwoFactorRequired
+from datetime import datetime
 import os
 import json
+import tempfile
+import time
+import base64
+import binascii
+import asyncio
+import functools
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Local modules read their INSTAGRAM_* settings at import time
+from accounts import AccountRegistry, Account, DEFAULT_ACCOUNT, IG_SLOW_TIMEOUT, executor, run_blocking
+from store import InstagramStore
+
 app = FastAPI(title="Instagram Service", version="1.0.0")
 
 # CORS
@@ -21,11 +32,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Instagram Client
-cl = Client()
-is_logged_in = False
-current_user = None
-SESSION_FILE = "session.json"
+# Instagram accounts (accounts.py). Every route is served twice: unscoped
+# for the default account (the original API) and under /accounts/{account}.
+registry = AccountRegistry()
+router = APIRouter()
+
+# Sessions other than the default are loaded on first use and dropped again
+# after this many idle seconds (0 keeps them loaded)
+ACCOUNT_IDLE = float(os.getenv("INSTAGRAM_ACCOUNT_IDLE", "3600"))
+idle_task = None
+
+# Local SQLite mirror (store.py), one per account, kept up to date by a
+# background sync task. /dms, /dms/{thread_id} and /posts read from it once
+# a dataset has synced. INSTAGRAM_SYNC_INTERVAL=0 disables it and every read
+# goes to Instagram. SQLite calls run in asyncio.to_thread, off the event loop.
+STORE_PATH = os.getenv("INSTAGRAM_DB", "instagram.db")  # next to session.json (/app volume)
+SYNC_INTERVAL = float(os.getenv("INSTAGRAM_SYNC_INTERVAL", "60"))
+SYNC_FOLLOWERS_INTERVAL = float(os.getenv("INSTAGRAM_SYNC_FOLLOWERS_INTERVAL", "21600"))
+SYNC_POSTS_FULL_INTERVAL = float(os.getenv("INSTAGRAM_SYNC_POSTS_FULL_INTERVAL", "21600"))  # prunes deleted posts
+SYNC_BACKFILL_MESSAGES = int(os.getenv("INSTAGRAM_SYNC_BACKFILL_MESSAGES", "40"))
+SYNC_MAX_DELTA = 320  # new messages fetched per thread per sync before giving up
 
 # Models
 class LoginRequest(BaseModel):
@@ -41,232 +67,363 @@ class SendDMRequest(BaseModel):
 class PostRequest(BaseModel):
     caption: str
 
-# Session management
-def save_session():
-    if cl.user_id:
-        session_data = cl.get_settings()
-        with open(SESSION_FILE, "w") as f:
-            json.dump(session_data, f)
+# Pagination
+# A cursor is opaque to clients: base64 of a small JSON state. Live pages
+# carry the private API's own next_max_id / inbox cursor plus how many items
+# of that page were already returned (pages can be larger than the requested
+# limit); local mirror pages carry the sort key of their last row.
+def encode_cursor(**state):
+    raw = json.dumps(state, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
 
-def load_session():
-    global is_logged_in, current_user
-    
-    # Get credentials from .env
-    username = os.getenv("INSTAGRAM_USERNAME", "")
-    password = os.getenv("INSTAGRAM_PASSWORD", "")
-    
-    # Try to load existing session first
-    if os.path.exists(SESSION_FILE):
-        try:
-            with open(SESSION_FILE, "r") as f:
-                session_data = json.load(f)
-            cl.set_settings(session_data)
-            
-            # Try to use session without re-login
-            try:
-                cl.get_timeline_feed()  # Test if session is valid
-                is_logged_in = True
-                # Use user_info with user_id instead of username
-                try:
-                    current_user = cl.user_info(cl.user_id)
-                except Exception:
-                    current_user = None
-                print(f"Session loaded successfully for user_id {cl.user_id}")
-                return True
-            except Exception:
-                pass  # Session invalid, try login
-        except Exception as e:
-            print(f"Session file load failed: {e}")
-    
-    # If session failed, try login with credentials
-    if username and password:
-        try:
-            cl.login(username, password)
-            is_logged_in = True
-            # Use user_info with user_id
-            try:
-                current_user = cl.user_info(cl.user_id)
-            except Exception:
-                current_user = None
-            save_session()  # Save new session
-            print(f"Logged in successfully as {username}")
-            return True
-        except Exception as e:
-            print(f"Login failed: {e}")
-            return False
-    
-    print("Session load failed: Both username and password must be provided.")
-    return False
+def decode_cursor(cursor):
+    if not cursor:
+        return {}
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        state = None
+    if not isinstance(state, dict) or not state:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return state
+
+def is_live_cursor(state):
+    return "max_id" in state
+
+async def collect_page(fetch_page, cursor, limit):
+    """Up to `limit` items from the cursor on; returns (items, next_cursor).
+
+    fetch_page(max_id, wanted) is an async callable returning one upstream
+    page as (items, next_max_id). Pages are fetched until `limit` items are
+    collected or the list ends (next_cursor None).
+    """
+    state = decode_cursor(cursor)
+    if state and not is_live_cursor(state):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    max_id, offset = state.get("max_id"), int(state.get("offset", 0))
+    limit = max(limit, 1)
+    collected = []
+    while True:
+        items, next_max_id = await fetch_page(max_id, limit - len(collected) + offset)
+        taken = items[offset:offset + limit - len(collected)]
+        collected.extend(taken)
+        offset += len(taken)
+        if offset < len(items):
+            return collected, encode_cursor(max_id=max_id, offset=offset)
+        if not next_max_id or not items:
+            return collected, None
+        max_id, offset = next_max_id, 0
+        if len(collected) >= limit:
+            return collected, encode_cursor(max_id=max_id, offset=0)
+
+
+# Account loading
+def store_path(acct):
+    if acct.name == DEFAULT_ACCOUNT:
+        return STORE_PATH
+    root, ext = os.path.splitext(STORE_PATH)
+    return f"{root}-{acct.name}{ext}"
+
+def account_started(acct):
+    """Session is in memory: seed the cache, start the mirror sync."""
+    acct.loaded = True
+    seed_profile_cache(acct)
+    if SYNC_INTERVAL > 0 and acct.sync_task is None:
+        acct.store = InstagramStore(store_path(acct))
+        acct.sync_task = asyncio.create_task(sync_loop(acct))
+    acct.sync_wakeup.set()
+
+async def load_account(acct):
+    """Load the account's session on first use (lazily, once)."""
+    acct.last_used = time.monotonic()
+    if acct.loaded:
+        return
+    async with acct.load_lock:
+        if not acct.loaded:
+            await run_blocking(acct.load_session, timeout=IG_SLOW_TIMEOUT)
+            account_started(acct)
+
+def unload_account(acct):
+    if acct.sync_task is not None:
+        acct.sync_task.cancel()
+        acct.sync_task = None
+    if acct.store is not None:
+        acct.store.close()
+        acct.store = None
+    acct.cache.invalidate()
+    acct.unload()
+
+async def unload_idle_accounts():
+    while True:
+        await asyncio.sleep(min(ACCOUNT_IDLE, 60))
+        now = time.monotonic()
+        for acct in registry:
+            if (acct.loaded and not acct.pinned and not acct.active and not acct.load_lock.locked()
+                    and now - acct.last_used > ACCOUNT_IDLE):
+                unload_account(acct)
+                acct.log("Idle session unloaded")
+
+def account_name(request: Request):
+    # Unscoped routes have no {account} path parameter: the default account
+    return request.path_params.get("account", DEFAULT_ACCOUNT)
+
+async def current_account(request: Request) -> Account:
+    acct = registry.get(account_name(request))
+    await load_account(acct)
+    return acct
+
+def known_account(request: Request) -> Account:
+    """Like current_account, without loading the session (health/status)."""
+    acct = registry.get(account_name(request))
+    acct.last_used = time.monotonic()
+    return acct
+
+def login_account(request: Request) -> Account:
+    return registry.get_or_create(account_name(request))
 
 # Routes
 
-@app.get("/health")
-async def health():
+@router.get("/health")
+async def health(acct: Account = Depends(known_account)):
     return {
         "status": "ok",
         "instagram": {
-            "connected": is_logged_in,
-            "username": current_user.username if current_user else None
+            "connected": acct.is_logged_in,
+            "username": acct.current_user.username if acct.current_user else None
         }
     }
 
-@app.get("/status")
-async def status():
+@router.get("/status")
+async def status(acct: Account = Depends(known_account)):
     return {
-        "connected": is_logged_in,
+        "connected": acct.is_logged_in,
         "user": {
-            "id": str(current_user.pk) if current_user else None,
-            "username": current_user.username if current_user else None,
-            "full_name": current_user.full_name if current_user else None,
-            "followers": current_user.follower_count if current_user else 0,
-            "following": current_user.following_count if current_user else 0,
-            "posts": current_user.media_count if current_user else 0,
-            "profile_pic": str(current_user.profile_pic_url) if current_user and current_user.profile_pic_url else None
-        } if current_user else None
+            "id": str(acct.current_user.pk) if acct.current_user else None,
+            "username": acct.current_user.username if acct.current_user else None,
+            "full_name": acct.current_user.full_name if acct.current_user else None,
+            "followers": acct.current_user.follower_count if acct.current_user else 0,
+            "following": acct.current_user.following_count if acct.current_user else 0,
+            "posts": acct.current_user.media_count if acct.current_user else 0,
+            "profile_pic": str(acct.current_user.profile_pic_url) if acct.current_user and acct.current_user.profile_pic_url else None
+        } if acct.current_user else None
     }
 
-@app.post("/login")
-async def login(request: LoginRequest):
-    global is_logged_in, current_user
-    
+@router.post("/login")
+async def login(request: LoginRequest, acct: Account = Depends(login_account)):
     try:
-        # Try to login
-        cl.login(request.username, request.password, verification_code=request.verification_code)
-        is_logged_in = True
-        
-        # Get user info using user_id
-        try:
-            current_user = cl.user_info(cl.user_id)
-        except Exception:
-            current_user = None
-            
-        save_session()
+        # Under load_lock so a lazy session load cannot interleave
+        async with acct.load_lock:
+            await run_blocking(acct.login_blocking, request.username, request.password,
+                               request.verification_code, timeout=IG_SLOW_TIMEOUT)
+            acct.cache.invalidate()
+            account_started(acct)
         
         return {
             "success": True,
             "user": {
-                "id": str(current_user.pk) if current_user else str(cl.user_id),
-                "username": current_user.username if current_user else request.username,
-                "full_name": current_user.full_name if current_user else "",
-                "followers": current_user.follower_count if current_user else 0
+                "id": str(acct.current_user.pk) if acct.current_user else str(acct.cl.user_id),
+                "username": acct.current_user.username if acct.current_user else request.username,
+                "full_name": acct.current_user.full_name if acct.current_user else "",
+                "followers": acct.current_user.follower_count if acct.current_user else 0
             }
         }
     except TwoFactorRequired:
         return {"success": False, "error": "two_factor_required", "message": "2FA kodu gerekli"}
+    except HTTPException:
+        raise
     except Exception as e:
         return {"success": False, "error": str(e)}
 
-@app.post("/logout")
-async def logout():
-    global is_logged_in, current_user
-    
+@router.post("/logout")
+async def logout(acct: Account = Depends(current_account)):
     try:
-        cl.logout()
-        is_logged_in = False
-        current_user = None
-        if os.path.exists(SESSION_FILE):
-            os.remove(SESSION_FILE)
+        await run_blocking(acct.logout_blocking)
+        acct.cache.invalidate()
         return {"success": True}
+    except HTTPException:
+        raise
     except Exception as e:
         return {"success": False, "error": str(e)}
 
-@app.get("/profile")
-async def get_profile():
-    if not is_logged_in:
+def profile_response(user):
+    return {
+        "success": True,
+        "profile": {
+            "id": str(user.pk),
+            "username": user.username,
+            "full_name": user.full_name,
+            "biography": user.biography,
+            "followers": user.follower_count,
+            "following": user.following_count,
+            "posts": user.media_count,
+            "profile_pic": str(user.profile_pic_url) if user.profile_pic_url else None
+        }
+    }
+
+def seed_profile_cache(acct):
+    # Login and session load already fetched user_info into acct.current_user
+    if acct.current_user is not None:
+        acct.cache.put(("profile",), profile_response(acct.current_user))
+
+async def fetch_profile(acct):
+    # Use user_info with user_id instead of username
+    user = await acct.call("user_info", acct.cl.user_id)
+    acct.current_user = user  # keeps /status counts current too
+    return profile_response(user)
+
+@router.get("/profile")
+async def get_profile(acct: Account = Depends(current_account)):
+    if not acct.is_logged_in:
         raise HTTPException(status_code=401, detail="Not logged in")
     
     try:
-        # Use user_info with user_id instead of username
-        user = cl.user_info(cl.user_id)
-        return {
-            "success": True,
-            "profile": {
-                "id": str(user.pk),
-                "username": user.username,
-                "full_name": user.full_name,
-                "biography": user.biography,
-                "followers": user.follower_count,
-                "following": user.following_count,
-                "posts": user.media_count,
-                "profile_pic": str(user.profile_pic_url) if user.profile_pic_url else None
-            }
-        }
+        return await acct.cache.get(("profile",), lambda: fetch_profile(acct))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/posts")
-async def get_posts(limit: int = 12):
-    if not is_logged_in:
+async def fetch_posts_page(acct, max_id, count):
+    # Use raw API request to avoid pydantic validation errors
+    params = {"count": count}
+    if max_id:
+        params["max_id"] = max_id
+    # Direct Instagram API call
+    result = await acct.call(
+        "private_request",
+        f"feed/user/{acct.cl.user_id}/",
+        params=params
+    )
+    next_max_id = result.get("next_max_id") if result.get("more_available") else None
+    return result.get("items", []), next_max_id
+
+def iso_timestamp(ts):
+    # Naive local time, the format /dms returned before the mirror
+    # (msg.timestamp.isoformat()); message_ts() round-trips it
+    return datetime.fromtimestamp(ts).isoformat() if ts else None
+
+def post_record(item):
+    """Raw feed item -> the fields we serve (and mirror)."""
+    # Get image URL from different possible locations
+    image_url = None
+    if "image_versions2" in item:
+        candidates = item["image_versions2"].get("candidates", [])
+        if candidates:
+            image_url = candidates[0].get("url")
+    elif "carousel_media" in item:
+        first_media = item["carousel_media"][0] if item["carousel_media"] else {}
+        candidates = first_media.get("image_versions2", {}).get("candidates", [])
+        if candidates:
+            image_url = candidates[0].get("url")
+    
+    return {
+        "id": str(item.get("pk", item.get("id", ""))),
+        "code": item.get("code", ""),
+        "caption": item.get("caption", {}).get("text", "") if item.get("caption") else "",
+        "likes": item.get("like_count", 0),
+        "comments": item.get("comment_count", 0),
+        "media_type": item.get("media_type", 1),
+        "thumbnail": image_url,
+        "taken_at": item.get("taken_at") or 0
+    }
+
+def post_response(record):
+    return {
+        "id": record["id"],
+        "code": record["code"],
+        "caption": record["caption"],
+        "likes": record["likes"],
+        "comments": record["comments"],
+        "media_type": record["media_type"],
+        "thumbnail": record["thumbnail"],
+        "timestamp": iso_timestamp(record["taken_at"])
+    }
+
+def post_records(items):
+    records = []
+    for item in items:
+        try:
+            records.append(post_record(item))
+        except Exception as pe:
+            print(f"Error parsing item: {pe}")
+            continue
+    return records
+
+async def fetch_posts(acct, limit, cursor=None):
+    items, next_cursor = await collect_page(functools.partial(fetch_posts_page, acct), cursor, limit)
+    posts = [post_response(record) for record in post_records(items)]
+    return {"success": True, "posts": posts, "next_cursor": next_cursor}
+
+async def local_store(acct, dataset):
+    """The account's mirror, if enabled, of the logged-in user and `dataset` has completed a sync."""
+    store = acct.store
+    if store is None or not await asyncio.to_thread(store.serves, str(acct.cl.user_id), dataset):
+        return None
+    return store
+
+def local_page(rows, before, respond):
+    return [respond(row) for row in rows], encode_cursor(before=before) if before else None
+
+@router.get("/posts")
+async def get_posts(
+    limit: int = 12,
+    cursor: Optional[str] = None,
+    q: Optional[str] = None,
+    media_type: Optional[int] = None,
+    acct: Account = Depends(current_account)
+):
+    if not acct.is_logged_in:
         raise HTTPException(status_code=401, detail="Not logged in")
     
+    state = decode_cursor(cursor)
+    local = await local_store(acct, "posts")
+    if local and not is_live_cursor(state):
+        rows, before = await asyncio.to_thread(local.posts, max(limit, 1), q, media_type, state.get("before"))
+        posts, next_cursor = local_page(rows, before, post_response)
+        return {"success": True, "posts": posts, "next_cursor": next_cursor}
+    if q or media_type is not None:
+        raise HTTPException(status_code=503, detail="Post mirror not synced yet; filters unavailable")
+    
     try:
-        posts = []
-        
-        # Use raw API request to avoid pydantic validation errors
-        try:
-            # Direct Instagram API call
-            result = cl.private_request(
-                f"feed/user/{cl.user_id}/",
-                params={"count": limit}
-            )
-            
-            items = result.get("items", [])
-            for item in items:
-                try:
-                    # Get image URL from different possible locations
-                    image_url = None
-                    if "image_versions2" in item:
-                        candidates = item["image_versions2"].get("candidates", [])
-                        if candidates:
-                            image_url = candidates[0].get("url")
-                    elif "carousel_media" in item:
-                        first_media = item["carousel_media"][0] if item["carousel_media"] else {}
-                        candidates = first_media.get("image_versions2", {}).get("candidates", [])
-                        if candidates:
-                            image_url = candidates[0].get("url")
-                    
-                    posts.append({
-                        "id": str(item.get("pk", item.get("id", ""))),
-                        "code": item.get("code", ""),
-                        "caption": item.get("caption", {}).get("text", "") if item.get("caption") else "",
-                        "likes": item.get("like_count", 0),
-                        "comments": item.get("comment_count", 0),
-                        "media_type": item.get("media_type", 1),
-                        "thumbnail": image_url,
-                        "timestamp": None  # Can parse taken_at if needed
-                    })
-                except Exception as pe:
-                    print(f"Error parsing item: {pe}")
-                    continue
-                    
-        except Exception as e:
-            print(f"Raw API failed: {e}")
-                
-        return {"success": True, "posts": posts}
+        return await acct.cache.get(("posts", limit, cursor), lambda: fetch_posts(acct, limit, cursor))
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        # Not cached, so the next request tries again
+        print(f"Raw API failed: {e}")
+        return {"success": True, "posts": []}
 
-@app.post("/posts/upload")
+@router.post("/posts/upload")
 async def upload_post(
     file: UploadFile = File(...),
-    caption: str = Form("")
+    caption: str = Form(""),
+    acct: Account = Depends(current_account)
 ):
-    if not is_logged_in:
+    if not acct.is_logged_in:
         raise HTTPException(status_code=401, detail="Not logged in")
     
+    # Save uploaded file temporarily. photo_upload may outlive a 504, so the
+    # file is removed when the upload thread is done with it, not here.
+    suffix = os.path.splitext(file.filename or "")[1] or ".jpg"
+    fd, temp_path = tempfile.mkstemp(suffix=suffix)
+
+    def uploaded(future):
+        os.remove(temp_path)
+        if future is not None and not future.cancelled() and future.exception() is None:
+            acct.cache.invalidate("posts", "profile")
+            acct.sync_wakeup.set()
+
     try:
-        # Save uploaded file temporarily
-        temp_path = f"/tmp/{file.filename}"
-        with open(temp_path, "wb") as f:
-            content = await file.read()
+        content = await file.read()
+        with os.fdopen(fd, "wb") as f:
             f.write(content)
-        
-        # Upload to Instagram
-        media = cl.photo_upload(temp_path, caption)
-        
-        # Clean up
+    except Exception as e:
         os.remove(temp_path)
-        
+        raise HTTPException(status_code=500, detail=str(e))
+
+    try:
+        # Upload to Instagram
+        media = await acct.call("photo_upload", temp_path, caption, timeout=IG_SLOW_TIMEOUT, on_done=uploaded)
         return {
             "success": True,
             "post": {
@@ -275,96 +432,387 @@ async def upload_post(
                 "caption": media.caption_text
             }
         }
+    except HTTPException as e:
+        if e.status_code != 504:
+            raise
+        # Still uploading in the background; it shows up in /posts when done
+        return JSONResponse(status_code=202, content={
+            "success": True,
+            "pending": True,
+            "detail": e.detail
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/dms")
-async def get_direct_messages():
-    if not is_logged_in:
+async def fetch_threads_page(acct, cursor, count):
+    # The inbox returns fixed-size pages (20 threads)
+    return await acct.call("direct_threads_chunk", cursor=cursor)
+
+def message_ts(msg):
+    return msg.timestamp.timestamp() if msg.timestamp else 0
+
+def thread_record(thread):
+    last_message = thread.messages[0] if thread.messages else None
+    return {
+        "thread_id": str(thread.id),
+        "users": [u.username for u in thread.users],
+        "last_message_id": str(last_message.id) if last_message else None,
+        "last_message": last_message.text if last_message else None,
+        "last_ts": message_ts(last_message) if last_message else 0,
+        "unread": not thread.read_state
+    }
+
+def thread_response(record):
+    users = record["users"]
+    return {
+        "thread_id": record["thread_id"],
+        "users": json.loads(users) if isinstance(users, str) else users,
+        "last_message": record["last_message"],
+        "timestamp": iso_timestamp(record["last_ts"]),
+        "unread": bool(record["unread"])
+    }
+
+def message_record(msg, thread_id):
+    return {
+        "id": str(msg.id),
+        "thread_id": str(thread_id),
+        "user_id": str(msg.user_id),
+        "text": msg.text,
+        "ts": message_ts(msg)
+    }
+
+def message_response(record, my_user_id):
+    return {
+        "id": record["id"],
+        "text": record["text"],
+        "timestamp": iso_timestamp(record["ts"]),
+        "user_id": record["user_id"],
+        "is_me": record["user_id"] == str(my_user_id)
+    }
+
+async def fetch_direct_messages(acct, limit=20, cursor=None):
+    threads, next_cursor = await collect_page(functools.partial(fetch_threads_page, acct), cursor, limit)
+    dms = [thread_response(thread_record(thread)) for thread in threads]
+    return {"success": True, "dms": dms, "next_cursor": next_cursor}
+
+@router.get("/dms")
+async def get_direct_messages(
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    q: Optional[str] = None,
+    unread: Optional[bool] = None,
+    acct: Account = Depends(current_account)
+):
+    if not acct.is_logged_in:
         raise HTTPException(status_code=401, detail="Not logged in")
     
+    state = decode_cursor(cursor)
+    local = await local_store(acct, "threads")
+    if local and not is_live_cursor(state):
+        rows, before = await asyncio.to_thread(local.threads, max(limit, 1), q, unread, state.get("before"))
+        dms, next_cursor = local_page(rows, before, thread_response)
+        return {"success": True, "dms": dms, "next_cursor": next_cursor}
+    if q or unread is not None:
+        raise HTTPException(status_code=503, detail="DM mirror not synced yet; filters unavailable")
+    
     try:
-        threads = cl.direct_threads(amount=20)
-        dms = []
-        for thread in threads:
-            last_message = thread.messages[0] if thread.messages else None
-            users = [u.username for u in thread.users]
-            dms.append({
-                "thread_id": str(thread.id),
-                "users": users,
-                "last_message": last_message.text if last_message else None,
-                "timestamp": last_message.timestamp.isoformat() if last_message and last_message.timestamp else None,
-                "unread": not thread.read_state
-            })
-        return {"success": True, "dms": dms}
+        return await acct.cache.get(("dms", limit, cursor), lambda: fetch_direct_messages(acct, limit, cursor))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/dms/{thread_id}")
-async def get_dm_messages(thread_id: str, limit: int = 20):
-    if not is_logged_in:
+async def fetch_dm_messages(acct, thread_id, limit):
+    messages = await acct.call("direct_messages", thread_id, amount=limit)
+    formatted = [message_response(message_record(msg, thread_id), acct.cl.user_id) for msg in messages]
+    return {"success": True, "messages": formatted}
+
+async def local_dm_messages(acct, thread_id, limit, cursor, q):
+    """Messages page from the mirror, or None if the mirror cannot answer it."""
+    local = await local_store(acct, "threads")
+    thread = await asyncio.to_thread(local.thread, thread_id) if local else None
+    if thread is None:
+        return None
+    state = decode_cursor(cursor)
+    rows, before = await asyncio.to_thread(local.messages, thread_id, limit, q, state.get("before"))
+    # A short first page of a partially mirrored thread: older messages exist upstream
+    if not cursor and not q and len(rows) < limit and not thread["complete"]:
+        return None
+    messages, next_cursor = local_page(rows, before, lambda row: message_response(row, acct.cl.user_id))
+    return {"success": True, "messages": messages, "next_cursor": next_cursor}
+
+@router.get("/dms/{thread_id}")
+async def get_dm_messages(
+    thread_id: str,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    q: Optional[str] = None,
+    acct: Account = Depends(current_account)
+):
+    if not acct.is_logged_in:
         raise HTTPException(status_code=401, detail="Not logged in")
     
+    response = await local_dm_messages(acct, thread_id, max(limit, 1), cursor, q)
+    if response is not None:
+        return response
+    if cursor or q:
+        raise HTTPException(status_code=503, detail="Thread not mirrored yet; cursor and search unavailable")
+    
     try:
-        messages = cl.direct_messages(thread_id, amount=limit)
-        formatted = []
-        for msg in messages:
-            formatted.append({
-                "id": str(msg.id),
-                "text": msg.text,
-                "timestamp": msg.timestamp.isoformat() if msg.timestamp else None,
-                "user_id": str(msg.user_id),
-                "is_me": str(msg.user_id) == str(cl.user_id)
-            })
-        return {"success": True, "messages": formatted}
+        # Not cached (no TTL), but concurrent identical requests share one call
+        return await acct.cache.get(("messages", thread_id, limit), lambda: fetch_dm_messages(acct, thread_id, limit))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/dms/send")
-async def send_dm(request: SendDMRequest):
-    if not is_logged_in:
+@router.post("/dms/send")
+async def send_dm(request: SendDMRequest, acct: Account = Depends(current_account)):
+    if not acct.is_logged_in:
         raise HTTPException(status_code=401, detail="Not logged in")
     
     try:
         if request.thread_id:
             # Thread ID ile gönder
-            result = cl.direct_send(request.message, thread_ids=[int(request.thread_id)])
+            result = await acct.call("direct_send", request.message, thread_ids=[int(request.thread_id)])
         elif request.user_id:
             # User ID ile gönder (yeni konuşma başlatır)
-            result = cl.direct_send(request.message, user_ids=[int(request.user_id)])
+            result = await acct.call("direct_send", request.message, user_ids=[int(request.user_id)])
         else:
             raise HTTPException(status_code=400, detail="thread_id veya user_id gerekli")
+        acct.cache.invalidate("dms", "messages")
+        if acct.store is not None and result:
+            thread_id = getattr(result, "thread_id", None) or request.thread_id
+            if thread_id:
+                await asyncio.to_thread(acct.store.add_message, message_record(result, thread_id))
+        acct.sync_wakeup.set()
         
         return {
             "success": True, 
             "message_id": str(result.id) if result else None,
             "thread_id": str(result.thread_id) if result and hasattr(result, 'thread_id') else None
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/followers")
-async def get_followers(limit: int = 50):
-    if not is_logged_in:
+async def fetch_followers_page(acct, max_id, count):
+    return await acct.call("user_followers_v1_chunk", str(acct.cl.user_id), max_amount=count, max_id=max_id or "")
+
+def follower_item(user):
+    return {
+        "id": str(user.pk),
+        "username": user.username,
+        "full_name": user.full_name
+    }
+
+async def fetch_followers(acct, limit, cursor=None):
+    followers, next_cursor = await collect_page(functools.partial(fetch_followers_page, acct), cursor, limit)
+    result = [follower_item(user) for user in followers]
+    return {"success": True, "followers": result, "next_cursor": next_cursor}
+
+@router.get("/followers")
+async def get_followers(
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    q: Optional[str] = None,
+    acct: Account = Depends(current_account)
+):
+    if not acct.is_logged_in:
         raise HTTPException(status_code=401, detail="Not logged in")
     
+    if q:
+        # Search is served by the mirror only
+        local = await local_store(acct, "followers")
+        if local is None:
+            raise HTTPException(status_code=503, detail="Follower mirror not synced yet; search unavailable")
+        state = decode_cursor(cursor)
+        position = int(state.get("position", 0))
+        rows, more = await asyncio.to_thread(local.followers, max(limit, 1), q, position)
+        followers = [{"id": row["id"], "username": row["username"], "full_name": row["full_name"]} for row in rows]
+        next_cursor = encode_cursor(position=position + len(rows)) if more else None
+        return {"success": True, "followers": followers, "next_cursor": next_cursor}
+    
     try:
-        followers = cl.user_followers(cl.user_id, amount=limit)
-        result = []
-        for user_id, user in followers.items():
-            result.append({
-                "id": str(user_id),
-                "username": user.username,
-                "full_name": user.full_name
-            })
-        return {"success": True, "followers": result}
+        return await acct.cache.get(("followers", limit, cursor), lambda: fetch_followers(acct, limit, cursor))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-# Try to load existing session on startup
+@router.get("/followers/stream")
+async def stream_followers(
+    page_size: int = 200,
+    cursor: Optional[str] = None,
+    acct: Account = Depends(current_account)
+):
+    """Export followers as NDJSON, one page per upstream call.
+
+    One {"id", "username", "full_name"} line per follower, then a final
+    {"done": true, "count": n} line. If a page fails the last line is
+    {"error": ..., "cursor": ...}; pass that cursor to resume.
+    """
+    if not acct.is_logged_in:
+        raise HTTPException(status_code=401, detail="Not logged in")
+    decode_cursor(cursor)  # 400 before the stream starts
+
+    async def lines():
+        page_cursor, count = cursor, 0
+        while True:
+            try:
+                followers, next_cursor = await collect_page(
+                    functools.partial(fetch_followers_page, acct), page_cursor, page_size)
+            except Exception as e:
+                detail = e.detail if isinstance(e, HTTPException) else str(e)
+                yield json.dumps({"error": detail, "cursor": page_cursor}) + "\n"
+                return
+            count += len(followers)
+            yield "".join(json.dumps(follower_item(user)) + "\n" for user in followers)
+            if next_cursor is None:
+                yield json.dumps({"done": True, "count": count}) + "\n"
+                return
+            page_cursor = next_cursor
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+# Background sync of the local mirror: only deltas after the first run
+async def thread_delta(acct, thread, known_id):
+    """New messages of an inbox thread since known_id, newest first.
+
+    Returns (messages, complete); complete is True/False when it is known
+    whether the mirror now holds the whole thread, None when unchanged.
+    """
+    if known_id is None:
+        messages = await acct.call("direct_messages", thread.id, amount=SYNC_BACKFILL_MESSAGES)
+        return messages, len(messages) < SYNC_BACKFILL_MESSAGES
+    # The inbox already carries the latest few messages of each thread
+    messages = thread.messages
+    amount = 20
+    while True:
+        ids = [str(m.id) for m in messages]
+        if known_id in ids:
+            return messages[:ids.index(known_id)], None
+        if messages is not thread.messages:
+            if len(messages) < amount:
+                return messages, None  # whole thread fetched; known message was unsent
+            if amount >= SYNC_MAX_DELTA:
+                return messages, False  # too many new ones: the mirror has a gap
+            amount *= 2
+        messages = await acct.call("direct_messages", thread.id, amount=amount)
+
+async def sync_threads(acct):
+    # The whole inbox is walked every run: an unchanged thread says nothing
+    # about the ones after it (read state, replies sent from this service).
+    # Only changed threads cost a direct_messages call.
+    store = acct.store
+    cursor = None
+    while True:
+        threads, cursor = await acct.call("direct_threads_chunk", cursor=cursor)
+        for thread in threads:
+            record = thread_record(thread)
+            row = await asyncio.to_thread(store.thread, record["thread_id"])
+            known_id = row["last_message_id"] if row else None
+            if row is not None and known_id == record["last_message_id"]:
+                await asyncio.to_thread(store.save_thread, record)  # read state may have changed
+                continue
+            messages, complete = await thread_delta(acct, thread, known_id)
+            await asyncio.to_thread(store.save_thread, record,
+                                    [message_record(m, record["thread_id"]) for m in messages], complete)
+        if not cursor or not threads:
+            break
+    await asyncio.to_thread(store.mark_synced, "threads")
+
+async def sync_posts(acct):
+    # Newest first: later runs stop at the first page holding a known post.
+    # The first run and one every SYNC_POSTS_FULL_INTERVAL walk the whole
+    # feed and drop posts it no longer returns (deleted on Instagram).
+    store = acct.store
+    last_full = await asyncio.to_thread(store.synced_at, "posts_full")
+    full_run = last_full is None or time.time() - last_full >= SYNC_POSTS_FULL_INTERVAL
+    seen_ids = []
+    max_id = None
+    while True:
+        items, max_id = await fetch_posts_page(acct, max_id, 50)
+        records = post_records(items)
+        seen_ids += [record["id"] for record in records]
+        known = await asyncio.to_thread(store.save_posts, records)  # also refreshes like/comment counts
+        if (known and not full_run) or not max_id or not items:
+            break
+    if full_run:
+        await asyncio.to_thread(store.prune_posts, seen_ids)
+        await asyncio.to_thread(store.mark_synced, "posts_full")
+    await asyncio.to_thread(store.mark_synced, "posts")
+
+async def sync_followers(acct):
+    # No delta feed for followers: full refresh every SYNC_FOLLOWERS_INTERVAL
+    store = acct.store
+    last = await asyncio.to_thread(store.synced_at, "followers")
+    if last is not None and time.time() - last < SYNC_FOLLOWERS_INTERVAL:
+        return
+    run_started = time.time()
+    max_id, position = None, 0
+    while True:
+        users, max_id = await fetch_followers_page(acct, max_id, 200)
+        await asyncio.to_thread(store.save_followers, [follower_item(user) for user in users], position, run_started)
+        position += len(users)
+        if not max_id or not users:
+            break
+    await asyncio.to_thread(store.prune_followers, run_started)
+    await asyncio.to_thread(store.mark_synced, "followers")
+
+async def sync_loop(acct):
+    while True:
+        acct.sync_wakeup.clear()
+        if acct.is_logged_in and acct.cl.user_id:
+            await asyncio.to_thread(acct.store.set_owner, str(acct.cl.user_id))
+            for name, sync in (("threads", sync_threads), ("posts", sync_posts), ("followers", sync_followers)):
+                try:
+                    await sync(acct)
+                except Exception as e:
+                    detail = e.detail if isinstance(e, HTTPException) else e
+                    acct.log(f"Sync {name} failed: {detail}")
+        try:
+            await asyncio.wait_for(acct.sync_wakeup.wait(), SYNC_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+@app.get("/accounts")
+async def list_accounts():
+    return {"success": True, "accounts": [acct.summary() for acct in registry]}
+
+app.include_router(router)
+app.include_router(router, prefix="/accounts/{account}")
+
+# Load the default session on startup (other accounts on first use); in the
+# pool so /health answers meanwhile
+async def load_pinned_accounts():
+    for acct in registry:
+        if acct.pinned:
+            try:
+                await load_account(acct)
+            except Exception as e:
+                detail = e.detail if isinstance(e, HTTPException) else e
+                acct.log(f"Session load failed: {detail}")
+
 @app.on_event("startup")
 async def startup():
-    load_session()
+    global idle_task
+    registry.discover()
+    app.state.load_task = asyncio.create_task(load_pinned_accounts())
+    if ACCOUNT_IDLE > 0:
+        idle_task = asyncio.create_task(unload_idle_accounts())
+
+@app.on_event("shutdown")
+async def shutdown():
+    if idle_task is not None:
+        idle_task.cancel()
+    for acct in registry:
+        if acct.sync_task is not None:
+            acct.sync_task.cancel()
+        if acct.store is not None:
+            acct.store.close()
+    executor.shutdown(wait=False, cancel_futures=True)
 
 if __name__ == "__main__":
     import uvicorn
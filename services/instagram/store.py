@@ -0,0 +1,255 @@
+"""
+Local SQLite mirror of the account's DM threads, messages, posts and followers.
+
+The database runs in WAL mode, so reads are not blocked while the sync task
+writes. main.py calls every method through asyncio.to_thread, off the event
+loop; each thread gets its own connection. main.py's sync task makes the
+Instagram calls and passes plain dicts here.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS threads (
+    thread_id TEXT PRIMARY KEY,
+    users TEXT NOT NULL,                -- JSON list of usernames
+    last_message_id TEXT,
+    last_message TEXT,
+    last_ts REAL NOT NULL DEFAULT 0,
+    unread INTEGER NOT NULL DEFAULT 0,
+    complete INTEGER NOT NULL DEFAULT 0 -- whole history mirrored
+);
+CREATE INDEX IF NOT EXISTS threads_last_ts ON threads (last_ts DESC, thread_id DESC);
+
+CREATE TABLE IF NOT EXISTS messages (
+    id TEXT PRIMARY KEY,
+    thread_id TEXT NOT NULL,
+    user_id TEXT,
+    text TEXT,
+    ts REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS messages_thread_ts ON messages (thread_id, ts DESC, id DESC);
+
+CREATE TABLE IF NOT EXISTS posts (
+    id TEXT PRIMARY KEY,
+    code TEXT,
+    caption TEXT,
+    likes INTEGER,
+    comments INTEGER,
+    media_type INTEGER,
+    thumbnail TEXT,
+    taken_at REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS posts_taken_at ON posts (taken_at DESC, id DESC);
+
+CREATE TABLE IF NOT EXISTS followers (
+    id TEXT PRIMARY KEY,
+    username TEXT,
+    full_name TEXT,
+    position INTEGER NOT NULL,          -- order in the follower list
+    synced_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS followers_position ON followers (position);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+DATA_TABLES = ("threads", "messages", "posts", "followers")
+
+
+def like_pattern(q):
+    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class InstagramStore:
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        self.connections = []
+        self.connections_lock = threading.Lock()
+        self.db.executescript(SCHEMA)
+
+    @property
+    def db(self):
+        """This thread's connection, opened on first use."""
+        db = getattr(self.local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, check_same_thread=False)  # closed from close()
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            with self.connections_lock:
+                self.connections.append(db)
+            self.local.db = db
+        return db
+
+    def close(self):
+        with self.connections_lock:
+            for db in self.connections:
+                db.close()
+            self.connections.clear()
+
+    # Sync state
+    def get_state(self, key):
+        row = self.db.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def set_state(self, key, value):
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, value))
+
+    def ready(self, dataset):
+        """True once `dataset` finished a full sync for the current owner."""
+        return self.get_state(f"{dataset}_synced_at") is not None
+
+    def serves(self, owner, dataset):
+        """True if the mirror belongs to `owner` and `dataset` is ready."""
+        return self.get_state("owner") == owner and self.ready(dataset)
+
+    def mark_synced(self, dataset):
+        self.set_state(f"{dataset}_synced_at", str(time.time()))
+
+    def synced_at(self, dataset):
+        value = self.get_state(f"{dataset}_synced_at")
+        return float(value) if value else None
+
+    def set_owner(self, user_id):
+        """Wipe the mirror if it belongs to another account."""
+        if self.get_state("owner") == user_id:
+            return
+        with self.db:
+            for table in DATA_TABLES + ("sync_state",):
+                self.db.execute(f"DELETE FROM {table}")
+            self.db.execute("INSERT INTO sync_state (key, value) VALUES ('owner', ?)", (user_id,))
+
+    # Keyset pagination: rows come newest first, `before` is the
+    # (sort value, id) of the last row of the previous page.
+    def _page(self, sql, params, order_col, id_col, limit, before):
+        if before is not None:
+            sql += f" AND ({order_col} < ? OR ({order_col} = ? AND {id_col} < ?))"
+            params = params + [before[0], before[0], before[1]]
+        sql += f" ORDER BY {order_col} DESC, {id_col} DESC LIMIT ?"
+        rows = self.db.execute(sql, params + [limit + 1]).fetchall()
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, [rows[-1][order_col], rows[-1][id_col]]
+
+    # Threads and messages
+    def thread(self, thread_id):
+        return self.db.execute("SELECT * FROM threads WHERE thread_id = ?", (thread_id,)).fetchone()
+
+    def save_thread(self, thread, messages=(), complete=None):
+        """Upsert a thread row and insert its new messages."""
+        with self.db:
+            self.db.execute(
+                "INSERT INTO threads (thread_id, users, last_message_id, last_message, last_ts, unread) "
+                "VALUES (:thread_id, :users, :last_message_id, :last_message, :last_ts, :unread) "
+                "ON CONFLICT (thread_id) DO UPDATE SET users = excluded.users, "
+                "last_message_id = excluded.last_message_id, last_message = excluded.last_message, "
+                "last_ts = excluded.last_ts, unread = excluded.unread",
+                {**thread, "users": json.dumps(thread["users"], ensure_ascii=False)},
+            )
+            if complete is not None:
+                self.db.execute("UPDATE threads SET complete = ? WHERE thread_id = ?",
+                                (int(complete), thread["thread_id"]))
+            self.db.executemany(
+                "INSERT OR REPLACE INTO messages (id, thread_id, user_id, text, ts) "
+                "VALUES (:id, :thread_id, :user_id, :text, :ts)",
+                messages,
+            )
+
+    def add_message(self, message):
+        """Record a message sent through this service.
+
+        The thread row is left alone: its last_message_id is what the next
+        sync compares against, so messages that arrived before this one are
+        still fetched then.
+        """
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO messages (id, thread_id, user_id, text, ts) "
+                "VALUES (:id, :thread_id, :user_id, :text, :ts)",
+                message,
+            )
+
+    def threads(self, limit, q=None, unread=None, before=None):
+        sql = "SELECT * FROM threads WHERE 1 = 1"
+        params = []
+        if q:
+            sql += " AND (users LIKE ? ESCAPE '\\' OR last_message LIKE ? ESCAPE '\\')"
+            params += [like_pattern(q)] * 2
+        if unread is not None:
+            sql += " AND unread = ?"
+            params.append(int(unread))
+        return self._page(sql, params, "last_ts", "thread_id", limit, before)
+
+    def messages(self, thread_id, limit, q=None, before=None):
+        sql = "SELECT * FROM messages WHERE thread_id = ?"
+        params = [thread_id]
+        if q:
+            sql += " AND text LIKE ? ESCAPE '\\'"
+            params.append(like_pattern(q))
+        return self._page(sql, params, "ts", "id", limit, before)
+
+    # Posts
+    def save_posts(self, posts):
+        """Upsert posts; True if any of them was already mirrored."""
+        with self.db:
+            known = any(self.db.execute("SELECT 1 FROM posts WHERE id = ?", (post["id"],)).fetchone()
+                        for post in posts)
+            self.db.executemany(
+                "INSERT OR REPLACE INTO posts (id, code, caption, likes, comments, media_type, thumbnail, taken_at) "
+                "VALUES (:id, :code, :caption, :likes, :comments, :media_type, :thumbnail, :taken_at)",
+                posts,
+            )
+        return known
+
+    def prune_posts(self, seen_ids):
+        """Delete posts a full walk of the feed did not return (deleted upstream)."""
+        with self.db:
+            stored = {row["id"] for row in self.db.execute("SELECT id FROM posts")}
+            self.db.executemany("DELETE FROM posts WHERE id = ?", [(i,) for i in stored - set(seen_ids)])
+
+    def posts(self, limit, q=None, media_type=None, before=None):
+        sql = "SELECT * FROM posts WHERE 1 = 1"
+        params = []
+        if q:
+            sql += " AND caption LIKE ? ESCAPE '\\'"
+            params.append(like_pattern(q))
+        if media_type is not None:
+            sql += " AND media_type = ?"
+            params.append(media_type)
+        return self._page(sql, params, "taken_at", "id", limit, before)
+
+    # Followers: refreshed as a whole (there is no delta feed), page by page;
+    # rows not seen by the finished run are pruned afterwards
+    def save_followers(self, followers, start_position, run_started):
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO followers (id, username, full_name, position, synced_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(f["id"], f["username"], f["full_name"], start_position + i, run_started)
+                 for i, f in enumerate(followers)],
+            )
+
+    def prune_followers(self, run_started):
+        with self.db:
+            self.db.execute("DELETE FROM followers WHERE synced_at < ?", (run_started,))
+
+    def followers(self, limit, q=None, offset=0):
+        sql = "SELECT * FROM followers"
+        params = []
+        if q:
+            sql += " WHERE username LIKE ? ESCAPE '\\' OR full_name LIKE ? ESCAPE '\\'"
+            params += [like_pattern(q)] * 2
+        sql += " ORDER BY position LIMIT ? OFFSET ?"
+        rows = self.db.execute(sql, params + [limit + 1, offset]).fetchall()
+        return rows[:limit], len(rows) > limit